@@ -4,6 +4,7 @@ import { customElement, property } from 'lit/decorators.js';
 @customElement('agent-panel')
 export class AgentPanel extends LitElement {
     @property({ type: Object }) agents: any = {};
+    @property({ type: Object }) output: Record<string, string> = {};
 
     static styles = css`
     :host {
@@ -49,6 +50,16 @@ export class AgentPanel extends LitElement {
       overflow: hidden;
       text-overflow: ellipsis;
     }
+
+    .agent-output {
+      margin-top: 6px;
+      font-family: monospace;
+      font-size: 0.75rem;
+      color: #ccc;
+      white-space: pre-wrap;
+      max-height: 120px;
+      overflow-y: auto;
+    }
   `;
 
     render() {
@@ -58,7 +69,7 @@ export class AgentPanel extends LitElement {
                 ? html`<div style="color:#666">No agents active</div>`
                 : ''}
         
-      ${Object.values(this.agents).map((agent: any) => html`
+      ${Object.entries(this.agents).map(([agentId, agent]: [string, any]) => html`
         <div class="agent-card">
           <div class="agent-header">
             <span class="agent-role">${agent.role}</span>
@@ -67,6 +78,7 @@ export class AgentPanel extends LitElement {
           <div class="current-task">
             ${agent.current_ticket ? `Ticket #${agent.current_ticket}` : 'Waiting for tasks...'}
           </div>
+          ${this.output[agentId] ? html`<div class="agent-output">${this.output[agentId]}</div>` : ''}
         </div>
       `)}
     `;
@@ -12,6 +12,7 @@ export class DashboardApp extends LitElement {
   @state() projectState: any = null;
   @state() configMode = true;
   @state() showSettings = false;
+  @state() agentOutput: Record<string, string> = {};
 
   static styles = css`
     :host {
@@ -79,6 +80,13 @@ export class DashboardApp extends LitElement {
       if (msg.type === 'state_update') {
         this.projectState = msg.state;
         this.configMode = false;
+      } else if (msg.type === 'token' && msg.agent_id) {
+        // Keep only the tail of each agent's streamed output
+        const previous = this.agentOutput[msg.agent_id] || '';
+        this.agentOutput = {
+          ...this.agentOutput,
+          [msg.agent_id]: (previous + msg.content).slice(-2000)
+        };
       } else if (msg.type === 'config_updated') {
         alert("Configuration updated successfully!");
         this.showSettings = false;
@@ -132,7 +140,7 @@ export class DashboardApp extends LitElement {
 
   renderDashboard() {
     return html`
-      <agent-panel .agents=${this.projectState?.agents || {}}></agent-panel>
+      <agent-panel .agents=${this.projectState?.agents || {}} .output=${this.agentOutput}></agent-panel>
       <kanban-board .tickets=${this.projectState?.tickets || []}></kanban-board>
     `;
   }
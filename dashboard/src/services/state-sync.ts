@@ -0,0 +1,41 @@
+export interface PatchOp {
+    op: 'add' | 'remove' | 'replace';
+    path: string;
+    value?: any;
+}
+
+function unescape(token: string): string {
+    return token.replace(/~1/g, '/').replace(/~0/g, '~');
+}
+
+/**
+ * Apply JSON-patch style operations from the server to a state object.
+ * Returns a new top-level object so Lit picks up the change.
+ */
+export function applyPatch(state: any, ops: PatchOp[]): any {
+    const root = { ...state };
+    for (const { op, path, value } of ops) {
+        const tokens = path.split('/').slice(1).map(unescape);
+        const last = tokens.pop() as string;
+        let target = root;
+        for (const token of tokens) {
+            // Copy along the path so changed branches get new identities
+            target[token] = Array.isArray(target[token]) ? [...target[token]] : { ...target[token] };
+            target = target[token];
+        }
+        if (Array.isArray(target)) {
+            if (op === 'add') {
+                target.splice(last === '-' ? target.length : Number(last), 0, value);
+            } else if (op === 'remove') {
+                target.splice(Number(last), 1);
+            } else {
+                target[Number(last)] = value;
+            }
+        } else if (op === 'remove') {
+            delete target[last];
+        } else {
+            target[last] = value;
+        }
+    }
+    return root;
+}
@@ -1,7 +1,14 @@
+import { applyPatch } from './state-sync';
+
 export class WebSocketService extends EventTarget {
     private ws: WebSocket | null = null;
     private url: string;
     private reconnectInterval = 3000;
+    // Last applied state_update sequence number and the state it produced
+    private seq = -1;
+    // Run whose state we hold; sequence numbers are per run
+    private runId: string | null = null;
+    state: any = null;
 
     constructor(url: string = `ws://${location.host}/ws`) {
         super();
@@ -15,11 +22,18 @@ export class WebSocketService extends EventTarget {
         this.ws.onopen = () => {
             console.log('WebSocket Connected');
             this.dispatchEvent(new Event('connected'));
+            if (this.seq >= 0) {
+                // Catch up on anything missed while disconnected
+                this.send('sync', { since: this.seq, run_id: this.runId });
+            }
         };
 
         this.ws.onmessage = (event) => {
             try {
                 const message = JSON.parse(event.data);
+                if (message.type === 'state_update' && !this.applyStateUpdate(message)) {
+                    return;
+                }
                 this.dispatchEvent(new CustomEvent('message', { detail: message }));
             } catch (e) {
                 console.error('Failed to parse message', event.data);
@@ -33,6 +47,33 @@ export class WebSocketService extends EventTarget {
         };
     }
 
+    /**
+     * Fold a snapshot or delta into `state`. Returns false (and asks for a
+     * resync) when a delta arrives out of sequence.
+     */
+    private applyStateUpdate(message: any): boolean {
+        if (message.run_id !== this.runId) {
+            // First update of a newly watched run starts from scratch
+            this.runId = message.run_id;
+            this.seq = -1;
+            this.state = null;
+        }
+        if (message.state) {
+            this.state = message.state;
+        } else if (this.state && message.seq === this.seq + 1) {
+            this.state = applyPatch(this.state, message.ops);
+        } else if (this.state && message.seq <= this.seq) {
+            // Already applied (e.g. replayed after a sync)
+            return false;
+        } else {
+            this.send('sync', { since: this.seq, run_id: this.runId });
+            return false;
+        }
+        this.seq = message.seq;
+        message.state = this.state;
+        return true;
+    }
+
     send(type: string, payload: any = {}) {
         if (this.ws?.readyState === WebSocket.OPEN) {
             this.ws.send(JSON.stringify({ type, ...payload }));
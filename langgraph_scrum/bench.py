@@ -0,0 +1,157 @@
+import os
+import time
+import uuid
+import asyncio
+import resource
+import tempfile
+import subprocess
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from langgraph_scrum.config import config
+from langgraph_scrum.graph import create_workflow
+from langgraph_scrum.metrics import summarize_timings
+from langgraph_scrum.state import ScrumState, Ticket
+from langgraph_scrum.tools.git import GitTools
+
+class LoopLagSampler:
+    """Measures how late the event loop wakes up a sleeping task."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: List[float] = []
+        self.task: Optional[asyncio.Task] = None
+
+    async def _sample(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - start - self.interval))
+
+    def start(self):
+        self.task = asyncio.create_task(self._sample())
+
+    async def stop(self) -> Dict[str, float]:
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+        return summarize_timings(self.samples)
+
+def _tickets(count: int) -> List[Ticket]:
+    """Backlog of `count` tickets; every third one depends on the one before."""
+    now = datetime.now().isoformat()
+    tickets = []
+    for i in range(count):
+        ticket_id = f"B{i}-{uuid.uuid4().hex[:6]}"
+        tickets.append(Ticket(
+            id=ticket_id, title=f"Benchmark ticket {i}", description="Synthetic work item",
+            type="feature", status="approved", assigned_to=None, branch=None,
+            dependencies=[tickets[-1]["id"]] if i % 3 == 2 else [],
+            files_changed=[], created_at=now, updated_at=now,
+        ))
+    return tickets
+
+def _initial_state(project: str, sprint: int, tickets: int, workers: int) -> ScrumState:
+    # No response cache: every call should cost its simulated latency
+    agents = {"product_owner": {"state": "idle", "role": "product_owner", "config": {"provider": "fake", "cache": False}}}
+    for i in range(workers):
+        agents[f"dev-{i}"] = {"state": "idle", "current_ticket": None, "role": "developer", "config": {}}
+    return ScrumState(
+        project_name=project, requirements=f"Benchmark project {project}, sprint {sprint}",
+        phase="planning", tickets=_tickets(tickets), active_tickets={}, completed_tickets=[],
+        agents=agents, max_parallel=workers, branches=[], pending_merges=[], conflicts=[],
+        sprint_number=sprint, messages=[],
+    )
+
+async def _run_project(graph, project: str, sprints: int, tickets: int, workers: int,
+                       worktrees_dir: str, results: Dict[str, Any]):
+    for sprint in range(1, sprints + 1):
+        run_config = {
+            "configurable": {"thread_id": f"{project}-{sprint}", "worktrees_dir": worktrees_dir},
+            "recursion_limit": int(config.get("GRAPH_RECURSION_LIMIT", 200)),
+        }
+        started: Dict[str, float] = {}
+        final: Dict[str, Any] = {}
+        start = time.perf_counter()
+        async for mode, event in graph.astream(
+            _initial_state(project, sprint, tickets, workers), run_config, stream_mode=["tasks", "values"]
+        ):
+            if mode == "values":
+                final = event
+            elif "result" in event or "error" in event:
+                results["nodes"][event["name"]].append(time.perf_counter() - started.pop(event["id"], start))
+            else:
+                started[event["id"]] = time.perf_counter()
+        results["sprints"].append(time.perf_counter() - start)
+        results["tickets_done"] += sum(t["status"] == "done" for t in final.get("tickets", []))
+
+def _make_repo(path: str):
+    for args in (
+        ["init", "-q", "-b", "main"],
+        ["-c", "user.name=bench", "-c", "user.email=bench@localhost", "commit", "-q", "--allow-empty", "-m", "init"],
+    ):
+        subprocess.run(["git", *args], cwd=path, check=True)
+
+async def run_benchmark(
+    sprints: int = 1,
+    tickets: int = 6,
+    projects: int = 1,
+    workers: int = 4,
+    llm_latency: float = 0.0,
+    tokens_per_second: float = 0.0,
+) -> Dict[str, Any]:
+    """
+    Run `projects` concurrent projects of `sprints` sprints with `tickets`
+    tickets each, in-process against a throwaway git repository and the
+    fake LLM provider.
+
+    Returns per-node latency, sprint time, event-loop lag and peak memory.
+    """
+    from langgraph_scrum.nodes import git_agent
+
+    saved = {key: config.get(key) for key in ("FAKE_LLM_LATENCY", "FAKE_LLM_TOKENS_PER_SECOND")}
+    config.update({"FAKE_LLM_LATENCY": llm_latency, "FAKE_LLM_TOKENS_PER_SECOND": tokens_per_second})
+    results: Dict[str, Any] = {"nodes": defaultdict(list), "sprints": [], "tickets_done": 0}
+    with tempfile.TemporaryDirectory(prefix="scrum-bench-") as repo:
+        _make_repo(repo)
+        worktrees = [os.path.join(repo, ".worktrees", f"p{i}") for i in range(projects)]
+        # Nodes look their git tools up by worktree root; point them at the
+        # temporary repository rather than the working directory
+        for worktrees_dir in worktrees:
+            git_agent._git_tools[worktrees_dir] = GitTools(repo, worktrees_dir=worktrees_dir)
+        try:
+            graph = create_workflow()
+            sampler = LoopLagSampler()
+            sampler.start()
+            start = time.perf_counter()
+            await asyncio.gather(*(
+                _run_project(graph, f"p{i}", sprints, tickets, workers, worktrees[i], results)
+                for i in range(projects)
+            ))
+            wall = time.perf_counter() - start
+            loop_lag = await sampler.stop()
+        finally:
+            config.update(saved)
+            for worktrees_dir in worktrees:
+                tools = git_agent._git_tools.pop(worktrees_dir, None)
+                if tools:
+                    tools.close(discard=True)
+
+    return {
+        "params": {
+            "sprints": sprints, "tickets": tickets, "projects": projects, "workers": workers,
+            "llm_latency": llm_latency, "tokens_per_second": tokens_per_second,
+        },
+        "wall_seconds": wall,
+        "tickets_done": results["tickets_done"],
+        "tickets_per_second": results["tickets_done"] / wall if wall else 0.0,
+        "sprint": summarize_timings(results["sprints"]),
+        "nodes": {name: summarize_timings(values) for name, values in sorted(results["nodes"].items())},
+        "loop_lag": loop_lag,
+        # ru_maxrss is in KiB on Linux
+        "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
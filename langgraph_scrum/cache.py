@@ -0,0 +1,180 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+from langgraph_scrum.config import config
+from langgraph_scrum.serialization import atomic_write
+
+class ResponseCache:
+    """
+    On-disk cache of LLM responses.
+
+    Each entry is a small JSON file named after the hash of the request
+    (provider, model, temperature and messages). An in-memory index of entry
+    sizes and ages is kept so eviction never has to rescan the directory.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        max_entries: int = 1000,
+        max_bytes: int = 50 * 1024 * 1024,
+        max_age: float = 7 * 24 * 3600,
+    ):
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # key -> (size, created_at), oldest first
+        self._index: "OrderedDict[str, tuple]" = OrderedDict()
+        self._total_bytes = 0
+
+        if not os.path.exists(self.cache_dir):
+            os.makedirs(self.cache_dir)
+        self._load_index()
+
+    def _load_index(self):
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            # Dotfiles are atomic_write temp files left by an interrupted write
+            if entry.is_file() and entry.name.endswith(".json") and not entry.name.startswith("."):
+                st = entry.stat()
+                entries.append((st.st_mtime, entry.name[:-5], st.st_size))
+        for created_at, key, size in sorted(entries):
+            self._index[key] = (size, created_at)
+            self._total_bytes += size
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    @staticmethod
+    def make_key(provider: str, model: str, temperature: float, messages: List[Any]) -> str:
+        """Hash a request into a cache key."""
+        payload = {
+            "provider": provider,
+            "model": model,
+            "temperature": temperature,
+            "messages": [
+                {"type": getattr(m, "type", "unknown"), "content": getattr(m, "content", m)}
+                for m in messages
+            ],
+        }
+        encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response content, or None on a miss."""
+        with self._lock:
+            meta = self._index.get(key)
+            if meta is None:
+                self.misses += 1
+                return None
+            if time.time() - meta[1] > self.max_age:
+                self._remove(key)
+                self.misses += 1
+                return None
+        try:
+            with open(self._path(key), "r") as f:
+                content = json.load(f)["content"]
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[Cache] Dropping unreadable entry {key}: {e}")
+            with self._lock:
+                if key in self._index:
+                    self._remove(key)
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return content
+
+    def put(self, key: str, content: str):
+        """
+        Store a response and evict old entries if over budget.
+
+        A failed write is logged, not raised: the response it was caching
+        has already been produced.
+        """
+        data = json.dumps({"content": content, "created_at": time.time()}).encode("utf-8")
+        try:
+            # Unique temp file per writer: identical concurrent calls write the same key
+            atomic_write(self._path(key), data)
+        except OSError as e:
+            print(f"[Cache] Failed to store entry {key}: {e}")
+            return
+        with self._lock:
+            if key in self._index:
+                self._total_bytes -= self._index.pop(key)[0]
+            self._index[key] = (len(data), time.time())
+            self._total_bytes += len(data)
+            self._evict()
+
+    # Async variants: the file I/O runs on a worker thread, off the event loop
+
+    async def aget(self, key: str) -> Optional[str]:
+        return await asyncio.to_thread(self.get, key)
+
+    async def aput(self, key: str, content: str):
+        await asyncio.to_thread(self.put, key, content)
+
+    def _evict(self):
+        now = time.time()
+        while self._index:
+            key, (size, created_at) = next(iter(self._index.items()))
+            expired = now - created_at > self.max_age
+            over_budget = len(self._index) > self.max_entries or self._total_bytes > self.max_bytes
+            if not (expired or over_budget):
+                break
+            self._remove(key)
+            self.evictions += 1
+
+    def _remove(self, key: str):
+        size, _ = self._index.pop(key)
+        self._total_bytes -= size
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def clear(self):
+        """Remove every cached entry."""
+        with self._lock:
+            for key in list(self._index):
+                self._remove(key)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._index),
+                "bytes": self._total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+# Global instance, configured by the server with the knowledge data dir
+_response_cache_instance = None
+
+def configure_response_cache(data_dir: str) -> ResponseCache:
+    """Create the shared response cache under `data_dir/llm_cache`."""
+    global _response_cache_instance
+    _response_cache_instance = ResponseCache(
+        os.path.join(data_dir, "llm_cache"),
+        max_entries=int(config.get("LLM_CACHE_MAX_ENTRIES", 1000)),
+        max_bytes=int(config.get("LLM_CACHE_MAX_MB", 50)) * 1024 * 1024,
+        max_age=float(config.get("LLM_CACHE_MAX_AGE_DAYS", 7)) * 24 * 3600,
+    )
+    return _response_cache_instance
+
+def get_response_cache() -> ResponseCache:
+    global _response_cache_instance
+    if _response_cache_instance is None:
+        configure_response_cache(".langgraph/data")
+    return _response_cache_instance
@@ -0,0 +1,131 @@
+import aiosqlite
+from typing import Any, AsyncIterator, Dict, List, Optional
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+)
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+BLOBS_SQL = """
+CREATE TABLE IF NOT EXISTS blobs (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    channel TEXT NOT NULL,
+    version TEXT NOT NULL,
+    type TEXT,
+    blob BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+);
+"""
+
+class DeltaSqliteSaver(AsyncSqliteSaver):
+    """
+    SQLite checkpointer that stores each channel value once per version.
+
+    The stock saver serializes every channel into every checkpoint row, so a
+    super-step costs as much as the whole project state. Here checkpoint rows
+    only carry channel versions; values live in a `blobs` table and are only
+    written for the channels a step actually changed.
+    """
+
+    def __init__(self, conn: aiosqlite.Connection, **kwargs: Any):
+        super().__init__(conn, **kwargs)
+        self._blobs_ready = False
+
+    async def setup(self) -> None:
+        await super().setup()
+        if self._blobs_ready:
+            return
+        async with self.lock:
+            if not self._blobs_ready:
+                await self.conn.executescript(BLOBS_SQL)
+                await self.conn.commit()
+                self._blobs_ready = True
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        await self.setup()
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        values = checkpoint["channel_values"]
+
+        rows = []
+        for channel, version in new_versions.items():
+            if channel in values:
+                type_, blob = self.serde.dumps_typed(values[channel])
+                rows.append((thread_id, checkpoint_ns, channel, str(version), type_, blob))
+        if rows:
+            async with self.lock:
+                await self.conn.executemany(
+                    "INSERT OR REPLACE INTO blobs (thread_id, checkpoint_ns, channel, version, type, blob) VALUES (?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+
+        # The parent commits the checkpoint row and the blobs together
+        stripped = {**checkpoint, "channel_values": {}}
+        return await super().aput(config, stripped, metadata, new_versions)
+
+    async def _load_blobs(self, checkpoint_tuple: CheckpointTuple) -> CheckpointTuple:
+        """Fill in channel values referenced by a checkpoint's versions."""
+        checkpoint = checkpoint_tuple.checkpoint
+        versions = checkpoint["channel_versions"]
+        if not versions:
+            return checkpoint_tuple
+
+        configurable = checkpoint_tuple.config["configurable"]
+        params: List[Any] = [str(configurable["thread_id"]), configurable.get("checkpoint_ns", "")]
+        for channel, version in versions.items():
+            params.extend((channel, str(version)))
+        placeholders = ", ".join(["(?, ?)"] * len(versions))
+        query = (
+            "SELECT channel, type, blob FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? "
+            f"AND (channel, version) IN (VALUES {placeholders})"
+        )
+        async with self.lock, self.conn.execute(query, params) as cur:
+            rows = await cur.fetchall()
+
+        # Rows written by the stock saver still carry their values inline
+        values: Dict[str, Any] = dict(checkpoint["channel_values"])
+        for channel, type_, blob in rows:
+            values[channel] = self.serde.loads_typed((type_, blob))
+        return checkpoint_tuple._replace(checkpoint={**checkpoint, "channel_values": values})
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        await self.setup()
+        checkpoint_tuple = await super().aget_tuple(config)
+        if checkpoint_tuple is None:
+            return None
+        return await self._load_blobs(checkpoint_tuple)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        # The parent holds the lock while iterating, so collect first
+        tuples = [t async for t in super().alist(config, filter=filter, before=before, limit=limit)]
+        for checkpoint_tuple in tuples:
+            yield await self._load_blobs(checkpoint_tuple)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await self.setup()
+        await super().adelete_thread(thread_id)
+        async with self.lock:
+            await self.conn.execute("DELETE FROM blobs WHERE thread_id = ?", (str(thread_id),))
+            await self.conn.commit()
+
+async def open_checkpointer(path: str) -> DeltaSqliteSaver:
+    """Open (creating if needed) the checkpoint database at `path`."""
+    conn = await aiosqlite.connect(path)
+    return DeltaSqliteSaver(conn)
@@ -1,6 +1,6 @@
 import os
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Callable, List
 from dotenv import load_dotenv
 
 # Load .env file from project root
@@ -12,16 +12,100 @@ class Config:
         self._config = {
             "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY"),
             "ANTHROPIC_API_KEY": os.getenv("ANTHROPIC_API_KEY"),
+            "GOOGLE_API_KEY": os.getenv("GOOGLE_API_KEY"),
             "GITHUB_TOKEN": os.getenv("GITHUB_TOKEN"),
             "MODEL_PROVIDER": os.getenv("MODEL_PROVIDER", "anthropic"),
             "MODEL_NAME": os.getenv("MODEL_NAME", "claude-3-5-sonnet-20240620"),
+            # Max in-flight LLM requests per provider, and per-provider
+            # overrides (unset = LLM_MAX_CONCURRENCY)
+            "LLM_MAX_CONCURRENCY": int(os.getenv("LLM_MAX_CONCURRENCY", "4")),
+            "OPENAI_MAX_CONCURRENCY": os.getenv("OPENAI_MAX_CONCURRENCY"),
+            "ANTHROPIC_MAX_CONCURRENCY": os.getenv("ANTHROPIC_MAX_CONCURRENCY"),
+            "GOOGLE_MAX_CONCURRENCY": os.getenv("GOOGLE_MAX_CONCURRENCY"),
+            "FAKE_MAX_CONCURRENCY": os.getenv("FAKE_MAX_CONCURRENCY"),
+            # Number of LLM clients (and their connection pools) kept alive
+            "LLM_CLIENT_CACHE_SIZE": int(os.getenv("LLM_CLIENT_CACHE_SIZE", "16")),
+            # On-disk response cache limits (see cache.py)
+            "LLM_CACHE_MAX_ENTRIES": int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1000")),
+            "LLM_CACHE_MAX_MB": int(os.getenv("LLM_CACHE_MAX_MB", "50")),
+            "LLM_CACHE_MAX_AGE_DAYS": float(os.getenv("LLM_CACHE_MAX_AGE_DAYS", "7")),
+            # Knowledge base: worker threads for ChromaDB calls and LRU size of
+            # the query embedding/result caches
+            "KNOWLEDGE_THREADS": int(os.getenv("KNOWLEDGE_THREADS", "2")),
+            "KNOWLEDGE_CACHE_SIZE": int(os.getenv("KNOWLEDGE_CACHE_SIZE", "256")),
+            # Fuse BM25 keyword ranking with vector similarity for prompt context
+            "KNOWLEDGE_HYBRID_SEARCH": os.getenv("KNOWLEDGE_HYBRID_SEARCH", "true").lower() == "true",
+            # Lesson ingestion: batch size, max wait before writing a partial
+            # batch, and embedding distance under which a lesson counts as a
+            # near-duplicate of a stored one
+            "LESSON_BATCH_SIZE": int(os.getenv("LESSON_BATCH_SIZE", "32")),
+            "LESSON_FLUSH_SECONDS": float(os.getenv("LESSON_FLUSH_SECONDS", "2")),
+            "LESSON_DUPLICATE_DISTANCE": float(os.getenv("LESSON_DUPLICATE_DISTANCE", "0.1")),
+            # Tokens of retrieved lessons/messages added to agent prompts
+            # (override per agent with "context_tokens")
+            "CONTEXT_TOKEN_BUDGET": int(os.getenv("CONTEXT_TOKEN_BUDGET", "2000")),
+            # Scheduler: tickets in progress at once (overridden by the team's
+            # max_parallel) and tickets per agent unless set in its config
+            "MAX_PARALLEL_AGENTS": int(os.getenv("MAX_PARALLEL_AGENTS", "4")),
+            "AGENT_CAPACITY": int(os.getenv("AGENT_CAPACITY", "1")),
+            # Graph steps per run; each wave of tickets takes four
+            "GRAPH_RECURSION_LIMIT": int(os.getenv("GRAPH_RECURSION_LIMIT", "200")),
+            # Finished runs kept in the server's registry (oldest are evicted)
+            "MAX_FINISHED_RUNS": int(os.getenv("MAX_FINISHED_RUNS", "20")),
+            # tmux server socket (-L; default server if unset) and seconds the
+            # window -> pane index is trusted before it is reloaded
+            "TMUX_SOCKET": os.getenv("TMUX_SOCKET"),
+            "TMUX_INDEX_TTL": float(os.getenv("TMUX_INDEX_TTL", "5")),
+            # Git: threads for async operations, and attempts when another
+            # git process holds the repository's lock
+            "GIT_THREADS": int(os.getenv("GIT_THREADS", "4")),
+            "GIT_LOCK_RETRIES": int(os.getenv("GIT_LOCK_RETRIES", "5")),
+            # Pre-created worktrees kept ready for ticket branches, and seconds
+            # an idle one is kept beyond that
+            "WORKTREE_POOL_SIZE": int(os.getenv("WORKTREE_POOL_SIZE", "2")),
+            "WORKTREE_IDLE_SECONDS": float(os.getenv("WORKTREE_IDLE_SECONDS", "600")),
+            # Messages kept in state before older ones are compacted into a
+            # summary, and the summary's size cap in characters
+            "MESSAGE_WINDOW": int(os.getenv("MESSAGE_WINDOW", "100")),
+            "MESSAGE_SUMMARY_CHARS": int(os.getenv("MESSAGE_SUMMARY_CHARS", "4000")),
+            # "fake" provider: seconds to first token, tokens per second
+            # (0 = instant) and reply length, for benchmarks and offline runs
+            "FAKE_LLM_LATENCY": float(os.getenv("FAKE_LLM_LATENCY", "0")),
+            "FAKE_LLM_TOKENS_PER_SECOND": float(os.getenv("FAKE_LLM_TOKENS_PER_SECOND", "0")),
+            "FAKE_LLM_RESPONSE_TOKENS": int(os.getenv("FAKE_LLM_RESPONSE_TOKENS", "32")),
+            # Seconds between metrics pushes to subscribed dashboard clients
+            "METRICS_INTERVAL": float(os.getenv("METRICS_INTERVAL", "5")),
+            # Event-loop monitor: heartbeat period, and how long the loop may
+            # be blocked before the stall is reported (seconds)
+            "LOOP_MONITOR_INTERVAL": float(os.getenv("LOOP_MONITOR_INTERVAL", "0.1")),
+            "LOOP_STALL_SECONDS": float(os.getenv("LOOP_STALL_SECONDS", "0.25")),
+            # State snapshot format on disk: "msgpack" or "json"
+            "STATE_FORMAT": os.getenv("STATE_FORMAT", "msgpack"),
+            # Agent terminal streaming: log poll interval and characters of
+            # recent output kept per agent for late subscribers
+            "TERMINAL_POLL_SECONDS": float(os.getenv("TERMINAL_POLL_SECONDS", "0.2")),
+            "TERMINAL_BUFFER_CHARS": int(os.getenv("TERMINAL_BUFFER_CHARS", "65536")),
+            # Dashboard fan-out: per-client queue bound, slow-client policy
+            # ("coalesce" or "drop") and send timeout before eviction
+            "WS_QUEUE_SIZE": int(os.getenv("WS_QUEUE_SIZE", "256")),
+            "WS_SLOW_CLIENT_POLICY": os.getenv("WS_SLOW_CLIENT_POLICY", "coalesce"),
+            "WS_SEND_TIMEOUT": float(os.getenv("WS_SEND_TIMEOUT", "5")),
         }
+        self._listeners: List[Callable[[str, Any], None]] = []
+
+    def subscribe(self, listener: Callable[[str, Any], None]):
+        """Register a callback invoked with (key, value) whenever a value changes."""
+        self._listeners.append(listener)
 
     def get(self, key: str, default: Any = None) -> Any:
         return self._config.get(key, default)
 
     def set(self, key: str, value: Any):
+        changed = self._config.get(key) != value
         self._config[key] = value
+        if changed:
+            for listener in self._listeners:
+                listener(key, value)
         # Optional: Write back to .env if desired, but for now runtime only
         # or we could implement a .env updater.
         # For security, runtime memory update is safer than writing to disk immediately
@@ -0,0 +1,254 @@
+import asyncio
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Set
+from fastapi import WebSocket
+from langgraph_scrum.serialization import encode_message
+
+# Fetches the state updates a client watching a run needs after the given seq
+# (see StateSync.since)
+ResyncSource = Callable[[Optional[str], int], List[Dict[str, Any]]]
+
+class ClientConnection:
+    """
+    One dashboard client with a bounded outbound queue and its own writer task.
+
+    Producers only enqueue, so a slow client never delays the graph or other
+    clients. When the queue is full the slow-consumer policy applies:
+
+    - "drop": discard the oldest queued message.
+    - "coalesce": merge queued token and terminal chunks per agent, drop queued state
+      deltas; the writer then sends the client one catch-up instead.
+
+    Snapshots are never dropped, and gaps in state_update sequence numbers are
+    repaired by the writer through the resync source. Sequence numbers are per
+    run, so a client only receives run messages for the run it watches.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        resync: ResyncSource,
+        max_queue: int = 256,
+        policy: str = "coalesce",
+        send_timeout: float = 5.0,
+    ):
+        self.websocket = websocket
+        self.resync = resync
+        self.max_queue = max_queue
+        self.policy = policy
+        self.send_timeout = send_timeout
+        # (message, encoded text) pairs; text is shared between clients
+        self.queue: deque = deque()
+        self.wakeup = asyncio.Event()
+        self.run_id: Optional[str] = None
+        self.last_seq = -1
+        # Set when a queued delta was dropped; the writer then catches up
+        self.behind = False
+        self.dropped = 0
+        self.closed = False
+        # Run-independent streams the client subscribed to (e.g. "metrics")
+        self.topics: Set[str] = set()
+        self.task: Optional[asyncio.Task] = None
+
+    def offer(self, message: Dict[str, Any], text: str):
+        """Queue a message without waiting, applying the policy if full."""
+        if self.closed:
+            return
+        if len(self.queue) >= self.max_queue:
+            if self.policy == "coalesce":
+                self._coalesce()
+            while len(self.queue) >= self.max_queue and self._drop_oldest():
+                pass
+        self.queue.append((message, text))
+        self.wakeup.set()
+
+    def _drop_oldest(self) -> bool:
+        for i, (message, _) in enumerate(self.queue):
+            if "state" not in message:
+                del self.queue[i]
+                self.dropped += 1
+                if message.get("type") == "state_update":
+                    self.behind = True
+                return True
+        return False
+
+    def _coalesce(self):
+        merged: deque = deque()
+        for message, text in self.queue:
+            if message.get("type") == "state_update" and "state" not in message:
+                # Deltas are replaced by a single catch-up from the writer
+                self.dropped += 1
+                self.behind = True
+                continue
+            if message.get("type") == "metrics":
+                # Only the latest metrics snapshot matters
+                before = len(merged)
+                merged = deque(item for item in merged if item[0].get("type") != "metrics")
+                self.dropped += before - len(merged)
+            elif message.get("type") == "state_update" and merged and "state" in merged[-1][0]:
+                # A newer snapshot supersedes an older one
+                merged.pop()
+                self.dropped += 1
+            elif message.get("type") in ("token", "terminal_output") and merged:
+                previous = merged[-1][0]
+                field = "content" if message["type"] == "token" else "data"
+                if (previous.get("type") == message["type"]
+                        and not previous.get("history")
+                        and previous.get("node") == message.get("node")
+                        and previous.get("agent_id") == message.get("agent_id")):
+                    combined = {**previous, field: previous[field] + message[field]}
+                    merged[-1] = (combined, encode_message(combined))
+                    self.dropped += 1
+                    continue
+            merged.append((message, text))
+        self.queue = merged
+
+    async def _send(self, text: str):
+        await asyncio.wait_for(self.websocket.send_text(text), timeout=self.send_timeout)
+
+    async def _catch_up(self):
+        """Send the missed state (deltas or a snapshot) after last_seq."""
+        # The catch-up reflects the current state, so it supersedes every
+        # state update still queued
+        self.queue = deque(
+            (message, text) for message, text in self.queue
+            if message.get("type") != "state_update"
+        )
+        for update in self.resync(self.run_id, self.last_seq):
+            await self._send(encode_message(update))
+            self.last_seq = update["seq"]
+
+    async def run(self, on_stale: Callable[["ClientConnection"], None]):
+        """Writer loop; evicts the client when a send fails or times out."""
+        try:
+            while not self.closed:
+                if self.behind:
+                    self.behind = False
+                    await self._catch_up()
+                    continue
+                if not self.queue:
+                    self.wakeup.clear()
+                    await self.wakeup.wait()
+                    continue
+                message, text = self.queue.popleft()
+                if message.get("type") == "state_update":
+                    if "state" in message:
+                        self.last_seq = message["seq"]
+                    elif message["seq"] <= self.last_seq:
+                        # Already covered by a catch-up
+                        continue
+                    elif message["seq"] != self.last_seq + 1:
+                        await self._catch_up()
+                        continue
+                    else:
+                        self.last_seq = message["seq"]
+                await self._send(text)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[Server] Evicting stale client: {type(e).__name__} {e}")
+            on_stale(self)
+
+class ConnectionManager:
+    def __init__(
+        self,
+        resync: Optional[ResyncSource] = None,
+        max_queue: int = 256,
+        policy: str = "coalesce",
+        send_timeout: float = 5.0,
+    ):
+        self.resync = resync or (lambda run_id, seq: [])
+        self.max_queue = max_queue
+        self.policy = policy
+        self.send_timeout = send_timeout
+        self.connections: Dict[WebSocket, ClientConnection] = {}
+
+    @property
+    def active_connections(self) -> List[WebSocket]:
+        return list(self.connections)
+
+    async def connect(self, websocket: WebSocket):
+        await websocket.accept()
+        connection = ClientConnection(
+            websocket,
+            lambda run_id, seq: self.resync(run_id, seq),
+            max_queue=self.max_queue,
+            policy=self.policy,
+            send_timeout=self.send_timeout,
+        )
+        connection.task = asyncio.create_task(connection.run(self._evict))
+        self.connections[websocket] = connection
+
+    def disconnect(self, websocket: WebSocket):
+        connection = self.connections.pop(websocket, None)
+        if connection:
+            connection.closed = True
+            if connection.task:
+                connection.task.cancel()
+
+    def _evict(self, connection: ClientConnection):
+        self.disconnect(connection.websocket)
+        asyncio.create_task(self._close(connection.websocket))
+
+    async def _close(self, websocket: WebSocket):
+        try:
+            await asyncio.wait_for(websocket.close(code=1011), timeout=self.send_timeout)
+        except Exception:
+            pass
+
+    def send(self, websocket: WebSocket, message: Dict[str, Any]):
+        """Queue a message for a single client."""
+        connection = self.connections.get(websocket)
+        if connection:
+            connection.offer(message, encode_message(message))
+
+    def watching(self, websocket: WebSocket) -> Optional[str]:
+        """Run id the client currently watches."""
+        connection = self.connections.get(websocket)
+        return connection.run_id if connection else None
+
+    def watch(self, websocket: WebSocket, run_id: Optional[str], since: int = -1):
+        """
+        Point a client at a run and have its writer catch it up from `since`.
+        """
+        connection = self.connections.get(websocket)
+        if connection:
+            if connection.run_id != run_id:
+                # Drop messages queued for the previously watched run
+                connection.queue = deque(
+                    (message, text) for message, text in connection.queue
+                    if message.get("run_id") is None
+                )
+            connection.run_id = run_id
+            connection.last_seq = since
+            connection.behind = True
+            connection.wakeup.set()
+
+    def subscribe(self, websocket: WebSocket, topic: str, enabled: bool = True):
+        connection = self.connections.get(websocket)
+        if connection:
+            (connection.topics.add if enabled else connection.topics.discard)(topic)
+
+    def subscribers(self, topic: str) -> int:
+        return sum(topic in connection.topics for connection in self.connections.values())
+
+    def publish(self, topic: str, message: Dict[str, Any]):
+        """Queue a message for the clients subscribed to `topic`, encoded once."""
+        text = encode_message(message)
+        for connection in list(self.connections.values()):
+            if topic in connection.topics:
+                connection.offer(message, text)
+
+    def broadcast(self, message: Dict[str, Any], run_id: Optional[str] = None):
+        """
+        Queue a message without waiting on any socket.
+
+        With a run_id the message is tagged and only sent to clients watching
+        that run; otherwise every client gets it.
+        """
+        if run_id is not None:
+            message = {**message, "run_id": run_id}
+        text = encode_message(message)
+        for connection in list(self.connections.values()):
+            if run_id is None or connection.run_id == run_id:
+                connection.offer(message, text)
@@ -0,0 +1,102 @@
+import re
+import hashlib
+from typing import Any, Dict, List, Optional
+from langgraph_scrum.config import config
+
+# Rough characters per token for English text and code; budgets are
+# estimates, so they are best kept below the model's real context window
+CHARS_PER_TOKEN = 4
+
+def count_tokens(text: str) -> int:
+    """Estimate the number of tokens in `text`."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut `text` to about `max_tokens`, marking the cut."""
+    if count_tokens(text) <= max_tokens:
+        return text
+    return text[:max(0, max_tokens * CHARS_PER_TOKEN - 3)].rstrip() + "..."
+
+def _words(text: str) -> set:
+    return set(re.findall(r"[a-z0-9]{3,}", text.lower()))
+
+def _fingerprint(text: str) -> str:
+    return hashlib.sha1(" ".join(text.lower().split()).encode("utf-8")).hexdigest()
+
+def context_budget(agent_config: Dict[str, Any]) -> int:
+    """Token budget for retrieved context in this agent's prompts."""
+    return int(agent_config.get("context_tokens") or config.get("CONTEXT_TOKEN_BUDGET", 2000))
+
+def select_messages(messages: List[Dict[str, Any]], query: str, window: int = 20) -> List[Dict[str, Any]]:
+    """
+    Recent messages relevant to `query`, most relevant first.
+
+    Only the last `window` messages are considered; they are ranked by word
+    overlap with the query, ties going to the newer message.
+    """
+    query_words = _words(query)
+    recent = messages[-window:]
+    scored = []
+    for age, message in enumerate(reversed(recent)):
+        overlap = len(query_words & _words(str(message.get("content", ""))))
+        scored.append((-overlap, age, message))
+    scored.sort(key=lambda item: item[:2])
+    return [message for _, _, message in scored]
+
+def pack_context(lessons: List[str], messages: List[Dict[str, Any]], budget: int) -> str:
+    """
+    Pack lessons, then messages, into at most `budget` tokens.
+
+    Duplicate texts are dropped and the item that crosses the budget is
+    truncated; anything after it is left out.
+    """
+    seen = set()
+    sections = {"Lessons learned": [], "Recent discussion": []}
+    candidates = [("Lessons learned", f"- {lesson}", lesson) for lesson in lessons]
+    candidates += [
+        ("Recent discussion", f"[{m.get('role', 'agent')}] {m.get('content', '')}", str(m.get("content", "")))
+        for m in messages
+    ]
+
+    remaining = budget
+    for section, line, text in candidates:
+        fingerprint = _fingerprint(text)
+        if not text.strip() or fingerprint in seen:
+            continue
+        seen.add(fingerprint)
+        # Headers cost a few tokens too
+        cost = count_tokens(line) + (0 if sections[section] else count_tokens(section) + 1)
+        if cost > remaining:
+            if remaining > 16:
+                sections[section].append(truncate_to_tokens(line, remaining - count_tokens(section) - 1))
+            break
+        sections[section].append(line)
+        remaining -= cost
+
+    return "\n\n".join(
+        f"{section}:\n" + "\n".join(lines) for section, lines in sections.items() if lines
+    )
+
+async def build_context(
+    query: str,
+    messages: List[Dict[str, Any]],
+    knowledge: Optional[Any] = None,
+    budget: int = 2000,
+    k: int = 5,
+    filters: Optional[Dict[str, Any]] = None,
+) -> str:
+    """
+    Retrieve the top-k lessons for `query` and the most relevant recent
+    messages, packed into `budget` tokens. Empty if there is nothing to add.
+
+    `filters` restricts lessons by metadata (see KnowledgeManager.search_many).
+    """
+    lessons: List[str] = []
+    if knowledge is not None:
+        try:
+            lessons = await knowledge.asearch_lessons(
+                query, n_results=k, filters=filters, hybrid=bool(config.get("KNOWLEDGE_HYBRID_SEARCH", True))
+            )
+        except Exception as e:
+            print(f"[Context] Lesson search failed: {e}")
+    return pack_context(lessons, select_messages(messages, query), budget)
@@ -0,0 +1,86 @@
+import time
+import asyncio
+import hashlib
+from typing import Any, AsyncIterator, Iterator, List, Optional
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+# Words the fake responses are drawn from
+_VOCABULARY = (
+    "ticket sprint backlog story API endpoint test review merge branch deploy "
+    "schema model user auth cache queue worker latency refactor module service"
+).split()
+
+class FakeChatModel(BaseChatModel):
+    """
+    Deterministic offline chat model for benchmarks and tests.
+
+    The reply is derived from a hash of the prompt, so the same prompt always
+    gets the same answer. `latency` is the time to the first token, and
+    tokens then arrive at `tokens_per_second` (0 for all at once).
+    """
+
+    model: str = "fake"
+    latency: float = 0.0
+    tokens_per_second: float = 0.0
+    response_tokens: int = 32
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def _tokens(self, messages: List[BaseMessage]) -> List[str]:
+        prompt = "\n".join(str(m.content) for m in messages)
+        digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+        tokens = []
+        for i in range(self.response_tokens):
+            word = _VOCABULARY[(digest[i % len(digest)] + i) % len(_VOCABULARY)]
+            tokens.append(word if i == 0 else " " + word)
+        return tokens
+
+    def _usage(self, messages: List[BaseMessage]) -> dict:
+        # Same ~4 characters per token estimate as context.py
+        prompt_tokens = sum(len(str(m.content)) for m in messages) // 4 + 1
+        return {
+            "input_tokens": prompt_tokens,
+            "output_tokens": self.response_tokens,
+            "total_tokens": prompt_tokens + self.response_tokens,
+        }
+
+    def _token_delay(self) -> float:
+        return 1.0 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        tokens = self._tokens(messages)
+        time.sleep(self.latency + self._token_delay() * len(tokens))
+        message = AIMessage(content="".join(tokens), usage_metadata=self._usage(messages))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        tokens = self._tokens(messages)
+        await asyncio.sleep(self.latency + self._token_delay() * len(tokens))
+        message = AIMessage(content="".join(tokens), usage_metadata=self._usage(messages))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager: Any = None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self.latency)
+        tokens = self._tokens(messages)
+        for i, token in enumerate(tokens):
+            time.sleep(self._token_delay())
+            usage = self._usage(messages) if i == len(tokens) - 1 else None
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token, usage_metadata=usage))
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                       run_manager: Any = None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self.latency)
+        tokens = self._tokens(messages)
+        delay = self._token_delay()
+        for i, token in enumerate(tokens):
+            if delay:
+                await asyncio.sleep(delay)
+            usage = self._usage(messages) if i == len(tokens) - 1 else None
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token, usage_metadata=usage))
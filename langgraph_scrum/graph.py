@@ -1,5 +1,8 @@
+from typing import Optional
 from langgraph.graph import StateGraph, END
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph_scrum.state import ScrumState
+from langgraph_scrum.metrics import trace_node
 from langgraph_scrum.nodes import (
     product_owner_node,
     architect_node, 
@@ -16,25 +19,33 @@ from langgraph_scrum.nodes import (
     router
 )
 
-def create_workflow():
+def create_workflow(checkpointer: Optional[BaseCheckpointSaver] = None):
+    """
+    Build and compile the Scrum workflow graph.
+
+    Args:
+        checkpointer: Optional saver; when given, every super-step is persisted
+            and runs can be resumed by thread id.
+    """
     workflow = StateGraph(ScrumState)
+    # Every node is wrapped by trace_node, which records its wall time
     
     # Planning
-    workflow.add_node("product_owner", product_owner_node)
-    workflow.add_node("architect", architect_node)
-    workflow.add_node("user_approval", user_approval_node)
+    workflow.add_node("product_owner", trace_node("product_owner", product_owner_node))
+    workflow.add_node("architect", trace_node("architect", architect_node))
+    workflow.add_node("user_approval", trace_node("user_approval", user_approval_node))
     
     # Development
-    workflow.add_node("dispatch", dispatch_node)
-    workflow.add_node("agent_work", agent_work)
-    workflow.add_node("git_agent", git_agent_node) # New node
-    workflow.add_node("git_merge", git_merge_node)
+    workflow.add_node("dispatch", trace_node("dispatch", dispatch_node))
+    workflow.add_node("agent_work", trace_node("agent_work", agent_work))
+    workflow.add_node("git_agent", trace_node("git_agent", git_agent_node)) # New node
+    workflow.add_node("git_merge", trace_node("git_merge", git_merge_node))
     
     # Review
-    workflow.add_node("tester", tester_node)
-    workflow.add_node("reviewer", reviewer_node)
-    workflow.add_node("sprint_review", sprint_review_node)
-    workflow.add_node("release", release_node)
+    workflow.add_node("tester", trace_node("tester", tester_node))
+    workflow.add_node("reviewer", trace_node("reviewer", reviewer_node))
+    workflow.add_node("sprint_review", trace_node("sprint_review", sprint_review_node))
+    workflow.add_node("release", trace_node("release", release_node))
     
     # Edges
     # Planning Flow
@@ -44,11 +55,14 @@ def create_workflow():
     workflow.add_edge("user_approval", "dispatch")
     
     # Development Flow
-    workflow.add_conditional_edges("dispatch", dispatch_logic)
+    # Each dispatch starts a wave of independent tickets in parallel; after
+    # merging, dispatch runs again to start the tickets they unblocked, and
+    # moves on to testing once nothing is left.
+    workflow.add_conditional_edges("dispatch", dispatch_logic, ["agent_work", "tester"])
     workflow.add_edge("agent_work", "git_agent") # Check with git agent after work? 
-    # Or maybe parallel... for now make it linear: Work -> Git Agent -> Merge -> Tester
+    # Work -> Git Agent -> Merge -> next wave
     workflow.add_edge("git_agent", "git_merge")
-    workflow.add_edge("git_merge", "tester")
+    workflow.add_edge("git_merge", "dispatch")
     
     # Review Flow
     workflow.add_edge("tester", "reviewer")
@@ -67,4 +81,4 @@ def create_workflow():
     
     workflow.add_edge("release", END)
     
-    return workflow.compile()
+    return workflow.compile(checkpointer=checkpointer)
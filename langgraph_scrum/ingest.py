@@ -0,0 +1,108 @@
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+from langgraph_scrum.config import config
+
+# Agents whose messages are worth keeping as lessons
+LESSON_ROLES = ("reviewer", "tester", "sprint_review")
+
+def _metadata(state: Dict[str, Any], **extra: Any) -> Dict[str, Any]:
+    metadata = {"project": state.get("project_name"), "sprint": state.get("sprint_number"), **extra}
+    # Chroma metadata values can't be None
+    return {k: v for k, v in metadata.items() if v is not None}
+
+def harvest_lessons(update: Dict[str, Any], state: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    Lesson candidates in a node's update: finished tickets, and review,
+    test and sprint review output. `state` supplies project and sprint.
+    """
+    lessons = []
+    for ticket in update.get("completed_tickets") or []:
+        if ticket.get("status") != "done":
+            continue
+        text = f"{ticket['type'].capitalize()} '{ticket['title']}' completed: {ticket.get('description', '')}"
+        if ticket.get("files_changed"):
+            text += f" (files: {', '.join(ticket['files_changed'])})"
+        lessons.append((text, _metadata(
+            state,
+            source="ticket",
+            ticket_id=ticket["id"],
+            ticket_type=ticket.get("type"),
+            role=ticket.get("assigned_to"),
+        )))
+    for message in update.get("messages") or []:
+        if message.get("role") in LESSON_ROLES and str(message.get("content", "")).strip():
+            lessons.append((str(message["content"]), _metadata(
+                state, source=message["role"], role=message["role"]
+            )))
+    return lessons
+
+class LessonIngestor:
+    """
+    Background pipeline feeding lessons into a knowledge base.
+
+    `submit` only queues; a worker task writes lessons in batches of up to
+    `batch_size`, or whatever arrived within `flush_interval` seconds, through
+    `KnowledgeManager.aingest_lessons`, which drops exact and near duplicates.
+    """
+
+    def __init__(
+        self,
+        knowledge: Any,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        max_distance: Optional[float] = None,
+    ):
+        self.knowledge = knowledge
+        self.batch_size = batch_size or int(config.get("LESSON_BATCH_SIZE", 32))
+        self.flush_interval = flush_interval or float(config.get("LESSON_FLUSH_SECONDS", 2.0))
+        self.max_distance = max_distance if max_distance is not None else float(config.get("LESSON_DUPLICATE_DISTANCE", 0.1))
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.ingested = 0
+        self.task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self._worker())
+
+    def submit(self, lessons: List[Tuple[str, Dict[str, Any]]]):
+        for lesson in lessons:
+            self.queue.put_nowait(lesson)
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self.queue.get()
+            # None is the sentinel from close(): write what is left, then stop
+            stop = item is None
+            batch = [] if stop else [item]
+            deadline = loop.time() + self.flush_interval
+            while not stop and len(batch) < self.batch_size:
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), deadline - loop.time())
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stop = True
+                else:
+                    batch.append(item)
+            if batch:
+                await self._write(batch)
+            if stop:
+                return
+
+    async def _write(self, batch: List[Tuple[str, Dict[str, Any]]]):
+        try:
+            added = await self.knowledge.aingest_lessons(
+                [text for text, _ in batch], [metadata for _, metadata in batch], self.max_distance
+            )
+            self.ingested += len(added)
+        except Exception as e:
+            print(f"[Knowledge] Lesson ingestion failed: {e}")
+
+    async def close(self):
+        """Flush queued lessons and stop the worker."""
+        if self.task is None:
+            return
+        self.queue.put_nowait(None)
+        await self.task
+        self.task = None
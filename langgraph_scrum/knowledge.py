@@ -1,65 +1,316 @@
 import os
 import json
+import asyncio
+import hashlib
+import threading
 import chromadb
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from chromadb.config import Settings
+from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+import numpy as np
 from typing import List, Dict, Any, Optional
+from langgraph_scrum.config import config
+from langgraph_scrum.search import BM25Index, fuse_rankings, lesson_filter
+from langgraph_scrum.serialization import SERIALIZERS, get_serializer, read_snapshot, write_snapshot
+
+# Embedding model shared by every knowledge base, so it is loaded (and warmed
+# up) once per process rather than once per run
+_embedding_function = None
+
+def get_embedding_function():
+    global _embedding_function
+    if _embedding_function is None:
+        _embedding_function = DefaultEmbeddingFunction()
+    return _embedding_function
 
 class KnowledgeManager:
-    def __init__(self, data_dir: str = ".langgraph/data"):
+    """
+    Lessons learned (ChromaDB) and state snapshots for a project.
+
+    ChromaDB calls are blocking, so the async methods run them on a small
+    thread pool. Query embeddings and search results are kept in LRU caches;
+    results are invalidated whenever lessons are added.
+    """
+
+    def __init__(self, data_dir: str = ".langgraph/data", embedding_function=None):
         self.data_dir = os.path.abspath(data_dir)
         if not os.path.exists(self.data_dir):
             os.makedirs(self.data_dir)
             
-        self.state_file = os.path.join(self.data_dir, "state.json")
+        # Versioned state snapshots in STATE_FORMAT (msgpack by default)
+        self.serializer = get_serializer()
+        self.state_file = os.path.join(self.data_dir, "state" + self.serializer.extension)
+        # Graph checkpoints (see checkpoint.py), one thread per project
+        self.checkpoint_file = os.path.join(self.data_dir, "checkpoints.sqlite")
         
         # Initialize ChromaDB
+        self.embedding_function = embedding_function or get_embedding_function()
         self.chroma_client = chromadb.PersistentClient(path=os.path.join(self.data_dir, "chroma"))
-        self.collection = self.chroma_client.get_or_create_collection(name="scrum_knowledge")
+        self.collection = self.chroma_client.get_or_create_collection(
+            name="scrum_knowledge", embedding_function=self.embedding_function
+        )
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=int(config.get("KNOWLEDGE_THREADS", 2)), thread_name_prefix="knowledge"
+        )
+        self.cache_size = int(config.get("KNOWLEDGE_CACHE_SIZE", 256))
+        self._lock = threading.Lock()
+        # query text -> embedding
+        self._embeddings: "OrderedDict[str, Any]" = OrderedDict()
+        # (query, n_results, filters, hybrid) -> documents
+        self._results: "OrderedDict[tuple, List[str]]" = OrderedDict()
+        # Keyword index for hybrid search, built on first use
+        self._keywords: Optional[BM25Index] = None
+
+    def _cache_put(self, cache: OrderedDict, key: Any, value: Any):
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > self.cache_size:
+            cache.popitem(last=False)
+
+    def warm_up(self) -> Future:
+        """Load the embedding model in the background so the first search doesn't pay for it."""
+        def run():
+            self.embedding_function(["warm up"])
+            self.collection.count()
+            print("[Knowledge] Embedding model ready")
+        return self._executor.submit(run)
+
+    @staticmethod
+    def lesson_id(lesson: str) -> str:
+        """Content hash of a lesson, ignoring case and whitespace."""
+        normalized = " ".join(lesson.lower().split())
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:32]
+
+    def add_lessons(self, lessons: List[str], metadatas: Optional[List[Dict[str, Any]]] = None) -> List[str]:
+        """
+        Add lessons learned or documentation snippets in one batch. Returns their ids.
+
+        Ids are content hashes, so re-adding an existing lesson is a no-op.
+        """
+        if not lessons:
+            return []
+        metadatas = metadatas or [{} for _ in lessons]
+        batch = {}
+        for lesson, metadata in zip(lessons, metadatas):
+            batch.setdefault(self.lesson_id(lesson), (lesson, metadata))
+        self.collection.add(
+            documents=[lesson for lesson, _ in batch.values()],
+            # Chroma rejects empty metadata dicts
+            metadatas=[metadata or None for _, metadata in batch.values()],
+            ids=list(batch)
+        )
+        self._stored(list(batch), [lesson for lesson, _ in batch.values()], [m for _, m in batch.values()])
+        print(f"[Knowledge] Added {len(batch)} lesson(s)")
+        return [self.lesson_id(lesson) for lesson in lessons]
 
     def add_lesson(self, lesson: str, metadata: Dict[str, Any] = None):
         """Add a lesson learned or documentation snippet."""
-        if metadata is None:
-            metadata = {}
-            
-        # simple ID gen
-        import uuid
-        doc_id = str(uuid.uuid4())
-        
+        self.add_lessons([lesson], [metadata or {}])
+
+    def ingest_lessons(
+        self,
+        lessons: List[str],
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        max_distance: float = 0.1,
+    ) -> List[str]:
+        """
+        Add only lessons that are new: exact duplicates (by content hash) and
+        near-duplicates (embedding distance <= `max_distance` to a stored
+        lesson or an earlier one in the batch) are skipped.
+
+        Returns the ids of the lessons added.
+        """
+        metadatas = metadatas or [{} for _ in lessons]
+        batch = {}
+        for lesson, metadata in zip(lessons, metadatas):
+            if lesson.strip():
+                batch.setdefault(self.lesson_id(lesson), (lesson, metadata))
+        if not batch:
+            return []
+        existing = set(self.collection.get(ids=list(batch), include=[])["ids"])
+        candidates = [(doc_id, *item) for doc_id, item in batch.items() if doc_id not in existing]
+        if not candidates:
+            return []
+
+        embeddings = np.asarray(self.embedding_function([lesson for _, lesson, _ in candidates]), dtype=np.float32)
+        nearest = {"distances": None}
+        if self.collection.count():
+            nearest = self.collection.query(query_embeddings=list(embeddings), n_results=1, include=["distances"])
+
+        keep = []
+        for i in range(len(candidates)):
+            if nearest["distances"] and nearest["distances"][i] and nearest["distances"][i][0] <= max_distance:
+                continue
+            # Chroma's default space is squared L2
+            if keep and np.min(((embeddings[keep] - embeddings[i]) ** 2).sum(axis=1)) <= max_distance:
+                continue
+            keep.append(i)
+        if not keep:
+            return []
+
+        ids = [candidates[i][0] for i in keep]
         self.collection.add(
-            documents=[lesson],
-            metadatas=[metadata],
-            ids=[doc_id]
+            ids=ids,
+            documents=[candidates[i][1] for i in keep],
+            embeddings=[embeddings[i] for i in keep],
+            metadatas=[candidates[i][2] or None for i in keep],
         )
-        print(f"[Knowledge] Added lesson: {doc_id}")
+        self._stored(ids, [candidates[i][1] for i in keep], [candidates[i][2] for i in keep])
+        print(f"[Knowledge] Ingested {len(ids)} of {len(lessons)} lesson(s)")
+        return ids
+
+    def _stored(self, ids: List[str], lessons: List[str], metadatas: List[Optional[Dict[str, Any]]]):
+        """Invalidate cached results and index new lessons for keyword search."""
+        with self._lock:
+            self._results.clear()
+            if self._keywords is not None:
+                for doc_id, lesson, metadata in zip(ids, lessons, metadatas):
+                    self._keywords.add(doc_id, lesson, metadata)
+
+    def _keyword_index(self) -> BM25Index:
+        """BM25 index over all lessons, loaded from Chroma on first use."""
+        with self._lock:
+            if self._keywords is None:
+                stored = self.collection.get(include=["documents", "metadatas"])
+                index = BM25Index()
+                for doc_id, lesson, metadata in zip(stored["ids"], stored["documents"], stored["metadatas"]):
+                    index.add(doc_id, lesson, metadata)
+                self._keywords = index
+            return self._keywords
+
+    def _embed(self, queries: List[str]) -> List[Any]:
+        """Embed queries, computing only those not cached."""
+        with self._lock:
+            cached = {q: self._embeddings[q] for q in queries if q in self._embeddings}
+        missing = [q for q in dict.fromkeys(queries) if q not in cached]
+        if missing:
+            computed = dict(zip(missing, self.embedding_function(missing)))
+            with self._lock:
+                for query, embedding in computed.items():
+                    self._cache_put(self._embeddings, query, embedding)
+            cached.update(computed)
+        return [cached[q] for q in queries]
+
+    def search_many(
+        self,
+        queries: List[str],
+        n_results: int = 3,
+        filters: Optional[Dict[str, Any]] = None,
+        hybrid: bool = False,
+    ) -> List[List[str]]:
+        """
+        Search for relevant lessons for several queries with a single Chroma query.
+
+        Args:
+            filters: Metadata equality filters (project, sprint, role,
+                ticket_type, source), applied inside Chroma.
+            hybrid: Also rank by BM25 keyword score and fuse both rankings,
+                which favours exact terms (names, error codes) embeddings miss.
+        """
+        where = lesson_filter(filters)
+        variant = (n_results, json.dumps(filters, sort_keys=True, default=str), hybrid)
+        results: Dict[str, List[str]] = {}
+        with self._lock:
+            for query in queries:
+                hit = self._results.get((query, *variant))
+                if hit is not None:
+                    self._results.move_to_end((query, *variant))
+                    results[query] = hit
 
-    def search_lessons(self, query: str, n_results: int = 3) -> List[str]:
+        missing = [q for q in dict.fromkeys(queries) if q not in results]
+        if missing:
+            # Fetch extra vector candidates for the fusion to choose from
+            found = self.collection.query(
+                query_embeddings=self._embed(missing),
+                n_results=n_results * 2 if hybrid else n_results,
+                where=where,
+                include=["documents"],
+            )
+            ids = found["ids"] or [[] for _ in missing]
+            documents = found["documents"] or [[] for _ in missing]
+            for query, doc_ids, docs in zip(missing, ids, documents):
+                if hybrid:
+                    keywords = self._keyword_index()
+                    texts = dict(zip(doc_ids, docs))
+                    keyword_ids = [doc_id for doc_id, _ in keywords.search(query, n_results * 2, filters)]
+                    fused = fuse_rankings([doc_ids, keyword_ids], n_results)
+                    docs = [texts[doc_id] if doc_id in texts else keywords.text(doc_id) for doc_id in fused]
+                else:
+                    docs = docs[:n_results]
+                results[query] = docs
+            with self._lock:
+                for query in missing:
+                    self._cache_put(self._results, (query, *variant), results[query])
+        return [results[q] for q in queries]
+
+    def search_lessons(
+        self,
+        query: str,
+        n_results: int = 3,
+        filters: Optional[Dict[str, Any]] = None,
+        hybrid: bool = False,
+    ) -> List[str]:
         """Search for relevant lessons."""
-        results = self.collection.query(
-            query_texts=[query],
-            n_results=n_results
-        )
-        # Flatten results
-        return results['documents'][0] if results['documents'] else []
+        return self.search_many([query], n_results, filters, hybrid)[0]
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def aadd_lessons(self, lessons: List[str], metadatas: Optional[List[Dict[str, Any]]] = None) -> List[str]:
+        return await self._run(self.add_lessons, lessons, metadatas)
+
+    async def asearch_many(
+        self,
+        queries: List[str],
+        n_results: int = 3,
+        filters: Optional[Dict[str, Any]] = None,
+        hybrid: bool = False,
+    ) -> List[List[str]]:
+        return await self._run(self.search_many, queries, n_results, filters, hybrid)
+
+    async def asearch_lessons(
+        self,
+        query: str,
+        n_results: int = 3,
+        filters: Optional[Dict[str, Any]] = None,
+        hybrid: bool = False,
+    ) -> List[str]:
+        return (await self.asearch_many([query], n_results, filters, hybrid))[0]
+
+    async def aingest_lessons(
+        self,
+        lessons: List[str],
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        max_distance: float = 0.1,
+    ) -> List[str]:
+        return await self._run(self.ingest_lessons, lessons, metadatas, max_distance)
+
+    def close(self):
+        """Drop queued work, wait for the running call, then release the Chroma client."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        if hasattr(self.chroma_client, "close"):
+            self.chroma_client.close()
 
     def save_state(self, state: Dict[str, Any]):
-        """Persist the current state to disk."""
+        """Persist the current state to disk (atomically, with its schema version)."""
         try:
-            # We might need to filter out non-serializable objects if any
-            # For TypedDicts composed of primitives/lists/dicts, json dump is fine.
-            with open(self.state_file, "w") as f:
-                json.dump(state, f, indent=2, default=str)
+            write_snapshot(self.state_file, state, self.serializer)
             print(f"[Knowledge] State saved to {self.state_file}")
         except Exception as e:
             print(f"[Knowledge] Failed to save state: {e}")
 
     def load_state(self) -> Optional[Dict[str, Any]]:
         """Load state from disk."""
-        if os.path.exists(self.state_file):
-            try:
-                with open(self.state_file, "r") as f:
-                    state = json.load(f)
-                print(f"[Knowledge] State loaded from {self.state_file}")
-                return state
-            except Exception as e:
-                print(f"[Knowledge] Failed to load state: {e}")
+        # Fall back to a state.json written before STATE_FORMAT existed
+        legacy = os.path.join(self.data_dir, "state.json")
+        for path, serializer in ((self.state_file, self.serializer), (legacy, SERIALIZERS["json"])):
+            if os.path.exists(path):
+                try:
+                    state = read_snapshot(path, serializer)
+                    print(f"[Knowledge] State loaded from {path}")
+                    return state
+                except Exception as e:
+                    print(f"[Knowledge] Failed to load state: {e}")
         return None
@@ -1,13 +1,69 @@
 import os
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import httpx
 from langchain_openai import ChatOpenAI
 # from langchain_anthropic import ChatAnthropic # Assuming already installed or we add it
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langgraph.config import get_config, get_stream_writer
 from langgraph_scrum.config import config
+from langgraph_scrum.cache import get_response_cache
+from langgraph_scrum.context import count_tokens
+from langgraph_scrum.metrics import get_metrics
+
+# Environment keys holding each provider's credentials
+API_KEY_NAMES = {
+    "openai": "OPENAI_API_KEY",
+    "google": "GOOGLE_API_KEY",
+    "anthropic": "ANTHROPIC_API_KEY",
+}
+
+# LRU of constructed clients, keyed by (provider, model, temperature, api_key).
+# Reusing a client also reuses its HTTP connection pool and TLS sessions.
+_llm_cache: "OrderedDict[Tuple[str, str, float, Optional[str]], BaseChatModel]" = OrderedDict()
+_llm_cache_lock = threading.Lock()
+
+# Keep-alive pools shared by every OpenAI client, whatever the model
+_openai_http_client: Optional[httpx.Client] = None
+_openai_http_async_client: Optional[httpx.AsyncClient] = None
+
+def _openai_http_clients() -> Tuple[httpx.Client, httpx.AsyncClient]:
+    global _openai_http_client, _openai_http_async_client
+    if _openai_http_client is None:
+        limits = httpx.Limits(max_keepalive_connections=20, keepalive_expiry=60)
+        _openai_http_client = httpx.Client(limits=limits)
+        _openai_http_async_client = httpx.AsyncClient(limits=limits)
+    return _openai_http_client, _openai_http_async_client
+
+def clear_llm_cache():
+    """Drop all cached LLM clients (e.g. after credentials change)."""
+    with _llm_cache_lock:
+        _llm_cache.clear()
+
+def _on_config_change(key: str, value: Any):
+    if key.endswith("_API_KEY") or key.startswith(("MODEL_", "FAKE_LLM_")):
+        clear_llm_cache()
+        print(f"[LLM Factory] {key} changed, cleared client cache")
+
+config.subscribe(_on_config_change)
+
+def _resolve_model(agent_config: dict) -> Tuple[str, str, float]:
+    provider = agent_config.get("provider", "anthropic").lower()
+    model_name = agent_config.get("model", "claude-3-5-sonnet-20240620")
+    temperature = float(agent_config.get("temperature", 0.7))
+    return provider, model_name, temperature
 
 def get_llm(agent_config: dict) -> BaseChatModel:
     """
-    Factory to create an LLM instance based on configuration.
+    Get an LLM instance based on configuration.
+
+    Clients are cached per (provider, model, temperature, api key), so repeated
+    node calls reuse an existing client and its open connections.
     
     Args:
         agent_config: Dictionary containing 'provider', 'model', 'temperature', etc.
@@ -15,24 +71,43 @@ def get_llm(agent_config: dict) -> BaseChatModel:
     Returns:
         A LangChain ChatModel instance.
     """
-    provider = agent_config.get("provider", "anthropic").lower()
-    model_name = agent_config.get("model", "claude-3-5-sonnet-20240620")
-    temperature = float(agent_config.get("temperature", 0.7))
-    
+    provider, model_name, temperature = _resolve_model(agent_config)
+    api_key_name = API_KEY_NAMES.get(provider)
+    api_key = config.get(api_key_name) if api_key_name else None
+
+    cache_key = (provider, model_name, temperature, api_key)
+    with _llm_cache_lock:
+        llm = _llm_cache.get(cache_key)
+        if llm is not None:
+            _llm_cache.move_to_end(cache_key)
+            return llm
+
+    llm = _create_llm(provider, model_name, temperature, api_key)
+
+    with _llm_cache_lock:
+        _llm_cache[cache_key] = llm
+        max_size = int(config.get("LLM_CLIENT_CACHE_SIZE", 16))
+        while len(_llm_cache) > max_size:
+            _llm_cache.popitem(last=False)
+    return llm
+
+def _create_llm(provider: str, model_name: str, temperature: float, api_key: Optional[str]) -> BaseChatModel:
+    """Construct a new client for the given provider."""
     print(f"[LLM Factory] Creating {provider} model: {model_name} (temp={temperature})")
     
     if provider == "openai":
-        api_key = config.get("OPENAI_API_KEY")
         if not api_key:
             print("[LLM Factory] Warning: OPENAI_API_KEY not found")
+        http_client, http_async_client = _openai_http_clients()
         return ChatOpenAI(
             model=model_name,
             temperature=temperature,
-            api_key=api_key
+            api_key=api_key,
+            http_client=http_client,
+            http_async_client=http_async_client
         )
         
     elif provider == "google":
-        api_key = config.get("GOOGLE_API_KEY") # We should add this to config/settings
         if not api_key:
             print("[LLM Factory] Warning: GOOGLE_API_KEY not found")
         return ChatGoogleGenerativeAI(
@@ -46,7 +121,6 @@ def get_llm(agent_config: dict) -> BaseChatModel:
         # For now, let's assume we use the standard one
         try:
             from langchain_anthropic import ChatAnthropic
-            api_key = config.get("ANTHROPIC_API_KEY")
             return ChatAnthropic(
                 model=model_name,
                 temperature=temperature,
@@ -56,7 +130,134 @@ def get_llm(agent_config: dict) -> BaseChatModel:
             print("[LLM Factory] langchain-anthropic not installed, falling back to mock/error")
             raise ImportError("Please install langchain-anthropic")
 
+    elif provider in ("fake", "mock"):
+        # Offline deterministic model for benchmarks and tests
+        from langgraph_scrum.fake_llm import FakeChatModel
+        return FakeChatModel(
+            model=model_name,
+            latency=float(config.get("FAKE_LLM_LATENCY", 0.0)),
+            tokens_per_second=float(config.get("FAKE_LLM_TOKENS_PER_SECOND", 0.0)),
+            response_tokens=int(config.get("FAKE_LLM_RESPONSE_TOKENS", 32)),
+        )
+
     else:
         # Fallback or Mock
         print(f"[LLM Factory] Unknown provider {provider}, returning OpenAI default")
         return ChatOpenAI(model="gpt-3.5-turbo", temperature=0)
+
+# Per-provider semaphores, remembered together with the loop they belong to
+_llm_limiters: Dict[str, Tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = {}
+
+def get_llm_limiter(provider: str) -> asyncio.Semaphore:
+    """
+    Shared concurrency limiter for a provider.
+
+    All projects running in this process share one semaphore per provider, so
+    a burst of parallel agents queues locally instead of tripping rate limits.
+    """
+    provider = provider.lower()
+    loop = asyncio.get_running_loop()
+    entry = _llm_limiters.get(provider)
+    if entry is None or entry[0] is not loop:
+        limit = config.get(f"{provider.upper()}_MAX_CONCURRENCY") or config.get("LLM_MAX_CONCURRENCY", 4)
+        entry = (loop, asyncio.Semaphore(int(limit)))
+        _llm_limiters[provider] = entry
+    return entry[1]
+
+def response_cache_enabled(agent_config: dict) -> bool:
+    """Responses are cached when requested explicitly, or by default at temperature 0."""
+    cache = agent_config.get("cache")
+    if cache is not None:
+        return bool(cache)
+    return _resolve_model(agent_config)[2] == 0
+
+def _token_writer(agent_id: Optional[str]) -> Optional[Callable[[str], None]]:
+    """
+    Build a callback that forwards tokens to the graph's custom stream.
+
+    Returns None outside of a graph run, in which case the call is not streamed.
+    """
+    try:
+        writer = get_stream_writer()
+        node = get_config().get("metadata", {}).get("langgraph_node")
+    except RuntimeError:
+        return None
+
+    def emit(content: str):
+        writer({"type": "token", "node": node, "agent_id": agent_id, "content": content})
+    return emit
+
+def _record_call(agent_id: Optional[str], provider: str, model_name: str, messages: List[BaseMessage],
+                 response: BaseMessage, queued_at: float, started_at: float):
+    """Record latency, tokens and cost; tokens are estimated if the provider didn't report them."""
+    usage = getattr(response, "usage_metadata", None) or {}
+    prompt_tokens = usage.get("input_tokens")
+    if prompt_tokens is None:
+        prompt_tokens = sum(count_tokens(str(m.content)) for m in messages)
+    completion_tokens = usage.get("output_tokens")
+    if completion_tokens is None:
+        completion_tokens = count_tokens(str(response.content))
+    get_metrics().record_llm_call(
+        agent_id, provider, model_name,
+        queued=started_at - queued_at,
+        duration=time.perf_counter() - started_at,
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+    )
+
+async def ainvoke_llm(
+    agent_config: dict,
+    messages: List[BaseMessage],
+    agent_id: Optional[str] = None
+) -> BaseMessage:
+    """
+    Invoke the configured LLM without blocking the event loop.
+
+    Inside a graph run the response is streamed, and every chunk is emitted on
+    the custom stream as a `token` event tagged with the node and agent_id.
+    Deterministic calls (see response_cache_enabled) are answered from the
+    on-disk response cache when the same request was seen before.
+
+    Args:
+        agent_config: Agent LLM configuration (see get_llm). Set 'cache' to
+            force the response cache on or off.
+        messages: Prompt messages.
+        agent_id: Agent the call is made for, used to tag streamed tokens.
+
+    Returns:
+        The model response message.
+    """
+    provider, model_name, temperature = _resolve_model(agent_config)
+    emit = _token_writer(agent_id)
+
+    cache = get_response_cache() if response_cache_enabled(agent_config) else None
+    if cache:
+        cache_key = cache.make_key(provider, model_name, temperature, messages)
+        content = await cache.aget(cache_key)
+        if content is not None:
+            if emit:
+                emit(content)
+            return AIMessage(content=content)
+
+    llm = get_llm(agent_config)
+    queued_at = time.perf_counter()
+    async with get_llm_limiter(provider):
+        started_at = time.perf_counter()
+        if emit:
+            response = None
+            async for chunk in llm.astream(messages):
+                if chunk.content:
+                    emit(chunk.text)
+                response = chunk if response is None else response + chunk
+            response = AIMessage(
+                content=response.content if response else "",
+                response_metadata=response.response_metadata if response else {},
+                usage_metadata=response.usage_metadata if response else None
+            )
+        else:
+            response = await llm.ainvoke(messages)
+    _record_call(agent_id, provider, model_name, messages, response, queued_at, started_at)
+
+    if cache and isinstance(response.content, str):
+        await cache.aput(cache_key, response.content)
+    return response
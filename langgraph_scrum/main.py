@@ -1,6 +1,9 @@
+import json
+import asyncio
 import typer
 import uvicorn
 from rich.console import Console
+from rich.table import Table
 
 app = typer.Typer()
 console = Console()
@@ -21,6 +24,34 @@ def server(
         log_level="info"
     )
 
+@app.command()
+def bench(
+    sprints: int = 1,
+    tickets: int = 6,
+    projects: int = 1,
+    workers: int = 4,
+    llm_latency: float = 0.0,
+    tokens_per_second: float = 0.0,
+    as_json: bool = typer.Option(False, "--json", help="Print the raw report")
+):
+    """Benchmark the workflow in-process with the fake LLM provider."""
+    from langgraph_scrum.bench import run_benchmark
+    report = asyncio.run(run_benchmark(sprints, tickets, projects, workers, llm_latency, tokens_per_second))
+    if as_json:
+        print(json.dumps(report, indent=2))
+        return
+
+    table = Table(title="Node latency (ms)")
+    for column in ("node", "count", "mean", "p50", "p95", "max"):
+        table.add_column(column, justify="left" if column == "node" else "right")
+    for name, stats in [*report["nodes"].items(), ("sprint", report["sprint"]), ("loop lag", report["loop_lag"])]:
+        table.add_row(name, str(stats["count"]), *(f"{stats[k]:.1f}" for k in ("mean_ms", "p50_ms", "p95_ms", "max_ms")))
+    console.print(table)
+    console.print(
+        f"{report['tickets_done']} tickets in {report['wall_seconds']:.2f}s "
+        f"({report['tickets_per_second']:.1f}/s), max RSS {report['max_rss_mb']:.0f} MB"
+    )
+
 @app.command()
 def version():
     """Show version."""
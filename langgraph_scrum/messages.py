@@ -0,0 +1,95 @@
+import os
+import json
+import asyncio
+import threading
+from typing import Any, Dict, Iterator, List, Optional
+from langgraph_scrum.config import config
+
+# Role of the message that stands in for compacted history
+SUMMARY_ROLE = "summary"
+
+def _summary_line(message: Dict[str, Any], width: int = 160) -> str:
+    text = " ".join(str(message.get("content", "")).split())
+    if len(text) > width:
+        text = text[:width - 3].rstrip() + "..."
+    return f"- [{message.get('role', 'agent')}] {text}"
+
+def summarize(messages: List[Dict[str, Any]], max_chars: int = 4000) -> Dict[str, Any]:
+    """
+    Fold messages into one summary message: one line per message (its content
+    with whitespace collapsed, cut at 160 characters), newest kept when over
+    `max_chars`. Earlier summaries are folded in line by line.
+    """
+    count, lines = 0, []
+    for message in messages:
+        if message.get("role") == SUMMARY_ROLE:
+            count += message.get("count", 0)
+            lines.extend(line for line in str(message["content"]).splitlines()[1:] if line)
+        else:
+            count += 1
+            lines.append(_summary_line(message))
+    kept, size = [], 0
+    for line in reversed(lines):
+        size += len(line) + 1
+        if size > max_chars:
+            break
+        kept.append(line)
+    header = f"Earlier discussion ({count} messages):"
+    return {"role": SUMMARY_ROLE, "content": "\n".join([header, *reversed(kept)]), "count": count}
+
+def compact_messages(messages: List[Dict[str, Any]], window: int, max_chars: int = 4000) -> List[Dict[str, Any]]:
+    """
+    Keep at most `window` messages: once over it, everything but the newest
+    `window // 2` is replaced by a summary. Halving leaves room to append
+    again before the next compaction, so most updates stay plain appends.
+    """
+    if window <= 0 or len(messages) <= window:
+        return messages
+    keep = max(1, window // 2)
+    return [summarize(messages[:-keep], max_chars), *messages[-keep:]]
+
+def merge_messages(old: Optional[List[Dict[str, Any]]], new: Optional[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Reducer for ScrumState.messages: append, then compact beyond
+    MESSAGE_WINDOW. The full history is kept in the run's MessageArchive.
+    """
+    messages = list(old or []) + list(new or [])
+    return compact_messages(
+        messages,
+        int(config.get("MESSAGE_WINDOW", 100)),
+        int(config.get("MESSAGE_SUMMARY_CHARS", 4000)),
+    )
+
+class MessageArchive:
+    """
+    Append-only JSON-lines log of every message of a run.
+
+    From the event loop use `aappend`, which writes on a worker thread.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def append(self, messages: List[Dict[str, Any]], node: Optional[str] = None):
+        lines = "".join(
+            json.dumps({**message, "node": node} if node else message, default=str) + "\n" for message in messages
+        )
+        with self._lock:
+            self._file.write(lines)
+            self._file.flush()
+
+    async def aappend(self, messages: List[Dict[str, Any]], node: Optional[str] = None):
+        await asyncio.to_thread(self.append, messages, node)
+
+    def read(self) -> Iterator[Dict[str, Any]]:
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
@@ -0,0 +1,186 @@
+import time
+import bisect
+import functools
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Latency histogram buckets in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# USD per million (input, output) tokens, matched by model name prefix.
+# Unknown models are costed at 0.
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-3.5-turbo": (0.50, 1.50),
+    "claude-3-5-haiku": (0.80, 4.00),
+    "claude-3-5-sonnet": (3.00, 15.00),
+    "claude-3-7-sonnet": (3.00, 15.00),
+    "claude-sonnet-4": (3.00, 15.00),
+    "claude-3-opus": (15.00, 75.00),
+    "gemini-1.5-flash": (0.075, 0.30),
+    "gemini-1.5-pro": (1.25, 5.00),
+    "gemini-2.0-flash": (0.10, 0.40),
+}
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """Estimated USD cost of a call; the longest matching prefix wins."""
+    matches = [prefix for prefix in MODEL_PRICES if model.startswith(prefix)]
+    if not matches:
+        return 0.0
+    input_price, output_price = MODEL_PRICES[max(matches, key=len)]
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+def summarize_timings(values: List[float]) -> Dict[str, float]:
+    """Count, mean, p50, p95 and max of durations in seconds, reported in ms."""
+    if not values:
+        return {"count": 0, "mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+    ordered = sorted(values)
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+    return {
+        "count": len(ordered),
+        "mean_ms": sum(ordered) / len(ordered) * 1000,
+        "p50_ms": pick(0.5),
+        "p95_ms": pick(0.95),
+        "max_ms": ordered[-1] * 1000,
+    }
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+def _escape(value: Any) -> str:
+    """Label value escaping required by the Prometheus text format."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(names: Tuple[str, ...], values: Tuple[Any, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Metrics:
+    """
+    In-process counters and latency histograms, rendered in the Prometheus
+    text format. Recording is a dict update under a lock, so it is cheap
+    enough to do on every node and LLM call.
+    """
+
+    # name -> (kind, help, label names)
+    SERIES = {
+        "scrum_node_duration_seconds": ("histogram", "Wall time of graph node executions", ("node",)),
+        "scrum_node_errors_total": ("counter", "Graph node executions that raised", ("node",)),
+        "scrum_llm_duration_seconds": ("histogram", "LLM call latency, excluding queueing", ("agent", "provider", "model")),
+        "scrum_llm_queue_seconds": ("histogram", "Time LLM calls waited for the provider limiter", ("agent", "provider", "model")),
+        "scrum_llm_tokens_total": ("counter", "LLM tokens by kind (prompt/completion)", ("agent", "provider", "model", "kind")),
+        "scrum_llm_cost_usd_total": ("counter", "Estimated LLM cost in USD", ("agent", "provider", "model")),
+        "scrum_loop_lag_seconds": ("histogram", "How late the event loop woke the monitor's heartbeat", ()),
+        "scrum_loop_stalls_total": ("counter", "Event loop stalls by the graph node that was running", ("node",)),
+    }
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series: Dict[str, Dict[Tuple[Any, ...], Any]] = {name: {} for name in self.SERIES}
+
+    def observe(self, name: str, value: float, *labels: Any):
+        with self._lock:
+            series = self._series[name]
+            histogram = series.get(labels)
+            if histogram is None:
+                histogram = series[labels] = Histogram()
+            histogram.observe(value)
+
+    def inc(self, name: str, value: float, *labels: Any):
+        with self._lock:
+            series = self._series[name]
+            series[labels] = series.get(labels, 0) + value
+
+    def record_llm_call(self, agent: Optional[str], provider: str, model: str, queued: float,
+                        duration: float, prompt_tokens: int, completion_tokens: int):
+        labels = (agent or "unknown", provider, model)
+        self.observe("scrum_llm_queue_seconds", queued, *labels)
+        self.observe("scrum_llm_duration_seconds", duration, *labels)
+        self.inc("scrum_llm_tokens_total", prompt_tokens, *labels, "prompt")
+        self.inc("scrum_llm_tokens_total", completion_tokens, *labels, "completion")
+        self.inc("scrum_llm_cost_usd_total", estimate_cost(model, prompt_tokens, completion_tokens), *labels)
+
+    def render(self) -> str:
+        """All series in the Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            for name, (kind, help_text, label_names) in self.SERIES.items():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in sorted(self._series[name].items()):
+                    if kind == "counter":
+                        lines.append(f"{name}{_labels(label_names, labels)} {value}")
+                        continue
+                    cumulative = 0
+                    for bound, count in zip((*BUCKETS, "+Inf"), value.counts):
+                        cumulative += count
+                        le = 'le="%s"' % bound
+                        lines.append(f"{name}_bucket{_labels(label_names, labels, le)} {cumulative}")
+                    lines.append(f"{name}_sum{_labels(label_names, labels)} {value.sum}")
+                    lines.append(f"{name}_count{_labels(label_names, labels)} {value.count}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Compact per-node and per-agent summary for the dashboard."""
+        nodes: Dict[str, Any] = {}
+        agents: Dict[str, Any] = {}
+        with self._lock:
+            for (node,), histogram in self._series["scrum_node_duration_seconds"].items():
+                nodes[node] = {"calls": histogram.count, "total_seconds": histogram.sum,
+                               "mean_seconds": histogram.sum / histogram.count}
+            for (node,), errors in self._series["scrum_node_errors_total"].items():
+                nodes.setdefault(node, {})["errors"] = errors
+
+            def agent(name: str) -> Dict[str, Any]:
+                return agents.setdefault(name, {
+                    "calls": 0, "llm_seconds": 0.0, "queue_seconds": 0.0,
+                    "prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0,
+                })
+            for (name, _, _), histogram in self._series["scrum_llm_duration_seconds"].items():
+                agent(name)["calls"] += histogram.count
+                agent(name)["llm_seconds"] += histogram.sum
+            for (name, _, _), histogram in self._series["scrum_llm_queue_seconds"].items():
+                agent(name)["queue_seconds"] += histogram.sum
+            for (name, _, _, kind), tokens in self._series["scrum_llm_tokens_total"].items():
+                agent(name)[f"{kind}_tokens"] += tokens
+            for (name, _, _), cost in self._series["scrum_llm_cost_usd_total"].items():
+                agent(name)["cost_usd"] += cost
+        return {"nodes": nodes, "agents": agents}
+
+    def reset(self):
+        with self._lock:
+            for series in self._series.values():
+                series.clear()
+
+_metrics = Metrics()
+
+def get_metrics() -> Metrics:
+    return _metrics
+
+def trace_node(name: str, fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap an async graph node so each execution records its wall time."""
+    @functools.wraps(fn)
+    async def traced(*args: Any, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            return await fn(*args, **kwargs)
+        except Exception:
+            _metrics.inc("scrum_node_errors_total", 1, name)
+            raise
+        finally:
+            _metrics.observe("scrum_node_duration_seconds", time.perf_counter() - start, name)
+    return traced
@@ -0,0 +1,153 @@
+import os
+import sys
+import time
+import asyncio
+import sysconfig
+import threading
+import traceback
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+from langgraph_scrum.metrics import get_metrics, summarize_timings
+
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+_LIBRARY_DIRS = tuple({sysconfig.get_paths()[key] for key in ("stdlib", "platstdlib", "purelib", "platlib")})
+# trace_node's wrapper; its `name` local is the node being executed
+_TRACED_QUALNAME = "trace_node.<locals>.traced"
+
+def _is_app_frame(filename: str) -> bool:
+    return filename.startswith(_PACKAGE_DIR) or not filename.startswith(_LIBRARY_DIRS)
+
+def attribute(frame) -> Dict[str, Any]:
+    """
+    Blame a blocked loop thread's stack: the graph node it is executing
+    (from trace_node's frame), the innermost application frame (the node
+    or tool code that blocked) and the innermost frame overall (the
+    blocking call itself).
+    """
+    node = None
+    walk = frame
+    while walk is not None:
+        if walk.f_code.co_qualname == _TRACED_QUALNAME:
+            node = walk.f_locals.get("name")
+            break
+        walk = walk.f_back
+    stack = traceback.extract_stack(frame)
+    site = next((f for f in reversed(stack) if _is_app_frame(f.filename)), stack[-1])
+    def describe(f) -> str:
+        path = os.path.relpath(f.filename, os.path.dirname(_PACKAGE_DIR)) if f.filename.startswith(_PACKAGE_DIR) else f.filename
+        return f"{path}:{f.lineno} in {f.name}"
+    return {
+        "node": node,
+        "location": describe(site),
+        "blocking_call": describe(stack[-1]),
+        "stack": [describe(f) for f in stack[-12:]],
+    }
+
+class LoopMonitor:
+    """
+    Event-loop health monitor.
+
+    A heartbeat task sleeps `interval` seconds at a time and records how late
+    it wakes up (loop lag). A watchdog thread notices when the heartbeat is
+    more than `threshold` overdue, which means a callback is blocking the
+    loop, and captures the loop thread's stack while it is still blocked so
+    the stall can be attributed to the node or tool call responsible.
+    """
+
+    def __init__(self, interval: float = 0.1, threshold: float = 0.25, history: int = 50,
+                 on_stall: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.interval = interval
+        self.threshold = threshold
+        self.on_stall = on_stall
+        self.lags: deque = deque(maxlen=max(1, int(60 / interval))) # about the last minute
+        self.stalls: deque = deque(maxlen=history)
+        self.stall_count = 0
+        self._beat = time.monotonic()
+        self._pending: Optional[Dict[str, Any]] = None
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        """Start monitoring the running loop."""
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+        print(f"[Monitor] Watching the event loop (stalls over {self.threshold * 1000:.0f}ms are reported)")
+
+    async def stop(self):
+        self._stopped.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._watchdog:
+            self._watchdog.join()
+
+    async def _heartbeat(self):
+        loop = asyncio.get_running_loop()
+        metrics = get_metrics()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - start - self.interval)
+            previous, self._beat = self._beat, time.monotonic()
+            stall, self._pending = self._pending, None
+            if stall is not None and stall.pop("beat") != previous:
+                # Captured against an earlier heartbeat; not this stall
+                stall = None
+            self.lags.append(lag)
+            metrics.observe("scrum_loop_lag_seconds", lag)
+            if lag >= self.threshold:
+                self._record(lag, stall)
+
+    def _watch(self):
+        while not self._stopped.wait(self.interval / 2):
+            beat = self._beat
+            if time.monotonic() - beat - self.interval < self.threshold or self._pending is not None:
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is not None:
+                # Picked up by the heartbeat once the loop runs again
+                self._pending = {"beat": beat, "detected_at": time.time(), **attribute(frame)}
+
+    def _record(self, lag: float, stall: Optional[Dict[str, Any]]):
+        if stall is None:
+            # Blocked for less than a watchdog tick: duration only
+            stall = {"detected_at": time.time(), "node": None, "location": None, "blocking_call": None, "stack": []}
+        stall["duration"] = lag
+        self.stalls.append(stall)
+        self.stall_count += 1
+        get_metrics().inc("scrum_loop_stalls_total", 1, stall["node"] or "none")
+        where = f" in node '{stall['node']}'" if stall["node"] else ""
+        at = f" at {stall['location']}" if stall["location"] else ""
+        if stall["blocking_call"] and stall["blocking_call"] != stall["location"]:
+            at += f" (blocked in {stall['blocking_call']})"
+        print(f"[Monitor] Event loop blocked for {lag * 1000:.0f}ms{where}{at}")
+        if self.on_stall:
+            self.on_stall(stall)
+
+    def stats(self, window: float = 60.0) -> Dict[str, Any]:
+        """
+        Recent loop lag, the stall count and the latest stalls, newest first.
+
+        Read from the loop itself, so "degraded" can't mean "blocked right
+        now": it means a stall in the last `window` seconds, or a lag p95
+        above the threshold.
+        """
+        lag = summarize_timings(list(self.lags))
+        since = time.time() - window
+        recent = sum(stall["detected_at"] >= since for stall in self.stalls)
+        return {
+            "lag": lag,
+            "degraded": recent > 0 or lag["p95_ms"] >= self.threshold * 1000,
+            "recent_stalls": recent,
+            "stall_count": self.stall_count,
+            "stalls": list(reversed(self.stalls)),
+        }
@@ -1,37 +1,109 @@
+import asyncio
+from datetime import datetime
+from langchain_core.runnables import RunnableConfig
 from langgraph_scrum.state import ScrumState
+# Imported under another name: nodes receive the run's RunnableConfig as
+# `config` (LangGraph injects it by parameter name)
+from langgraph_scrum.config import config as settings
+from langgraph_scrum.scheduler import plan_dispatch
+from langgraph_scrum.tickets import get_ticket_index
+from langgraph_scrum.nodes.git_agent import get_git_tools
 from langgraph.constants import Send
 
-async def dispatch_node(state: ScrumState) -> dict:
-    """Prepare for dispatching."""
+async def dispatch_node(state: ScrumState, config: RunnableConfig) -> dict:
+    """
+    Assign ready tickets to available agents, up to the parallelism cap, and
+    check each one's branch out in a worktree for the agent to work in.
+    """
     print("--- Development: Dispatching agents ---")
-    return {}
+
+    index = get_ticket_index(state.get("tickets", []))
+    agents = state.get("agents", {})
+    max_parallel = state.get("max_parallel") or int(settings.get("MAX_PARALLEL_AGENTS", 4))
+    plan = plan_dispatch(index, agents, max_parallel, int(settings.get("AGENT_CAPACITY", 1)))
+
+    now = datetime.now().isoformat()
+    started = []
+    updated_agents = dict(agents)
+    for ticket, agent_id in plan:
+        started.append({
+            **ticket, "status": "in_progress", "assigned_to": agent_id,
+            "branch": ticket.get("branch") or f"feature/{ticket['id']}", "updated_at": now,
+        })
+        if agent_id:
+            updated_agents[agent_id] = {**updated_agents[agent_id], "state": "working", "current_ticket": ticket["id"]}
+        print(f"[Scheduler] {ticket['title']} -> {agent_id or 'unassigned'}")
+
+    if not started:
+        return {"phase": "development"}
+    git_tools = get_git_tools(config.get("configurable", {}).get("worktrees_dir"))
+    await git_tools.aprepare_worktrees([t["branch"] for t in started])
+    return {"tickets": started, "agents": updated_agents, "phase": "development"}
 
 async def dispatch_logic(state: ScrumState):
-    """Routing function to dispatch tickets."""
-    tickets = state.get("tickets", [])
-    pending_tickets = [t for t in tickets if t["status"] == "draft"]
-    
-    sends = []
-    for ticket in pending_tickets:
-        sends.append(Send("agent_work", {"ticket": ticket}))
-        
-    return sends 
+    """Routing function: fan out in-progress tickets, or move on to testing."""
+    index = get_ticket_index(state.get("tickets", []))
+    sends = [Send("agent_work", {"ticket": t}) for t in index.with_status("in_progress")]
+    if sends:
+        return sends
+
+    if index.blocked():
+        print(f"[Scheduler] Unschedulable tickets: {index.blocked()} (cycles: {index.cycles()})")
+    return "tester"
 
 async def agent_work(state: dict): # Receives sub-state from Send
     """Simulate agent working on a ticket."""
     ticket = state["ticket"]
     print(f"--- Agent working on ticket: {ticket['title']} ---")
-    
+
     # Simulate work
-    ticket["status"] = "review"
-    
-    return {"completed_tickets": [ticket]} # Return to global state via reducer (conceptually)
+    reviewed = {**ticket, "status": "review", "updated_at": datetime.now().isoformat()}
 
+    return {"tickets": [reviewed], "completed_tickets": [reviewed]}
 
-async def git_merge_node(state: ScrumState) -> ScrumState:
-    """Merge completed branches."""
+
+async def git_merge_node(state: ScrumState, config: RunnableConfig) -> ScrumState:
+    """Merge the branches of reviewed tickets; conflicting ones stay in review."""
     print("--- Git: Merging work ---")
-    
-    # Logic to merge branches
-    
-    return {"pending_merges": []}
+
+    reviewed = get_ticket_index(state.get("tickets", [])).with_status("review")
+    branches = {t["id"]: t.get("branch") or f"feature/{t['id']}" for t in reviewed}
+    git_tools = get_git_tools(config.get("configurable", {}).get("worktrees_dir"))
+    existing = set(await git_tools.alist_branches())
+    # Tickets without a branch have nothing to merge
+    result = await git_tools.amerge_branches([b for b in branches.values() if b in existing])
+    conflicted = {c["branch"]: c for c in result["conflicts"]}
+    # An unchanged conflict keeps its original entry
+    for previous in state.get("conflicts", []):
+        if previous["branch"] in conflicted and previous["files"] == conflicted[previous["branch"]]["files"]:
+            conflicted[previous["branch"]] = previous
+
+    # Merged tickets are done, which unblocks their dependents, and their
+    # agents are free for the next dispatch
+    now = datetime.now().isoformat()
+    merged = [
+        {**t, "status": "done", "branch": branches[t["id"]], "updated_at": now}
+        for t in reviewed if branches[t["id"]] in result["merged"]
+    ]
+    # A ticket whose branch is gone has no work to merge: schedule it again
+    requeued = [
+        {**t, "status": "approved", "assigned_to": None, "branch": None, "updated_at": now}
+        for t in reviewed if branches[t["id"]] not in existing
+    ]
+    for ticket in requeued:
+        print(f"[Git] No branch {branches[ticket['id']]} for {ticket['id']}, rescheduling it")
+    agents = dict(state.get("agents", {}))
+    for ticket in reviewed:
+        agent_id = ticket.get("assigned_to")
+        if agent_id in agents:
+            agents[agent_id] = {**agents[agent_id], "state": "idle", "current_ticket": None}
+    # Their worktrees go back to the pool
+    await asyncio.gather(*(git_tools.aremove_worktree(t["branch"]) for t in merged if t["branch"] in existing))
+
+    return {
+        "tickets": merged + requeued,
+        "completed_tickets": merged,
+        "agents": agents,
+        "pending_merges": list(conflicted),
+        "conflicts": list(conflicted.values()),
+    }
@@ -1,30 +1,38 @@
+from typing import Optional
+from langchain_core.runnables import RunnableConfig
 from langgraph_scrum.state import ScrumState
 from langgraph_scrum.tools.git import GitTools
+from langgraph_scrum.tickets import get_ticket_index
 
-# Global instance for now
-git_tools = GitTools()
+# One instance per worktree root, created on first use so importing the
+# graph does not touch the working directory's repository
+_git_tools = {}
 
-async def git_agent_node(state: ScrumState) -> dict:
+def get_git_tools(worktrees_dir: Optional[str] = None) -> GitTools:
+    tools = _git_tools.get(worktrees_dir)
+    if tools is None:
+        tools = GitTools(worktrees_dir=worktrees_dir)
+        _git_tools[worktrees_dir] = tools
+    return tools
+
+async def git_agent_node(state: ScrumState, config: RunnableConfig) -> dict:
     """Handle Git operations requested by other agents."""
     print("--- Git Agent: Processing requests ---")
     
     # Logic to look for tickets requesting git actions or messy state
     # For now, we sync the branches list to state
     
-    branches = git_tools.list_branches()
+    git_tools = get_git_tools(config.get("configurable", {}).get("worktrees_dir"))
     
     # Auto-create worktrees for active tickets (PROTOTYPE LOGIC)
-    tickets = state.get("tickets", [])
-    active_tickets = [t for t in tickets if t["status"] == "in_progress"]
-    
-    for ticket in active_tickets:
-        if not ticket.get("branch"):
-            # Assign branch if missing
-            branch_name = f"feature/{ticket['id']}"
-            git_tools.create_branch(branch_name)
-            git_tools.create_worktree(branch_name)
-            # Updating ticket in state is complex with reducers in LangGraph 
-            # without emitting a full update or using specific reducer logic.
-            # Here we just perform side effects and return global updates.
+    active_tickets = get_ticket_index(state.get("tickets", [])).with_status("in_progress")
+    # Assign branches where missing; set up concurrently, ref writes are
+    # serialized by the repository lock
+    missing = [f"feature/{ticket['id']}" for ticket in active_tickets if not ticket.get("branch")]
+    if missing:
+        await git_tools.aprepare_worktrees(missing)
+    # Updating ticket in state is complex with reducers in LangGraph 
+    # without emitting a full update or using specific reducer logic.
+    # Here we just perform side effects and return global updates.
             
-    return {"branches": branches}
+    return {"branches": await git_tools.alist_branches()}
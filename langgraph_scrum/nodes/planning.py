@@ -1,10 +1,12 @@
-from langgraph_scrum.llm import get_llm
+from langgraph_scrum.llm import ainvoke_llm
+from langgraph_scrum.context import build_context, context_budget
 from langgraph_scrum.state import ScrumState, Ticket
 from langchain_core.messages import SystemMessage, HumanMessage
+from langchain_core.runnables import RunnableConfig
 import uuid
 from datetime import datetime
 
-async def product_owner_node(state: ScrumState) -> ScrumState:
+async def product_owner_node(state: ScrumState, config: RunnableConfig) -> ScrumState:
     """Analyze requirements and create user stories using configured LLM."""
     print("--- Planning: Product Owner analyzing requirements ---")
     
@@ -13,15 +15,26 @@ async def product_owner_node(state: ScrumState) -> ScrumState:
     po_config = agents.get("product_owner", {}).get("config", {})
     
     try:
-        llm = get_llm(po_config)
-        
         # System prompt from config or default
         system_prompt = po_config.get("role_description", "You are an expert Product Owner. Analyze requirements and break them down.")
+
+        # Lessons from past projects and sprints and relevant discussion, within budget
+        configurable = config.get("configurable", {})
+        context = await build_context(
+            requirements,
+            state.get("messages", []),
+            knowledge=configurable.get("knowledge"),
+            budget=context_budget(po_config),
+            filters=configurable.get("lesson_filters"),
+        )
+        prompt = f"Analyze these requirements: {requirements}"
+        if context:
+            prompt += f"\n\n{context}"
         
-        response = llm.invoke([
+        response = await ainvoke_llm(po_config, [
             SystemMessage(content=system_prompt),
-            HumanMessage(content=f"Analyze these requirements: {requirements}")
-        ])
+            HumanMessage(content=prompt)
+        ], agent_id="product_owner")
         
         content = response.content
         print(f"[Product Owner] Analysis complete (Length: {len(content)})")
@@ -1,20 +1,44 @@
-from langgraph_scrum.state import ScrumState
+from typing import List
+from langgraph_scrum.state import ScrumState, Ticket
 from langgraph.graph import END
 
+def _titles(tickets: List[Ticket]) -> str:
+    return ", ".join(f"'{t.get('title', t['id'])}'" for t in tickets)
+
 async def tester_node(state: ScrumState) -> ScrumState:
     """Run tests on the codebase."""
     print("--- Review: Running tests ---")
-    return {}
+    done = [t for t in state.get("tickets", []) if t.get("status") == "done"]
+    if not done:
+        return {}
+    # Findings go out as messages, which the server harvests as lessons
+    content = f"Tested sprint {state.get('sprint_number', 1)} of {state.get('project_name')}: {_titles(done)}"
+    return {"messages": [{"role": "tester", "content": content}]}
 
 async def reviewer_node(state: ScrumState) -> ScrumState:
     """Review code changes."""
     print("--- Review: Code review ---")
-    return {}
+    findings = []
+    done = [t for t in state.get("tickets", []) if t.get("status") == "done"]
+    if done:
+        changed = sorted({f for t in done for f in t.get("files_changed") or []})
+        findings.append(f"Reviewed {_titles(done)}" + (f" (files: {', '.join(changed)})" if changed else ""))
+    for conflict in state.get("conflicts", []):
+        findings.append(f"Merge conflict on {conflict['branch']} in {', '.join(conflict.get('files') or []) or 'unknown files'}")
+    if not findings:
+        return {}
+    return {"messages": [{"role": "reviewer", "content": ". ".join(findings)}]}
 
 async def sprint_review_node(state: ScrumState) -> ScrumState:
     """Present sprint results and decide next steps."""
     print("--- Review: Sprint Review ---")
-    return {"phase": "review"}
+    tickets = state.get("tickets", [])
+    done = [t for t in tickets if t.get("status") == "done"]
+    unfinished = [t for t in tickets if t.get("status") != "done"]
+    content = f"Sprint {state.get('sprint_number', 1)} review of {state.get('project_name')}: {len(done)} of {len(tickets)} ticket(s) done"
+    if unfinished:
+        content += f"; not finished: {_titles(unfinished)}"
+    return {"phase": "review", "messages": [{"role": "sprint_review", "content": content}]}
 
 async def release_node(state: ScrumState) -> ScrumState:
     """Release to main."""
@@ -0,0 +1,186 @@
+import os
+import re
+import uuid
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from langgraph_scrum.config import config
+from langgraph_scrum.knowledge import KnowledgeManager
+from langgraph_scrum.sync import StateSync
+from langgraph_scrum.tmux import OutputBuffer, _tmux_executor, close_tmux_manager
+
+# Run ids name a data dir, a worktree root and a tmux session: no path
+# separators, dots or colons
+RUN_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+def valid_run_id(run_id: str) -> bool:
+    return isinstance(run_id, str) and RUN_ID_PATTERN.match(run_id) is not None
+
+class Run:
+    """
+    One project execution and the resources isolated to it.
+
+    Each run has its own knowledge data dir, tmux session and git worktree
+    root, and executes on the checkpoint thread named after its id. Starting
+    a run again after it completed moves it to a new thread, "<id>-<n>".
+
+    Lessons go to `lessons`, the knowledge base shared by all runs, so later
+    projects learn from earlier ones; `lesson_filters` (project, sprint, ...)
+    scopes what the run's agents retrieve. Without a shared knowledge base
+    the run's own is used.
+    """
+
+    def __init__(self, run_id: str, data_dir: str, tmux_session: str, worktrees_dir: str,
+                 lessons: Optional[KnowledgeManager] = None):
+        self.run_id = run_id
+        self.thread_id = run_id
+        self.data_dir = data_dir
+        self.tmux_session = tmux_session
+        self.worktrees_dir = worktrees_dir
+        self.knowledge: Optional[KnowledgeManager] = None
+        self.lessons = lessons
+        self.lesson_filters: Optional[Dict[str, Any]] = None
+        self.sync: Optional[StateSync] = None
+        self.task: Optional[asyncio.Task] = None
+        # agent_id -> recent terminal output, replayed to new subscribers
+        self.terminals: Dict[str, OutputBuffer] = {}
+        self.status = "pending"
+        self.error: Optional[str] = None
+        self.created_at = datetime.now().isoformat()
+
+    @property
+    def active(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    def get_knowledge(self) -> KnowledgeManager:
+        """The run's knowledge manager, opened on first use."""
+        if self.knowledge is None:
+            self.knowledge = KnowledgeManager(self.data_dir)
+        return self.knowledge
+
+    @property
+    def lesson_knowledge(self) -> Optional[KnowledgeManager]:
+        """Where the run's lessons are stored and searched."""
+        return self.lessons or self.knowledge
+
+    def close(self):
+        """Release the run's knowledge manager, tmux session and git tools once it has finished."""
+        from langgraph_scrum.nodes import git_agent
+        # Output worth keeping was already captured in self.terminals and the pane logs
+        _tmux_executor.submit(close_tmux_manager, self.tmux_session).result()
+        if self.knowledge:
+            self.knowledge.close()
+            self.knowledge = None
+        tools = git_agent._git_tools.pop(self.worktrees_dir, None)
+        if tools:
+            # Pre-warmed pool checkouts are only useful to this run
+            tools.close(discard=True)
+
+    def graph_config(self) -> Dict[str, Any]:
+        """LangGraph config routing nodes to this run's checkpoint thread and resources."""
+        return {
+            "recursion_limit": int(config.get("GRAPH_RECURSION_LIMIT", 200)),
+            "configurable": {
+                "thread_id": self.thread_id,
+                "run_id": self.run_id,
+                "knowledge": self.lesson_knowledge,
+                "lesson_filters": self.lesson_filters,
+                "tmux_session": self.tmux_session,
+                "worktrees_dir": self.worktrees_dir,
+            }
+        }
+
+    async def checkpoint_snapshot(self, graph) -> Any:
+        """
+        The latest state of the run's checkpoint thread, to resume from.
+
+        A completed thread (state but no next step) is not restarted in place,
+        since the reducers would merge a fresh initial state into the old one;
+        the run moves on to the next unfinished "<id>-<n>" thread instead.
+        """
+        generation = 0
+        snapshot = await graph.aget_state(self.graph_config())
+        while snapshot.values and not snapshot.next:
+            generation += 1
+            self.thread_id = f"{self.run_id}-{generation}"
+            snapshot = await graph.aget_state(self.graph_config())
+        if generation:
+            print(f"[Runs] Run '{self.run_id}' already completed, starting thread '{self.thread_id}'")
+        return snapshot
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "run_id": self.run_id,
+            "thread_id": self.thread_id,
+            "status": self.status,
+            "error": self.error,
+            "created_at": self.created_at,
+            "tmux_session": self.tmux_session,
+            "phase": self.sync.state.get("phase") if self.sync else None,
+        }
+
+class RunRegistry:
+    """Runs known to this server process, keyed by run (thread) id."""
+
+    def __init__(self, base_dir: str = ".langgraph/data", worktrees_root: str = ".worktrees",
+                 session_prefix: str = "scrum-agents", max_finished: Optional[int] = None):
+        self.base_dir = os.path.abspath(base_dir)
+        self.worktrees_root = os.path.abspath(worktrees_root)
+        self.session_prefix = session_prefix
+        self.max_finished = int(config.get("MAX_FINISHED_RUNS", 20)) if max_finished is None else max_finished
+        # Shared lesson knowledge base handed to every run; set by the server
+        self.lessons: Optional[KnowledgeManager] = None
+        self.runs: Dict[str, Run] = {}
+
+    def create(self, run_id: Optional[str] = None) -> Run:
+        """
+        Register a run, reusing the id of a finished one to resume it.
+
+        Raises:
+            ValueError: If the id is not a valid run id (see RUN_ID_PATTERN),
+                or a run with this id is still executing.
+        """
+        run_id = run_id or uuid.uuid4().hex[:8]
+        if not valid_run_id(run_id):
+            raise ValueError(f"Invalid run id {run_id!r}: use 1-64 letters, digits, '_' or '-'")
+        existing = self.runs.get(run_id)
+        if existing and existing.active:
+            raise ValueError(f"Run {run_id} is already running")
+
+        run = Run(
+            run_id,
+            data_dir=os.path.join(self.base_dir, "runs", run_id),
+            tmux_session=f"{self.session_prefix}-{run_id}",
+            worktrees_dir=os.path.join(self.worktrees_root, run_id),
+            lessons=self.lessons,
+        )
+        self.runs.pop(run_id, None)
+        self.runs[run_id] = run
+        self.evict()
+        return run
+
+    def evict(self) -> List[str]:
+        """Forget the oldest finished runs beyond `max_finished`."""
+        finished = [run_id for run_id, run in self.runs.items() if run.task is not None and not run.active]
+        evicted = finished[:max(0, len(finished) - self.max_finished)]
+        for run_id in evicted:
+            del self.runs[run_id]
+        return evicted
+
+    def get(self, run_id: str) -> Optional[Run]:
+        return self.runs.get(run_id)
+
+    def list(self) -> List[Dict[str, Any]]:
+        return [run.info() for run in self.runs.values()]
+
+    async def cancel(self, run_id: str) -> bool:
+        """Cancel a running run. Returns False if it is unknown or not running."""
+        run = self.runs.get(run_id)
+        if not run or not run.active:
+            return False
+        run.task.cancel()
+        try:
+            await run.task
+        except (asyncio.CancelledError, Exception):
+            pass
+        return True
@@ -0,0 +1,66 @@
+from typing import Any, Dict, List, Optional, Tuple
+from langgraph_scrum.state import Ticket
+from langgraph_scrum.tickets import TicketIndex
+
+def agent_role(agent_id: str, agent: Dict[str, Any]) -> str:
+    return agent.get("role") or agent.get("config", {}).get("role") or agent_id
+
+def is_worker(agent_id: str, agent: Dict[str, Any]) -> bool:
+    """Whether the agent implements tickets (developers do, planners don't)."""
+    return "developer" in agent_role(agent_id, agent)
+
+def agent_capacity(agent: Dict[str, Any], default: int = 1) -> int:
+    """Number of tickets an agent may work on at once."""
+    return max(1, int(agent.get("config", {}).get("capacity", default)))
+
+def plan_dispatch(
+    index: TicketIndex,
+    agents: Dict[str, Any],
+    max_parallel: int,
+    default_capacity: int = 1,
+) -> List[Tuple[Ticket, Optional[str]]]:
+    """
+    Pick the ready tickets to start now and the agent for each.
+
+    Ready tickets are taken longest remaining dependency chain first, so the
+    critical path is never left waiting behind work that unblocks nothing.
+    At most `max_parallel` tickets are in progress at once, and no agent gets
+    more than its capacity. Tickets pre-assigned to an agent wait for that
+    agent; the rest go to the least loaded developer. Without any developer
+    agents, tickets are started unassigned (still bounded by `max_parallel`).
+
+    Returns:
+        (ticket, agent_id) pairs, agent_id None for unassigned work.
+    """
+    in_progress = index.by_status.get("in_progress", set())
+    slots = max_parallel - len(in_progress)
+
+    workers = [aid for aid, agent in agents.items() if is_worker(aid, agent)]
+    free = {
+        aid: agent_capacity(agents[aid], default_capacity)
+        - len(index.by_assignee.get(aid, set()) & in_progress)
+        for aid in workers
+    }
+
+    plan = []
+    for ticket in index.ready_tickets():
+        if slots <= 0:
+            break
+        if not workers:
+            plan.append((ticket, None))
+            slots -= 1
+            continue
+
+        wanted = ticket.get("assigned_to")
+        if wanted in free:
+            candidates = [wanted] if free[wanted] > 0 else []
+        else:
+            candidates = [aid for aid in workers if free[aid] > 0]
+        if not candidates:
+            continue
+
+        agent_id = max(candidates, key=lambda aid: free[aid])
+        free[agent_id] -= 1
+        slots -= 1
+        plan.append((ticket, agent_id))
+    return plan
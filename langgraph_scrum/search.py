@@ -0,0 +1,86 @@
+import re
+import math
+from collections import Counter
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+# Lesson metadata fields that searches can filter on
+FILTER_FIELDS = ("project", "sprint", "role", "ticket_type", "source")
+
+def tokenize(text: str) -> List[str]:
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+def lesson_filter(filters: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Chroma `where` clause for equality filters on lesson metadata,
+    e.g. {"project": "todo", "ticket_type": "feature"}.
+    """
+    if not filters:
+        return None
+    unknown = set(filters) - set(FILTER_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown lesson filter(s): {sorted(unknown)}")
+    clauses = [{key: {"$eq": value}} for key, value in filters.items() if value is not None]
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+def matches(metadata: Optional[Dict[str, Any]], filters: Optional[Dict[str, Any]]) -> bool:
+    if not filters:
+        return True
+    metadata = metadata or {}
+    return all(value is None or metadata.get(key) == value for key, value in filters.items())
+
+class BM25Index:
+    """In-process Okapi BM25 keyword index over lesson documents."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        # id -> (term counts, length, text, metadata)
+        self.docs: Dict[str, Tuple[Counter, int, str, Dict[str, Any]]] = {}
+        self.postings: Dict[str, Set[str]] = {}
+        self.total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def add(self, doc_id: str, text: str, metadata: Optional[Dict[str, Any]] = None):
+        if doc_id in self.docs:
+            return
+        terms = Counter(tokenize(text))
+        length = sum(terms.values())
+        self.docs[doc_id] = (terms, length, text, metadata or {})
+        self.total_length += length
+        for term in terms:
+            self.postings.setdefault(term, set()).add(doc_id)
+
+    def text(self, doc_id: str) -> str:
+        return self.docs[doc_id][2]
+
+    def search(self, query: str, n: int, filters: Optional[Dict[str, Any]] = None) -> List[Tuple[str, float]]:
+        """Top `n` (id, score) pairs among documents matching `filters`."""
+        if not self.docs:
+            return []
+        avg_length = self.total_length / len(self.docs)
+        scores: Dict[str, float] = {}
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (len(self.docs) - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id in postings:
+                terms, length, _, metadata = self.docs[doc_id]
+                if not matches(metadata, filters):
+                    continue
+                tf = terms[term]
+                norm = tf * (self.k1 + 1) / (tf + self.k1 * (1 - self.b + self.b * length / avg_length))
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * norm
+        return sorted(scores.items(), key=lambda item: -item[1])[:n]
+
+def fuse_rankings(rankings: List[List[str]], n: int, k: int = 60) -> List[str]:
+    """Reciprocal rank fusion of several ranked id lists."""
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(scores, key=lambda doc_id: -scores[doc_id])[:n]
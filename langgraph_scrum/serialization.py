@@ -0,0 +1,90 @@
+import os
+import tempfile
+import orjson
+import ormsgpack
+from typing import Any, Dict, Optional
+from langgraph_scrum.config import config
+
+# Version of the snapshot layout written by write_snapshot; bump it when the
+# shape of ScrumState changes incompatibly
+SCHEMA_VERSION = 1
+
+def _default(obj: Any) -> Any:
+    """Encode the few non-native types state may hold; refuse anything else."""
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj, key=str)
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+    raise TypeError(f"Can't serialize {type(obj).__name__}")
+
+class JsonSerializer:
+    """Compact UTF-8 JSON."""
+    name = "json"
+    extension = ".json"
+
+    def dumps(self, obj: Any) -> bytes:
+        return orjson.dumps(obj, default=_default)
+
+    def loads(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+class MsgpackSerializer:
+    """MessagePack: smaller and faster than JSON, for disk."""
+    name = "msgpack"
+    extension = ".msgpack"
+
+    def dumps(self, obj: Any) -> bytes:
+        return ormsgpack.packb(obj, default=_default)
+
+    def loads(self, data: bytes) -> Any:
+        return ormsgpack.unpackb(data)
+
+SERIALIZERS = {serializer.name: serializer for serializer in (JsonSerializer(), MsgpackSerializer())}
+
+def get_serializer(name: Optional[str] = None):
+    """Serializer by name; defaults to STATE_FORMAT."""
+    name = name or config.get("STATE_FORMAT", "msgpack")
+    if name not in SERIALIZERS:
+        raise ValueError(f"Unknown serialization format '{name}' (expected one of {sorted(SERIALIZERS)})")
+    return SERIALIZERS[name]
+
+def encode_message(message: Dict[str, Any]) -> str:
+    """Wire encoding for WebSocket messages: compact JSON text."""
+    return orjson.dumps(message, default=_default).decode("utf-8")
+
+def atomic_write(path: str, data: bytes):
+    """Write `data` to a temp file next to `path`, then rename it into place."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.basename(path))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def write_snapshot(path: str, state: Dict[str, Any], serializer=None):
+    """Atomically persist `state` with its schema version."""
+    serializer = serializer or get_serializer()
+    atomic_write(path, serializer.dumps({"schema_version": SCHEMA_VERSION, "state": state}))
+
+def read_snapshot(path: str, serializer=None) -> Dict[str, Any]:
+    """
+    Load a state snapshot written by write_snapshot.
+
+    Plain JSON state files from before versioning are read as version 0.
+    Snapshots from a newer schema raise ValueError.
+    """
+    serializer = serializer or get_serializer()
+    with open(path, "rb") as f:
+        data = serializer.loads(f.read())
+    if not isinstance(data, dict) or "schema_version" not in data:
+        return data
+    if data["schema_version"] > SCHEMA_VERSION:
+        raise ValueError(
+            f"State snapshot {path} has schema version {data['schema_version']}, newer than {SCHEMA_VERSION}"
+        )
+    return data["state"]
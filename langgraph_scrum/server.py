@@ -1,67 +1,113 @@
 import asyncio
+import os
 import json
+from typing import Optional
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse
 from contextlib import asynccontextmanager
 from langgraph_scrum.graph import create_workflow
 from langgraph_scrum.state import ScrumState
 
-from langgraph_scrum.tmux import get_tmux_manager
+from langgraph_scrum.tmux import OutputBuffer, PaneStream, TmuxManager, aget_tmux_manager, run_tmux
 from langgraph_scrum.knowledge import KnowledgeManager
 from langgraph_scrum.config import config
+from langgraph_scrum.cache import configure_response_cache
+from langgraph_scrum.checkpoint import open_checkpointer
+from langgraph_scrum.sync import StateSync
+from langgraph_scrum.runs import Run, RunRegistry, valid_run_id
+from langgraph_scrum.search import lesson_filter
+from langgraph_scrum.connections import ConnectionManager
+from langgraph_scrum.tickets import get_ticket_index
+from langgraph_scrum.ingest import LessonIngestor, harvest_lessons
+from langgraph_scrum.messages import MessageArchive
+from langgraph_scrum.metrics import get_metrics
+from langgraph_scrum.monitor import LoopMonitor
 
-# Compile the graph
+# Nodes after which the ticket schedule is re-broadcast
+SCHEDULING_NODES = {"architect", "dispatch", "git_merge"}
+
+# Compile the graph (recompiled with a durable checkpointer on startup)
 graph_app = create_workflow()
 
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: list[WebSocket] = []
+registry = RunRegistry()
+
+def resync_run(run_id: Optional[str], seq: int) -> list:
+    """
+    State updates a client watching `run_id` missed after `seq`, tagged with
+    the run like live broadcasts (clients reset on a run_id change).
+    """
+    run = registry.get(run_id) if run_id else None
+    if not run or not run.sync:
+        return []
+    return [{**message, "run_id": run_id} for message in run.sync.since(seq)]
 
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
+manager = ConnectionManager(
+    resync=resync_run,
+    max_queue=int(config.get("WS_QUEUE_SIZE", 256)),
+    policy=config.get("WS_SLOW_CLIENT_POLICY", "coalesce"),
+    send_timeout=float(config.get("WS_SEND_TIMEOUT", 5.0)),
+)
+knowledge = None # Shared knowledge (lessons, response cache, checkpoints); runs get their own for state
+checkpointer = None # Global checkpointer reference, one thread per run
 
-    def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+async def publish_metrics():
+    """Push a metrics snapshot to subscribed clients every METRICS_INTERVAL seconds."""
+    while True:
+        await asyncio.sleep(float(config.get("METRICS_INTERVAL", 5.0)))
+        if manager.subscribers("metrics"):
+            manager.publish("metrics", {"type": "metrics", **get_metrics().snapshot()})
 
-    async def broadcast(self, message: dict):
-        for connection in self.active_connections:
-            await connection.send_json(message)
+def report_stall(stall: dict):
+    """Tell metrics subscribers the event loop was blocked, and by what."""
+    if manager.subscribers("metrics"):
+        manager.publish("metrics", {"type": "loop_stall", **stall})
 
-manager = ConnectionManager()
-tmux = None  # Global tmux reference
-knowledge = None # Global knowledge reference
+monitor = LoopMonitor(
+    interval=float(config.get("LOOP_MONITOR_INTERVAL", 0.1)),
+    threshold=float(config.get("LOOP_STALL_SECONDS", 0.25)),
+    on_stall=report_stall,
+)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    global tmux, knowledge
+    global knowledge, checkpointer, graph_app, registry
     try:
         # Initialize Knowledge
         knowledge = KnowledgeManager()
-        
-        # Initialize Tmux
-        tmux = get_tmux_manager()
-        print("[Server] Tmux Manager initialized")
-        # Pre-create standard agent windows
-        tmux.load_layout(["product_owner", "architect", "ui_developer", "backend_developer", "git_agent"])
+        configure_response_cache(knowledge.data_dir)
+        # Load the embedding model now rather than on the first lesson search
+        knowledge.warm_up()
+        # Per-run data dirs live under the shared one
+        registry.base_dir = knowledge.data_dir
+        registry.lessons = knowledge
+
+        # Persist every super-step so projects can resume from their last checkpoint
+        checkpointer = await open_checkpointer(knowledge.checkpoint_file)
+        graph_app = create_workflow(checkpointer=checkpointer)
+        print(f"[Server] Checkpointing to {knowledge.checkpoint_file}")
     except Exception as e:
         print(f"[Server] Failed to initialize: {e}")
         import traceback
         traceback.print_exc()
     
+    metrics_task = asyncio.create_task(publish_metrics())
+    monitor.start()
+
     yield
     
     # Shutdown
     print("[Server] Shutting down")
+    metrics_task.cancel()
+    await monitor.stop()
+    for run_id in list(registry.runs):
+        await registry.cancel(run_id)
     if knowledge:
-        # We need to capture the *current* state to save it.
-        # But here in lifespan we don't strictly have access to the *latest* graph state 
-        # unless we stored it globally.
-        # For this prototype, we'll assume the graph runner updates a global or we save periodically.
-        # Ideally, we'd have a 'save_state' triggered by graph updates.
-        pass
+        knowledge.close()
+    if checkpointer:
+        # Every super-step is already committed; just release the connection
+        await checkpointer.conn.close()
 
 app = FastAPI(lifespan=lifespan)
 
@@ -75,22 +121,120 @@ async def websocket_endpoint(websocket: WebSocket):
             
             # Handle incoming commands
             if message.get("type") == "start_project":
+                # A new run, or a resume of a finished/interrupted one by thread_id
+                if message.get("thread_id") is not None and not valid_run_id(message["thread_id"]):
+                    manager.send(websocket, {
+                        "type": "error",
+                        "message": "thread_id must be 1-64 letters, digits, '_' or '-'",
+                        "code": "invalid_run_id"
+                    })
+                    continue
+                try:
+                    # Optional scope for the lessons agents retrieve, e.g. {"project": "todo"}
+                    lesson_filter(message.get("lesson_filters"))
+                except (ValueError, TypeError, AttributeError) as e:
+                    manager.send(websocket, {"type": "error", "message": str(e), "code": "invalid_filters"})
+                    continue
+                try:
+                    run = registry.create(message.get("thread_id"))
+                except ValueError as e:
+                    manager.send(websocket, {"type": "error", "message": str(e), "code": "run_active"})
+                    continue
+                run.lesson_filters = message.get("lesson_filters")
+                manager.watch(websocket, run.run_id)
                 # Start graph execution in background
-                asyncio.create_task(run_graph(message, websocket))
+                run.task = asyncio.create_task(run_graph(run, message))
             
+            elif message.get("type") == "sync":
+                # Client (re)connected: send what it missed since its last seq
+                run_id = message.get("run_id") or manager.watching(websocket)
+                manager.watch(websocket, run_id, int(message.get("since", -1)))
+
+            elif message.get("type") == "list_runs":
+                manager.send(websocket, {"type": "runs", "runs": registry.list()})
+
+            elif message.get("type") == "cancel_run":
+                run_id = message.get("run_id")
+                if not await registry.cancel(run_id):
+                    manager.send(websocket, {
+                        "type": "error",
+                        "message": f"No active run {run_id}",
+                        "code": "unknown_run"
+                    })
+
+            elif message.get("type") == "subscribe_terminal":
+                # Output arrives with the run's events; send what came before
+                run_id = message.get("run_id") or manager.watching(websocket)
+                run = registry.get(run_id) if run_id else None
+                agent_id = message.get("agent_id")
+                if run and agent_id in run.terminals:
+                    manager.send(websocket, {
+                        "type": "terminal_output",
+                        "agent_id": agent_id,
+                        "data": run.terminals[agent_id].text(),
+                        "history": True,
+                        "run_id": run.run_id
+                    })
+
+            elif message.get("type") in ("subscribe_metrics", "unsubscribe_metrics"):
+                manager.subscribe(websocket, "metrics", message["type"] == "subscribe_metrics")
+                if message["type"] == "subscribe_metrics":
+                    manager.send(websocket, {"type": "metrics", **get_metrics().snapshot()})
+
             elif message.get("type") == "update_config":
                 # Update configuration
                 new_config = message.get("config", {})
                 config.update(new_config)
                 print(f"[Server] Configuration updated: {list(new_config.keys())}")
                 # Acknowledge
-                await websocket.send_json({"type": "config_updated", "config": new_config})
+                manager.send(websocket, {"type": "config_updated", "config": new_config})
                 
     except WebSocketDisconnect:
         manager.disconnect(websocket)
 
-async def run_graph(init_data: dict, websocket: WebSocket):
-    """Run the LangGraph workflow."""
+async def _prepare_tmux(run: Run, agent_ids: list) -> Optional[TmuxManager]:
+    """Create the run's tmux session with a window per agent."""
+    try:
+        tmux = await aget_tmux_manager(run.tmux_session)
+        await tmux.aload_layout(agent_ids)
+        return tmux
+    except Exception as e:
+        print(f"[Server] Tmux unavailable for run {run.run_id}: {e}")
+        return None
+
+async def _forward_terminal(run: Run, agent_id: str, stream: PaneStream):
+    """Broadcast an agent's new terminal output as it is written."""
+    buffer = run.terminals[agent_id]
+    async for data in stream:
+        buffer.append(data)
+        manager.broadcast({"type": "terminal_output", "agent_id": agent_id, "data": data}, run.run_id)
+
+async def _stream_terminals(run: Run, tmux: TmuxManager, agent_ids: list) -> list:
+    """Pipe each agent's pane to a log under the run's data dir and forward it."""
+    log_dir = os.path.join(run.data_dir, "terminals")
+    tasks = []
+    for agent_id in agent_ids:
+        try:
+            stream = await tmux.astream_pane(agent_id, log_dir)
+        except Exception as e:
+            print(f"[Server] Can't stream terminal of {agent_id}: {e}")
+            continue
+        run.terminals[agent_id] = OutputBuffer(int(config.get("TERMINAL_BUFFER_CHARS", 65536)))
+        tasks.append(asyncio.create_task(_forward_terminal(run, agent_id, stream)))
+    return tasks
+
+async def _stop_terminals(run: Run, tmux: Optional[TmuxManager], tasks: list):
+    for task in tasks:
+        task.cancel()
+    if tmux:
+        for agent_id in run.terminals:
+            try:
+                await run_tmux(tmux.unpipe_pane, agent_id)
+            except Exception as e:
+                print(f"[Server] Can't stop terminal of {agent_id}: {e}")
+
+async def run_graph(run: Run, init_data: dict):
+    """Run the LangGraph workflow for one project."""
     concept = init_data.get("concept", "New Project")
     # Parse requested agents which is now a list of dicts: {id, name, config: {...}}
     requested_agents_list = init_data.get("agents", [])
@@ -110,6 +254,7 @@ async def run_graph(init_data: dict, websocket: WebSocket):
                 "state": "idle",
                 "current_ticket": None,
                 "name": agent_def.get("name"),
+                "role": agent_def.get("role", aid),
                 "config": agent_def.get("config", {})
             }
         
@@ -120,67 +265,132 @@ async def run_graph(init_data: dict, websocket: WebSocket):
             "architect": {"state": "idle", "config": {}}
          }
 
-    # Load state if exists
-    state_data = None
-    if knowledge:
-        state_data = knowledge.load_state()
-        
-    if state_data:
-        initial_state = state_data
-        print("[Server] Resuming project from saved state")
-    else:
-        initial_state = ScrumState(
-            project_name="My Project",
-            requirements=concept,
-            phase="planning",
-            tickets=[],
-            active_tickets={},
-            completed_tickets=[],
-            agents=requested_agents,
-            branches=[],
-            pending_merges=[],
-            conflicts=[],
-            sprint_number=1,
-            messages=[]
-        )
+    run.status = "running"
+    manager.broadcast({"type": "run_status", **run.info()})
+    ingestor = None
+    archive = None
+    tmux = None
+    terminal_tasks = []
+    try:
+        # Each run executes on its own checkpoint thread, with isolated resources
+        await asyncio.to_thread(run.get_knowledge)
+        tmux = await _prepare_tmux(run, list(requested_agents))
+        if tmux:
+            terminal_tasks = await _stream_terminals(run, tmux, list(requested_agents))
+        run_config = run.graph_config()
+
+        # Resume from the last checkpoint if the thread was interrupted; a
+        # completed run starts over on a new thread
+        graph_input = None
+        snapshot = None
+        if graph_app.checkpointer:
+            snapshot = await run.checkpoint_snapshot(graph_app)
+            run_config = run.graph_config()
+
+        if snapshot and snapshot.next:
+            initial_state = snapshot.values
+            print(f"[Server] Resuming run '{run.run_id}' at {list(snapshot.next)}")
+        else:
+            initial_state = ScrumState(
+                project_name="My Project",
+                requirements=concept,
+                phase="planning",
+                tickets=[],
+                active_tickets={},
+                completed_tickets=[],
+                agents=requested_agents,
+                max_parallel=int(init_data.get("max_parallel") or config.get("MAX_PARALLEL_AGENTS", 4)),
+                branches=[],
+                pending_merges=[],
+                conflicts=[],
+                sprint_number=1,
+                messages=[]
+            )
+            graph_input = initial_state
     
-    await manager.broadcast({"type": "state_update", "state": initial_state})
+        run.sync = StateSync(initial_state)
+        # Lessons from finished tickets and reviews are stored in the background
+        ingestor = LessonIngestor(run.lesson_knowledge)
+        ingestor.start()
+        # State only keeps a window of messages; every message goes here
+        archive = await asyncio.to_thread(MessageArchive, os.path.join(run.data_dir, "messages.jsonl"))
+        manager.broadcast(run.sync.snapshot(), run.run_id)
     
-    # Stream events from graph
-    async for event in graph_app.astream(initial_state):
-        # Broadcast state updates to dashboard
-        for node, update in event.items():
-            # For demo, just broadcast simple update
-            await manager.broadcast({
-                "type": "state_update", 
-                "node": node,
-                "data": str(update)[:200] + "..." 
-            })
-            
-            # Save state update (In a real app, merge update into full state first)
-            # 'update' is a partial state dict. To save *full* state, we'd need to maintain it.
-            # For now, we will just print that we *would* save.
-            # To fix this properly, we need to accumulate state or fetch it from graph.
-            # graph.astream yields the *update*.
-            
-            # Use 'get_state' equivalent or accumulate manually?
-            # StateGraph doesn't easily expose full state in astream loops without using Checkpointer.
-            # Since we didn't set up Checkpointer yet, we'll skip *full* persistence on every step 
-            # for this immediate prototype, or just try to persist the *update* as a checkpoint.
-            
-            # Re-read full state is hard here without checkpointer.
-            # Hack: Just save the initial state for now to prove file creation works? 
-            # Or better: We assume 'update' is the full state for simple nodes? (No, it's partial)
-            
-            pass
+        # Stream events from graph: node updates, the merged state after each
+        # step, and custom events (LLM tokens).
+        # With a checkpointer each super-step is persisted before the next one starts.
+        pending_nodes = []
+        pending_keys = set()
+        async for mode, event in graph_app.astream(
+            graph_input, run_config, stream_mode=["updates", "values", "custom"], durability="sync"
+        ):
+            if mode == "custom":
+                # Forward incremental output (e.g. {"type": "token", ...}) as-is
+                manager.broadcast(event, run.run_id)
 
-    # Save at end (if loop finishes, which it might not)
-    if knowledge:
-        knowledge.save_state(initial_state) # Saving initial just to test file creation
+            elif mode == "updates":
+                for node, update in event.items():
+                    if update:
+                        ingestor.submit(harvest_lessons(update, run.sync.state))
+                        if update.get("messages"):
+                            await archive.aappend(update["messages"], node)
+                        for conflict in update.get("conflicts") or []:
+                            if conflict not in run.sync.state.get("conflicts", []):
+                                manager.broadcast({"type": "conflict_detected", **conflict}, run.run_id)
+                        # Wait for the merged state of this step to compute the delta
+                        pending_nodes.append(node)
+                        pending_keys.update(update)
+                    else:
+                        # Nothing written, so no merged state follows
+                        manager.broadcast(run.sync.update(None, [node]), run.run_id)
+
+            elif pending_nodes:
+                # Broadcast only what changed in the authoritative merged state
+                manager.broadcast(run.sync.update(event, pending_nodes, pending_keys), run.run_id)
+                if SCHEDULING_NODES.intersection(pending_nodes):
+                    # Ready set and critical path after tickets were started or finished
+                    summary = get_ticket_index(event.get("tickets", [])).summary()
+                    manager.broadcast({"type": "schedule", **summary}, run.run_id)
+                pending_nodes = []
+                pending_keys = set()
+
+        # Persist the final merged state as a versioned snapshot
+        await asyncio.to_thread(run.knowledge.save_state, run.sync.state)
+        run.status = "completed"
+    except asyncio.CancelledError:
+        run.status = "cancelled"
+        raise
+    except Exception as e:
+        run.status = "failed"
+        run.error = str(e)
+        print(f"[Server] Run {run.run_id} failed: {e}")
+        import traceback
+        traceback.print_exc()
+    finally:
+        if ingestor:
+            await ingestor.close()
+        if archive:
+            await asyncio.to_thread(archive.close)
+        await _stop_terminals(run, tmux, terminal_tasks)
+        # Knowledge manager, git tools and pooled worktrees of this run
+        await asyncio.to_thread(run.close)
+        registry.evict()
+        manager.broadcast({"type": "run_status", **run.info()})
 
 # Mount static files (Dashboard build)
 # app.mount("/", StaticFiles(directory="langgraph_scrum/static", html=True), name="static")
 
+@app.get("/metrics")
+async def metrics():
+    """Node, LLM latency, token and cost metrics in the Prometheus text format."""
+    return PlainTextResponse(get_metrics().render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/health")
+async def health():
+    """Event-loop health: recent lag percentiles and the latest stalls with their cause."""
+    loop = monitor.stats()
+    return {"status": "degraded" if loop["degraded"] else "ok", "loop": loop}
+
 @app.get("/")
 async def root():
     return {"message": "LangGraph Scrum Server Running. Connect via WebSocket at /ws"}
@@ -1,10 +1,69 @@
-from typing import TypedDict, List, Dict, Optional, Literal, Any, Annotated
+from typing import TypedDict, List, Dict, Optional, Literal, Any, Annotated, Iterable, NotRequired
 from datetime import datetime
 import operator
+import copy
+from langgraph_scrum.messages import merge_messages
 
-# Reducer for lists to allow append behavior
-def add_tickets(old: List[Any], new: List[Any]) -> List[Any]:
-    return old + new
+class TicketList(list):
+    """
+    List of tickets with an id -> position map, so a new revision of a
+    ticket replaces the old one in place instead of being appended.
+
+    Also keeps the ticket index (see tickets.py) up to date once built.
+    Copies and checkpoints are plain lists.
+    """
+
+    def __init__(self, tickets: Iterable[Any] = ()):
+        super().__init__()
+        self._positions: Dict[str, int] = {}
+        self._index = None
+        self.upsert(tickets)
+
+    def upsert(self, tickets: Iterable[Any]):
+        for ticket in tickets:
+            position = self._positions.get(ticket["id"])
+            if position is None:
+                self._positions[ticket["id"]] = len(self)
+                self.append(ticket)
+            else:
+                self[position] = ticket
+            if self._index is not None:
+                self._index.apply(ticket)
+
+    def merged(self, tickets: Iterable[Any]) -> "TicketList":
+        """
+        A new TicketList with `tickets` upserted, leaving this one unchanged:
+        checkpoints still hold it by reference. The index moves to the new
+        list; this one builds a fresh index if asked again.
+        """
+        result = TicketList.__new__(TicketList)
+        list.__init__(result, self)
+        result._positions = dict(self._positions)
+        result._index, self._index = self._index, None
+        result.upsert(tickets)
+        return result
+
+    @property
+    def index(self):
+        """TicketIndex over the current tickets, built on first use."""
+        if self._index is None:
+            from langgraph_scrum.tickets import TicketIndex
+            self._index = TicketIndex(self)
+        return self._index
+
+    def __deepcopy__(self, memo):
+        return copy.deepcopy(list(self), memo)
+
+# Reducer merging ticket revisions by id. Returns a new list (a shallow copy,
+# tickets themselves are shared) and never changes `old`, which earlier
+# checkpoints may still reference; the ticket index is carried over rather
+# than rebuilt.
+def merge_tickets(old: List[Any], new: List[Any]) -> List[Any]:
+    if isinstance(old, TicketList):
+        return old.merged(new or [])
+    tickets = TicketList(old or [])
+    tickets.upsert(new or [])
+    return tickets
 
 class Ticket(TypedDict):
     id: str
@@ -18,6 +77,7 @@ class Ticket(TypedDict):
     files_changed: List[str]
     created_at: str
     updated_at: str
+    estimate: NotRequired[float]  # Relative effort for critical-path estimates (default 1)
 
 class AgentStatus(TypedDict):
     agent_id: str
@@ -44,12 +104,13 @@ class ScrumState(TypedDict):
     
     # Execution
     # Using reducers for lists that might be updated in parallel or incrementally
-    tickets: Annotated[List[Ticket], add_tickets] 
+    tickets: Annotated[List[Ticket], merge_tickets]
     active_tickets: Dict[str, Ticket]
-    completed_tickets: Annotated[List[Ticket], add_tickets]
+    completed_tickets: Annotated[List[Ticket], merge_tickets]
     
     # Team
     agents: Dict[str, AgentStatus]
+    max_parallel: int  # Max tickets in progress at once
     
     # Git
     branches: List[str]
@@ -59,5 +120,6 @@ class ScrumState(TypedDict):
     # Sprint
     sprint_number: int
     
-    # Internal messaging
-    messages: List[Dict[str, Any]]
+    # Internal messaging: a rolling window, older messages compacted into a
+    # summary (the full history is archived per run, see messages.py)
+    messages: Annotated[List[Dict[str, Any]], merge_messages]
@@ -0,0 +1,121 @@
+import copy
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional
+
+def _escape(token: Any) -> str:
+    """Escape a JSON pointer token (RFC 6901)."""
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+def diff_state(old: Any, new: Any, path: str = "") -> List[Dict[str, Any]]:
+    """
+    Compute JSON-patch style operations (RFC 6902 add/remove/replace) turning
+    `old` into `new`.
+
+    Dicts are diffed per key. Lists that only grew become `add` ops on `/-`,
+    lists of equal length are diffed per index, anything else is replaced.
+    """
+    if old == new:
+        return []
+
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops = []
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in new.items():
+            child = f"{path}/{_escape(key)}"
+            if key not in old:
+                ops.append({"op": "add", "path": child, "value": value})
+            else:
+                ops.extend(diff_state(old[key], value, child))
+        return ops
+
+    if isinstance(old, list) and isinstance(new, list):
+        if len(new) > len(old) and new[:len(old)] == old:
+            return [{"op": "add", "path": f"{path}/-", "value": v} for v in new[len(old):]]
+        if len(new) == len(old):
+            ops = []
+            for i, (a, b) in enumerate(zip(old, new)):
+                ops.extend(diff_state(a, b, f"{path}/{i}"))
+            return ops
+
+    return [{"op": "replace", "path": path, "value": new}]
+
+class StateSync:
+    """
+    Authoritative merged state of a run, published as numbered deltas.
+
+    Every `state_update` message carries a `seq` that increases by one. The
+    last `history` deltas are kept so a reconnecting client can catch up from
+    its last seen `seq`; older clients get a fresh snapshot instead.
+    """
+
+    def __init__(self, state: Dict[str, Any], history: int = 512):
+        # Deep copy: nodes may mutate dicts that are still part of the state
+        self.state = copy.deepcopy(state)
+        self.seq = 0
+        self._log: deque = deque(maxlen=history)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Full state message at the current sequence number."""
+        return {"type": "state_update", "seq": self.seq, "state": self.state}
+
+    def update(self, new_state: Optional[Dict[str, Any]], nodes: List[str],
+               keys: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Record the state after a step and return the delta message for it.
+
+        Only the top-level keys that changed are copied, so a step costs in
+        proportion to what it wrote rather than to the whole state.
+
+        Args:
+            new_state: Full merged state, or None if the nodes wrote nothing.
+            nodes: Nodes that ran in the step.
+            keys: State keys the nodes' updates wrote; when given, only these
+                are diffed. Defaults to every key.
+        """
+        ops = []
+        if new_state is not None:
+            wanted = None if keys is None else set(keys)
+            # Keys only disappear in a full diff; updates can't delete keys
+            removed = [key for key in self.state if key not in new_state] if wanted is None else []
+            ops.extend({"op": "remove", "path": f"/{_escape(key)}"} for key in removed)
+            changed = {}
+            for key in new_state:
+                if wanted is not None and key not in wanted:
+                    continue
+                path = f"/{_escape(key)}"
+                if key not in self.state:
+                    key_ops = [{"op": "add", "path": path, "value": new_state[key]}]
+                else:
+                    key_ops = diff_state(self.state[key], new_state[key], path)
+                if key_ops:
+                    ops.extend(key_ops)
+                    changed[key] = copy.deepcopy(new_state[key])
+            if changed or removed:
+                # A new top-level dict: snapshots already handed out stay as they were
+                state = {key: value for key, value in self.state.items() if key not in removed}
+                state.update(changed)
+                self.state = state
+        self.seq += 1
+        message = {
+            "type": "state_update",
+            "seq": self.seq,
+            "node": nodes[0] if nodes else None,
+            "nodes": nodes,
+            "ops": ops,
+        }
+        self._log.append(message)
+        return message
+
+    def since(self, seq: int) -> List[Dict[str, Any]]:
+        """
+        Messages a client that has seen up to `seq` needs to catch up.
+
+        Returns the missed deltas when they are still retained, else a snapshot.
+        """
+        if seq == self.seq:
+            return []
+        if seq < self.seq and self._log and self._log[0]["seq"] <= seq + 1:
+            return [m for m in self._log if m["seq"] > seq]
+        return [self.snapshot()]
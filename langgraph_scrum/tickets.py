@@ -0,0 +1,238 @@
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
+from langgraph_scrum.state import Ticket, TicketList
+
+# Ticket statuses the scheduler may hand to an agent
+SCHEDULABLE = ("draft", "approved")
+
+class TicketIndex:
+    """
+    Current tickets indexed by id, status and assignee, with their dependency DAG.
+
+    Tickets are applied one revision at a time; each revision updates the
+    indexes and the count of unfinished dependencies of the ticket, so the
+    ready set (schedulable tickets whose dependencies are all done) is
+    maintained incrementally instead of rescanned.
+
+    Dependencies on unknown ids count as unfinished until such a ticket
+    arrives and is done. Cycles and critical-path estimates are computed on
+    demand and cached until the index changes.
+    """
+
+    def __init__(self, tickets: Iterable[Ticket] = ()):
+        self.by_id: "OrderedDict[str, Ticket]" = OrderedDict()
+        self._position: Dict[str, int] = {}
+        self.by_status: Dict[str, Set[str]] = {}
+        self.by_assignee: Dict[Optional[str], Set[str]] = {}
+        self.dependents: Dict[str, Set[str]] = {}
+        self.unmet: Dict[str, int] = {}
+        self.ready: Set[str] = set()
+        self._analysis: Optional[Dict[str, Any]] = None
+        for ticket in tickets:
+            self.apply(ticket)
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+    def __contains__(self, ticket_id: str) -> bool:
+        return ticket_id in self.by_id
+
+    def get(self, ticket_id: str) -> Optional[Ticket]:
+        return self.by_id.get(ticket_id)
+
+    def is_done(self, ticket_id: str) -> bool:
+        ticket = self.by_id.get(ticket_id)
+        return ticket is not None and ticket["status"] == "done"
+
+    def with_status(self, *statuses: str) -> List[Ticket]:
+        """Tickets in any of the given statuses, in creation order."""
+        ids = set().union(*(self.by_status.get(s, ()) for s in statuses))
+        return [self.by_id[tid] for tid in sorted(ids, key=self._position.__getitem__)]
+
+    def assigned_to(self, agent_id: Optional[str]) -> List[Ticket]:
+        ids = self.by_assignee.get(agent_id, ())
+        return [self.by_id[tid] for tid in sorted(ids, key=self._position.__getitem__)]
+
+    def apply(self, ticket: Ticket):
+        """Add a ticket or replace it with a newer revision."""
+        tid = ticket["id"]
+        old = self.by_id.get(tid)
+        if old is ticket:
+            return
+        self._analysis = None
+        was_done = old is not None and old["status"] == "done"
+
+        if old is not None:
+            self.by_status[old["status"]].discard(tid)
+            self.by_assignee[old.get("assigned_to")].discard(tid)
+            if list(old.get("dependencies", [])) != list(ticket.get("dependencies", [])):
+                for dep in old.get("dependencies", []):
+                    self.dependents.get(dep, set()).discard(tid)
+                old = None
+        if old is None:
+            deps = ticket.get("dependencies", [])
+            for dep in deps:
+                self.dependents.setdefault(dep, set()).add(tid)
+            self.unmet[tid] = sum(1 for dep in deps if not self.is_done(dep))
+
+        self.by_id[tid] = ticket
+        self._position.setdefault(tid, len(self._position))
+        self.by_status.setdefault(ticket["status"], set()).add(tid)
+        self.by_assignee.setdefault(ticket.get("assigned_to"), set()).add(tid)
+        self._refresh(tid)
+
+        is_done = ticket["status"] == "done"
+        if is_done != was_done:
+            for child in self.dependents.get(tid, ()):
+                if child in self.unmet:
+                    self.unmet[child] += -1 if is_done else 1
+                    self._refresh(child)
+
+    def _refresh(self, tid: str):
+        ticket = self.by_id.get(tid)
+        if ticket and ticket["status"] in SCHEDULABLE and self.unmet[tid] == 0:
+            self.ready.add(tid)
+        else:
+            self.ready.discard(tid)
+
+    def ready_tickets(self) -> List[Ticket]:
+        """Ready tickets, those on the longest remaining chain first."""
+        if not self.ready:
+            return []
+        tail = self._analyze()["tail"]
+        ids = sorted(self.ready, key=lambda tid: (-tail.get(tid, 0), self._position[tid]))
+        return [self.by_id[tid] for tid in ids]
+
+    def cycles(self) -> List[List[str]]:
+        """Groups of unfinished tickets that depend on each other."""
+        return self._analyze()["cycles"]
+
+    def blocked(self) -> List[str]:
+        """Unfinished tickets that can never become ready (cycles or missing dependencies)."""
+        return self._analyze()["blocked"]
+
+    def critical_path(self) -> Dict[str, Any]:
+        """
+        Longest chain of unfinished work, weighted by ticket `estimate` (default 1).
+
+        This bounds the remaining sprint time however many agents there are.
+        """
+        analysis = self._analyze()
+        return {"length": analysis["length"], "tickets": analysis["path"]}
+
+    def summary(self) -> Dict[str, Any]:
+        """Schedule overview for the dashboard."""
+        return {
+            "counts": {status: len(ids) for status, ids in self.by_status.items() if ids},
+            "ready": [t["id"] for t in self.ready_tickets()],
+            "critical_path": self.critical_path(),
+            "blocked": self.blocked(),
+            "cycles": self.cycles(),
+        }
+
+    def _analyze(self) -> Dict[str, Any]:
+        """Topologically order unfinished tickets and compute longest remaining chains."""
+        if self._analysis is not None:
+            return self._analysis
+
+        remaining = [tid for tid, t in self.by_id.items() if t["status"] != "done"]
+        pending = set(remaining)
+        indegree = {
+            tid: sum(1 for dep in self.by_id[tid].get("dependencies", []) if dep in pending)
+            for tid in remaining
+        }
+        # A dependency that is neither done nor pending never will be
+        missing = {
+            tid for tid in remaining
+            if any(dep not in self.by_id for dep in self.by_id[tid].get("dependencies", []))
+        }
+
+        order = []
+        queue = [tid for tid in remaining if indegree[tid] == 0]
+        while queue:
+            tid = queue.pop()
+            order.append(tid)
+            for child in self.dependents.get(tid, ()):
+                if child in indegree:
+                    indegree[child] -= 1
+                    if indegree[child] == 0:
+                        queue.append(child)
+
+        # Tickets Kahn's algorithm never reached are on a cycle or downstream
+        # of one; peel off the ones with no dependent left to find the cycles
+        in_cycle = pending.difference(order)
+        stuck = set(in_cycle)
+        changed = True
+        while changed:
+            changed = False
+            for tid in list(in_cycle):
+                if not any(child in in_cycle for child in self.dependents.get(tid, ())):
+                    in_cycle.discard(tid)
+                    changed = True
+        cycles = self._components(in_cycle)
+
+        # Longest chain starting at each ticket, in reverse topological order
+        tail: Dict[str, float] = {}
+        nxt: Dict[str, Optional[str]] = {}
+        for tid in reversed(order):
+            best, best_child = 0.0, None
+            for child in self.dependents.get(tid, ()):
+                if tail.get(child, 0) > best:
+                    best, best_child = tail[child], child
+            tail[tid] = float(self.by_id[tid].get("estimate", 1)) + best
+            nxt[tid] = best_child
+
+        path = []
+        start = max(tail, key=lambda tid: tail[tid], default=None)
+        while start is not None:
+            path.append(start)
+            start = nxt[start]
+
+        # Anything downstream of a cycle or missing dependency is stuck too
+        blocked = stuck | missing
+        stack = list(blocked)
+        while stack:
+            for child in self.dependents.get(stack.pop(), ()):
+                if child in pending and child not in blocked:
+                    blocked.add(child)
+                    stack.append(child)
+
+        self._analysis = {
+            "tail": tail,
+            "path": path,
+            "length": tail[path[0]] if path else 0.0,
+            "cycles": cycles,
+            "blocked": [tid for tid in self.by_id if tid in blocked],
+        }
+        return self._analysis
+
+    def _components(self, ids: Set[str]) -> List[List[str]]:
+        """Split tickets on cycles into groups connected by dependencies."""
+        groups = []
+        seen: Set[str] = set()
+        for tid in self.by_id:
+            if tid not in ids or tid in seen:
+                continue
+            group, stack = [], [tid]
+            seen.add(tid)
+            while stack:
+                node = stack.pop()
+                group.append(node)
+                neighbours = set(self.by_id[node].get("dependencies", [])) | self.dependents.get(node, set())
+                for other in neighbours:
+                    if other in ids and other not in seen:
+                        seen.add(other)
+                        stack.append(other)
+            groups.append(sorted(group))
+        return groups
+
+def get_ticket_index(tickets: Sequence[Ticket]) -> TicketIndex:
+    """
+    Index for a `tickets` channel value.
+
+    The channel's TicketList keeps its index up to date as revisions are
+    merged, so it is only built once per run; plain lists get a new index.
+    """
+    if isinstance(tickets, TicketList):
+        return tickets.index
+    return TicketIndex(tickets)
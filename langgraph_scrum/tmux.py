@@ -1,12 +1,42 @@
 import libtmux
 import os
-import shutil
-from typing import Optional, List
+import time
+import codecs
+import shlex
+import asyncio
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, List
+from libtmux.exc import LibTmuxException
+from langgraph_scrum.config import config
+
+# tmux commands are subprocesses; run them on one dedicated thread so callers
+# on the event loop never block on a fork
+_tmux_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tmux")
+
+async def run_tmux(fn: Callable[..., Any], *args: Any) -> Any:
+    """Run a blocking tmux call on the tmux executor."""
+    return await asyncio.get_running_loop().run_in_executor(_tmux_executor, fn, *args)
 
 class TmuxManager:
-    def __init__(self, session_name: str = "scrum-agents"):
+    """
+    Agent windows in one tmux session.
+
+    Window name -> pane id lookups go through a cached index, refreshed with a
+    single `list-panes` call when older than `index_ttl` seconds or when tmux
+    reports a pane missing. Commands address panes by id and several can be
+    sent in one tmux invocation (see `run_batch`).
+    """
+
+    def __init__(self, session_name: str = "scrum-agents", socket_name: Optional[str] = None,
+                 index_ttl: Optional[float] = None):
         self.session_name = session_name
-        self.server = libtmux.Server()
+        self.server = libtmux.Server(socket_name=socket_name or config.get("TMUX_SOCKET"))
+        self.index_ttl = index_ttl if index_ttl is not None else float(config.get("TMUX_INDEX_TTL", 5.0))
+        self._panes: Dict[str, str] = {}
+        self._indexed_at = 0.0
+        self._lock = threading.RLock()
         self.session = self.ensure_session()
 
     def ensure_session(self) -> libtmux.Session:
@@ -18,7 +48,7 @@ class TmuxManager:
                 if s.session_name == self.session_name:
                     session = s
                     break
-            
+
             if not session:
                 session = self.server.new_session(session_name=self.session_name, detach=True)
                 print(f"[Tmux] Created new session: {self.session_name}")
@@ -29,52 +59,230 @@ class TmuxManager:
             print(f"[Tmux] Error ensuring session: {e}")
             raise
 
+    def kill_session(self):
+        """Kill the session and every agent window in it."""
+        try:
+            # "=" matches the session name exactly, not as a prefix
+            self._cmd("kill-session", "-t", f"={self.session_name}")
+            print(f"[Tmux] Killed session: {self.session_name}")
+        except LibTmuxException as e:
+            print(f"[Tmux] Error killing session {self.session_name}: {e}")
+        with self._lock:
+            self._panes = {}
+            self._indexed_at = 0.0
+
+    def _cmd(self, *args: str) -> List[str]:
+        result = self.server.cmd(*args)
+        if result.stderr:
+            raise LibTmuxException(" ".join(result.stderr))
+        return result.stdout
+
+    def run_batch(self, commands: List[List[str]]) -> List[str]:
+        """Run several tmux commands in one tmux process."""
+        args: List[str] = []
+        for command in commands:
+            if args:
+                args.append(";")
+            args.extend(command)
+        return self._cmd(*args) if args else []
+
+    def refresh_index(self):
+        """Reload the window name -> pane id index with one tmux call."""
+        lines = self._cmd("list-panes", "-s", "-t", self.session_name, "-F", "#{window_name}\t#{pane_id}")
+        panes: Dict[str, str] = {}
+        for line in lines:
+            window_name, _, pane_id = line.partition("\t")
+            # First pane of each window
+            panes.setdefault(window_name, pane_id)
+        with self._lock:
+            self._panes = panes
+            self._indexed_at = time.monotonic()
+
+    def _pane_id(self, window_name: str, create: bool = True) -> Optional[str]:
+        with self._lock:
+            if time.monotonic() - self._indexed_at > self.index_ttl:
+                self.refresh_index()
+            pane_id = self._panes.get(window_name)
+            if pane_id is None and create:
+                pane_id = self._cmd(
+                    "new-window", "-d", "-P", "-F", "#{pane_id}", "-t", f"{self.session_name}:", "-n", window_name
+                )[0]
+                self._panes[window_name] = pane_id
+                print(f"[Tmux] Created window: {window_name}")
+            return pane_id
+
+    def _on_pane(self, window_name: str, command: Callable[[str], List[List[str]]]) -> List[str]:
+        """Run commands built for the window's pane, re-resolving it once if it vanished."""
+        try:
+            return self.run_batch(command(self._pane_id(window_name)))
+        except LibTmuxException as e:
+            if "can't find" not in str(e):
+                raise
+            with self._lock:
+                self._indexed_at = 0.0
+            return self.run_batch(command(self._pane_id(window_name)))
+
     def get_or_create_window(self, window_name: str) -> libtmux.Window:
         """Get a window by name or create it if it doesn't exist."""
-        window = None
-        for w in self.session.windows:
-            if w.window_name == window_name:
-                window = w
-                break
-                
-        if not window:
-            window = self.session.new_window(window_name=window_name, attach=False)
-            print(f"[Tmux] Created window: {window_name}")
-        return window
+        return self.get_pane(window_name).window
 
     def get_pane(self, window_name: str) -> Optional[libtmux.Pane]:
         """Get the first pane of a window."""
-        window = self.get_or_create_window(window_name)
-        if window:
-            return window.panes[0]
-        return None
+        pane_id = self._pane_id(window_name)
+        return libtmux.Pane.from_pane_id(server=self.server, pane_id=pane_id) if pane_id else None
+
+    @staticmethod
+    def _keys(pane_id: str, cmd: str, enter: bool) -> List[List[str]]:
+        commands = [["send-keys", "-t", pane_id, "-l", cmd]]
+        if enter:
+            commands.append(["send-keys", "-t", pane_id, "Enter"])
+        return commands
 
     def send_keys(self, window_name: str, cmd: str, enter: bool = True):
         """Send keys/commands to a specific window's pane."""
-        pane = self.get_pane(window_name)
-        if pane:
-            pane.send_keys(cmd, enter=enter)
+        self._on_pane(window_name, lambda pane_id: self._keys(pane_id, cmd, enter))
+
+    def send_many(self, commands: Dict[str, str], enter: bool = True):
+        """Send a command to each of several windows in one tmux call."""
+        batch: List[List[str]] = []
+        for window_name, cmd in commands.items():
+            batch.extend(self._keys(self._pane_id(window_name), cmd, enter))
+        self.run_batch(batch)
 
     def read_pane(self, window_name: str, lines: int = 50) -> List[str]:
         """Read the last N lines from a pane."""
-        pane = self.get_pane(window_name)
-        if pane:
-            # capture_pane returns a list of strings (lines) or a single string depending on version/args.
-            # We treat it as list of lines. 
-            # Note: start=-lines reads the last 'lines' lines.
-            return pane.capture_pane(start=-lines)
-        return []
+        return self._on_pane(window_name, lambda pane_id: [["capture-pane", "-p", "-t", pane_id, "-S", str(-lines)]])
 
     def load_layout(self, agent_roles: List[str]):
         """Pre-create windows for all expected agents."""
-        for role in agent_roles:
-            self.get_or_create_window(role)
+        self.refresh_index()
+        missing = [role for role in dict.fromkeys(agent_roles) if role not in self._panes]
+        self.run_batch([
+            ["new-window", "-d", "-t", f"{self.session_name}:", "-n", role] for role in missing
+        ])
+        if missing:
+            print(f"[Tmux] Created windows: {missing}")
+            self.refresh_index()
+
+    # Async variants, run on the tmux executor
+
+    async def asend_keys(self, window_name: str, cmd: str, enter: bool = True):
+        await run_tmux(self.send_keys, window_name, cmd, enter)
+
+    async def asend_many(self, commands: Dict[str, str], enter: bool = True):
+        await run_tmux(self.send_many, commands, enter)
+
+    async def aread_pane(self, window_name: str, lines: int = 50) -> List[str]:
+        return await run_tmux(self.read_pane, window_name, lines)
 
-# Global instance pattern for simplicity in this prototype
-_tmux_manager_instance = None
+    async def aload_layout(self, agent_roles: List[str]):
+        await run_tmux(self.load_layout, agent_roles)
+
+    def pipe_pane(self, window_name: str, path: str):
+        """Append everything the window's pane prints to `path`."""
+        command = f"cat >> {shlex.quote(path)}"
+        self._on_pane(window_name, lambda pane_id: [["pipe-pane", "-t", pane_id, command]])
+
+    def unpipe_pane(self, window_name: str):
+        pane_id = self._pane_id(window_name, create=False)
+        if pane_id:
+            self._cmd("pipe-pane", "-t", pane_id)
+
+    async def astream_pane(self, window_name: str, log_dir: str) -> "PaneStream":
+        """
+        Start piping a pane to `log_dir/<window>.log` and return a stream of
+        its new output.
+        """
+        path = os.path.join(log_dir, f"{window_name}.log")
+
+        def prepare() -> int:
+            os.makedirs(log_dir, exist_ok=True)
+            # Only output from now on; earlier runs' transcript stays in the file
+            open(path, "a").close()
+            return os.path.getsize(path)
+
+        stream = PaneStream(path, offset=await asyncio.to_thread(prepare))
+        await run_tmux(self.pipe_pane, window_name, path)
+        return stream
+
+class PaneStream:
+    """
+    Async iterator over text appended to a pane's log file.
+
+    Tracks its read offset, so each chunk is only the new output and nothing
+    that scrolled past the visible screen is lost.
+    """
+
+    def __init__(self, path: str, offset: int = 0, poll_interval: Optional[float] = None,
+                 max_chunk: int = 64 * 1024):
+        self.path = path
+        self.offset = offset
+        self.poll_interval = poll_interval or float(config.get("TERMINAL_POLL_SECONDS", 0.2))
+        self.max_chunk = max_chunk
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    def read_new(self) -> str:
+        """New output since the last read ('' if none)."""
+        try:
+            if os.stat(self.path).st_size <= self.offset:
+                return ""
+            with open(self.path, "rb") as f:
+                f.seek(self.offset)
+                data = f.read(self.max_chunk)
+        except FileNotFoundError:
+            return ""
+        self.offset += len(data)
+        return self._decoder.decode(data)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> str:
+        while True:
+            # File I/O off the event loop; not on the tmux executor, which
+            # would queue polls behind tmux commands
+            data = await asyncio.to_thread(self.read_new)
+            if data:
+                return data
+            await asyncio.sleep(self.poll_interval)
+
+class OutputBuffer:
+    """Most recent output of one agent, bounded to `max_chars`."""
+
+    def __init__(self, max_chars: int = 64 * 1024):
+        self.max_chars = max_chars
+        self.chunks: deque = deque()
+        self.size = 0
+
+    def append(self, data: str):
+        self.chunks.append(data)
+        self.size += len(data)
+        while self.size > self.max_chars and len(self.chunks) > 1:
+            self.size -= len(self.chunks.popleft())
+        if self.size > self.max_chars:
+            # A single oversized chunk keeps only its tail
+            self.chunks[0] = self.chunks[0][-self.max_chars:]
+            self.size = len(self.chunks[0])
+
+    def text(self) -> str:
+        return "".join(self.chunks)
+
+# One manager per tmux session; each run gets its own session
+_tmux_managers = {}
 
 def get_tmux_manager(session_name: str = "scrum-agents") -> TmuxManager:
-    global _tmux_manager_instance
-    if _tmux_manager_instance is None:
-        _tmux_manager_instance = TmuxManager(session_name)
-    return _tmux_manager_instance
+    manager = _tmux_managers.get(session_name)
+    if manager is None:
+        manager = TmuxManager(session_name)
+        _tmux_managers[session_name] = manager
+    return manager
+
+def close_tmux_manager(session_name: str):
+    """Kill a session and forget its manager. Runs on the tmux executor."""
+    manager = _tmux_managers.pop(session_name, None)
+    if manager is not None:
+        manager.kill_session()
+
+async def aget_tmux_manager(session_name: str = "scrum-agents") -> TmuxManager:
+    """get_tmux_manager on the tmux executor (creating a session forks tmux)."""
+    return await run_tmux(get_tmux_manager, session_name)
@@ -1,14 +1,226 @@
 import os
+import time
+import asyncio
 import git
 from git import Repo
 import shutil
-from typing import List, Optional
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+from langgraph_scrum.config import config
+from langgraph_scrum.tools.merge import MergeEngine
+
+# One lock per repository for operations that write refs or the shared
+# .git directory (branches, merges, adding/removing worktrees). Reads and
+# work inside a single worktree don't take it.
+_repo_locks: Dict[str, threading.RLock] = {}
+_repo_locks_guard = threading.Lock()
+
+def repo_lock(repo_path: str) -> threading.RLock:
+    with _repo_locks_guard:
+        return _repo_locks.setdefault(os.path.abspath(repo_path), threading.RLock())
+
+# Messages git prints when another process holds one of its lock files
+_LOCK_ERRORS = ("index.lock", ".lock': File exists", "cannot lock ref", "Unable to create")
+
+def retry_on_lock(fn: Callable[..., Any], *args: Any, attempts: Optional[int] = None, delay: float = 0.05) -> Any:
+    """Call `fn`, retrying with backoff while git reports lock contention."""
+    attempts = attempts or int(config.get("GIT_LOCK_RETRIES", 5))
+    for attempt in range(attempts):
+        try:
+            return fn(*args)
+        except git.GitCommandError as e:
+            if attempt == attempts - 1 or not any(marker in str(e) for marker in _LOCK_ERRORS):
+                raise
+            print(f"[Git] Repository locked, retrying: {e.command}")
+            time.sleep(delay * 2 ** attempt)
+
+class WorktreePool:
+    """
+    Pre-created worktrees that are re-pointed to ticket branches.
+
+    `git worktree add` per ticket is a full checkout; a pooled slot only needs
+    a checkout of the files that differ. Idle slots are detached at the base
+    commit; `acquire` checks a branch out in one, `release` cleans it and puts
+    it back. A background thread refills the pool to `size` idle slots; slots
+    beyond that are kept for bursts and reclaimed, least recently used first,
+    once idle for more than `max_idle` seconds.
+    """
+
+    def __init__(self, repo: Repo, root: str, size: int = 2, max_idle: float = 600.0, base: str = "HEAD"):
+        self.repo = repo
+        self.repo_lock = repo_lock(repo.working_tree_dir)
+        self.root = root
+        self.size = size
+        self.max_idle = max_idle
+        # Resolved in the main repository: inside a slot, HEAD is whatever
+        # branch the slot last had checked out
+        self.base = repo.commit(base).hexsha
+        self._lock = threading.Lock()
+        # slot path -> last released (monotonic), least recently used first
+        self._idle: "OrderedDict[str, float]" = OrderedDict()
+        self._leased: Dict[str, str] = {}
+        self._counter = 0
+        self._refilling: Optional[Future] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="worktree-pool")
+        os.makedirs(self.root, exist_ok=True)
+        self._adopt()
+
+    def _adopt(self):
+        """Reuse slots left on disk by a previous process."""
+        with self.repo_lock:
+            self.repo.git.worktree("prune")
+        registered = {
+            line[len("worktree "):] for line in self.repo.git.worktree("list", "--porcelain").splitlines()
+            if line.startswith("worktree ")
+        }
+        for name in sorted(os.listdir(self.root)):
+            path = os.path.join(self.root, name)
+            if path in registered and name.startswith("slot-"):
+                try:
+                    self._reset(path)
+                except git.GitCommandError as e:
+                    print(f"[Git] Dropping unusable pool slot {path}: {e}")
+                    self._remove(path)
+                    continue
+                self._idle[path] = time.monotonic()
+                self._counter = max(self._counter, int(name.split("-")[-1]) + 1)
+
+    def _new_slot(self) -> str:
+        with self._lock:
+            path = os.path.join(self.root, f"slot-{self._counter}")
+            self._counter += 1
+        with self.repo_lock:
+            retry_on_lock(self.repo.git.worktree, "add", "--detach", path, self.base)
+        return path
+
+    def _reset(self, path: str):
+        slot = git.Git(path)
+        slot.checkout("--detach", "--force", self.base)
+        slot.clean("-fd")
+
+    def _remove(self, path: str):
+        with self.repo_lock:
+            try:
+                retry_on_lock(self.repo.git.worktree, "remove", "--force", path)
+            except git.GitCommandError:
+                shutil.rmtree(path, ignore_errors=True)
+                self.repo.git.worktree("prune")
+
+    def path(self, branch_name: str) -> Optional[str]:
+        return self._leased.get(branch_name)
+
+    def acquire(self, branch_name: str) -> str:
+        """Check `branch_name` out in an idle slot (or a new one) and return its path."""
+        with self._lock:
+            path = self._leased.get(branch_name)
+            if path:
+                return path
+            # Most recently used slot: its files are likeliest to be close
+            path = self._idle.popitem(last=True)[0] if self._idle else None
+        if path is None:
+            path = self._new_slot()
+        try:
+            # Checking a branch out reads every worktree's admin files, which
+            # a concurrent `worktree add` (e.g. the refill) may be writing
+            with self.repo_lock:
+                git.Git(path).checkout("--force", branch_name)
+        except git.GitCommandError:
+            self.release_path(path)
+            raise
+        with self._lock:
+            self._leased[branch_name] = path
+        self.reclaim()
+        self.refill()
+        return path
+
+    def release(self, branch_name: str):
+        """Return the branch's slot to the pool."""
+        with self._lock:
+            path = self._leased.pop(branch_name, None)
+        if path:
+            self.release_path(path)
+
+    def release_path(self, path: str):
+        try:
+            self._reset(path)
+        except git.GitCommandError as e:
+            print(f"[Git] Discarding pool slot {path}: {e}")
+            self._remove(path)
+            return
+        with self._lock:
+            self._idle[path] = time.monotonic()
+        self.reclaim()
+
+    def reclaim(self) -> List[str]:
+        """Remove idle slots beyond `size` that have been idle too long."""
+        now = time.monotonic()
+        with self._lock:
+            excess = len(self._idle) - self.size
+            victims = [path for path, released in self._idle.items() if now - released > self.max_idle][:max(0, excess)]
+            for path in victims:
+                del self._idle[path]
+        for path in victims:
+            self._remove(path)
+        return victims
+
+    def _fill(self):
+        while True:
+            with self._lock:
+                if len(self._idle) >= self.size:
+                    return
+            path = self._new_slot()
+            with self._lock:
+                self._idle[path] = time.monotonic()
+                # Fresh slots are the first to be reclaimed
+                self._idle.move_to_end(path, last=False)
+
+    def refill(self) -> Future:
+        """Top the pool up to `size` idle slots in the background."""
+        with self._lock:
+            if self._refilling is None or self._refilling.done():
+                self._refilling = self._executor.submit(self._fill)
+            return self._refilling
+
+    @property
+    def idle(self) -> int:
+        return len(self._idle)
+
+    def close(self, discard: bool = False):
+        """Stop refilling; with `discard`, also remove every slot's worktree."""
+        self._executor.shutdown(wait=True)
+        if not discard:
+            return
+        with self._lock:
+            paths = list(self._idle) + list(self._leased.values())
+            self._idle.clear()
+            self._leased.clear()
+        for path in paths:
+            self._remove(path)
+        shutil.rmtree(self.root, ignore_errors=True)
 
 class GitTools:
-    def __init__(self, repo_path: str = "."):
+    """
+    Branches, worktrees and merges for one repository.
+
+    Safe to call from several threads: ref-mutating operations are serialized
+    by the repository's lock and retried on contention with other git
+    processes. The async variants run on a thread pool, so branch setup for
+    several tickets overlaps.
+    """
+
+    def __init__(self, repo_path: str = ".", worktrees_dir: Optional[str] = None, pool_size: Optional[int] = None):
         self.repo_path = os.path.abspath(repo_path)
         self.repo = Repo(self.repo_path)
-        self.worktrees_dir = os.path.join(self.repo_path, ".worktrees")
+        self.lock = repo_lock(self.repo_path)
+        # Tickets branch off and merge back into this; resolved once
+        self.default_branch = self._resolve_default_branch()
+        self._executor = ThreadPoolExecutor(
+            max_workers=int(config.get("GIT_THREADS", 4)), thread_name_prefix="git"
+        )
+        # Runs pass their own root (e.g. .worktrees/<run_id>) to keep checkouts apart
+        self.worktrees_dir = os.path.abspath(worktrees_dir or os.path.join(self.repo_path, ".worktrees"))
         
         if not os.path.exists(self.worktrees_dir):
             os.makedirs(self.worktrees_dir)
@@ -21,17 +233,40 @@ class GitTools:
                     with open(gitignore_path, "a") as f:
                         f.write("\n.worktrees/\n")
 
-    def create_branch(self, branch_name: str, base: str = "main") -> str:
-        """Create a new branch from base."""
+        pool_size = int(config.get("WORKTREE_POOL_SIZE", 2)) if pool_size is None else pool_size
+        self.pool: Optional[WorktreePool] = None
+        if pool_size > 0:
+            self.pool = WorktreePool(
+                self.repo,
+                os.path.join(self.worktrees_dir, ".pool"),
+                size=pool_size,
+                max_idle=float(config.get("WORKTREE_IDLE_SECONDS", 600)),
+                base=self.default_branch,
+            )
+            self.pool.refill()
+
+    def _resolve_default_branch(self) -> str:
+        """The checked-out branch, else the remote's default, else main/master."""
+        if not self.repo.head.is_detached:
+            return self.repo.active_branch.name
+        try:
+            # e.g. "origin/main"
+            return self.repo.git.symbolic_ref("--short", "refs/remotes/origin/HEAD").split("/", 1)[1]
+        except git.GitCommandError:
+            pass
+        return next((name for name in ("main", "master") if name in self.repo.heads), "main")
+
+    def create_branch(self, branch_name: str, base: Optional[str] = None) -> str:
+        """Create a new branch from base (the default branch if not given)."""
+        base = base or self.default_branch
         try:
-            current = self.repo.active_branch
-            # Checkout base first to ensure we branch from updated point
             # Note: In a real agent workflow, we might fetch origin first
-            if branch_name in self.repo.heads:
-                print(f"[Git] Branch {branch_name} already exists")
-                return branch_name
-                
-            new_branch = self.repo.create_head(branch_name, base)
+            with self.lock:
+                if branch_name in self.repo.heads:
+                    print(f"[Git] Branch {branch_name} already exists")
+                    return branch_name
+
+                retry_on_lock(self.repo.git.branch, branch_name, base)
             print(f"[Git] Created branch {branch_name} from {base}")
             return branch_name
         except Exception as e:
@@ -39,7 +274,19 @@ class GitTools:
             raise
 
     def create_worktree(self, branch_name: str) -> str:
-        """Create a worktree for the specific branch."""
+        """
+        Check the branch out in a worktree and return its path.
+
+        With a pool this is a pooled slot re-pointed to the branch; otherwise a
+        new worktree at <worktrees_dir>/<branch_name>.
+        """
+        if self.pool:
+            if branch_name not in self.repo.heads:
+                self.create_branch(branch_name)
+            worktree_path = self.pool.acquire(branch_name)
+            print(f"[Git] Checked out {branch_name} at {worktree_path}")
+            return worktree_path
+
         worktree_path = os.path.join(self.worktrees_dir, branch_name)
         
         if os.path.exists(worktree_path):
@@ -51,7 +298,8 @@ class GitTools:
             if branch_name not in self.repo.heads:
                 self.create_branch(branch_name)
                 
-            self.repo.git.worktree("add", worktree_path, branch_name)
+            with self.lock:
+                retry_on_lock(self.repo.git.worktree, "add", worktree_path, branch_name)
             print(f"[Git] Created worktree at {worktree_path}")
             return worktree_path
         except Exception as e:
@@ -59,11 +307,16 @@ class GitTools:
             raise
 
     def remove_worktree(self, branch_name: str):
-        """Remove a worktree."""
+        """Remove a worktree (pooled slots go back to the pool)."""
+        if self.pool and self.pool.path(branch_name):
+            self.pool.release(branch_name)
+            print(f"[Git] Released worktree of {branch_name}")
+            return
         worktree_path = os.path.join(self.worktrees_dir, branch_name)
         if os.path.exists(worktree_path):
             try:
-                self.repo.git.worktree("remove", worktree_path)
+                with self.lock:
+                    retry_on_lock(self.repo.git.worktree, "remove", worktree_path)
                 # shutil.rmtree(worktree_path) # git worktree remove should handle it, but fallback if needed
                 print(f"[Git] Removed worktree at {worktree_path}")
             except Exception as e:
@@ -72,14 +325,55 @@ class GitTools:
     def list_branches(self) -> List[str]:
         return [head.name for head in self.repo.heads]
 
-    def merge_branch(self, source_branch: str, target_branch: str = "main") -> bool:
-        """Merge source into target."""
-        try:
-            self.repo.git.checkout(target_branch)
-            self.repo.git.merge(source_branch)
-            print(f"[Git] Merged {source_branch} into {target_branch}")
-            return True
-        except Exception as e:
-            print(f"[Git] Merge conflict or error: {e}")
-            self.repo.git.merge("--abort")
-            return False
+    def merge_branch(self, source_branch: str, target_branch: Optional[str] = None) -> bool:
+        """Merge source into target (the default branch if not given)."""
+        target_branch = target_branch or self.default_branch
+        with self.lock:
+            try:
+                retry_on_lock(self.repo.git.checkout, target_branch)
+                self.repo.git.merge(source_branch)
+                print(f"[Git] Merged {source_branch} into {target_branch}")
+                return True
+            except Exception as e:
+                print(f"[Git] Merge conflict or error: {e}")
+                self.repo.git.merge("--abort")
+                return False
+
+    def merge_branches(self, branches: List[str], target_branch: Optional[str] = None) -> Dict[str, Any]:
+        """Merge several branches into target (default branch) in memory (see MergeEngine)."""
+        engine = MergeEngine(self.repo, self.lock, max_workers=int(config.get("GIT_THREADS", 4)))
+        return engine.merge(branches, target_branch or self.default_branch)
+
+    # Async variants, run on the git thread pool
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def acreate_branch(self, branch_name: str, base: Optional[str] = None) -> str:
+        return await self._run(self.create_branch, branch_name, base)
+
+    async def acreate_worktree(self, branch_name: str) -> str:
+        return await self._run(self.create_worktree, branch_name)
+
+    async def aremove_worktree(self, branch_name: str):
+        await self._run(self.remove_worktree, branch_name)
+
+    async def alist_branches(self) -> List[str]:
+        return await self._run(self.list_branches)
+
+    async def amerge_branch(self, source_branch: str, target_branch: Optional[str] = None) -> bool:
+        return await self._run(self.merge_branch, source_branch, target_branch)
+
+    async def amerge_branches(self, branches: List[str], target_branch: Optional[str] = None) -> Dict[str, Any]:
+        return await self._run(self.merge_branches, branches, target_branch)
+
+    async def aprepare_worktrees(self, branch_names: List[str]) -> Dict[str, str]:
+        """Create branches and worktrees for several tickets concurrently."""
+        paths = await asyncio.gather(*(self.acreate_worktree(name) for name in branch_names))
+        return dict(zip(branch_names, paths))
+
+    def close(self, discard: bool = False):
+        """Shut the thread pools down; `discard` also removes the pooled worktrees."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if self.pool:
+            self.pool.close(discard)
@@ -0,0 +1,127 @@
+import git
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Set, Tuple
+from git import Repo
+
+# Committer for merge commits when the repository has no identity configured
+FALLBACK_IDENTITY = {
+    "GIT_AUTHOR_NAME": "Git Agent",
+    "GIT_AUTHOR_EMAIL": "git-agent@localhost",
+    "GIT_COMMITTER_NAME": "Git Agent",
+    "GIT_COMMITTER_EMAIL": "git-agent@localhost",
+}
+
+def changed_files(repo: Repo, target: str, branch: str) -> Set[str]:
+    """Files the branch changed since it forked from `target`."""
+    return set(repo.git.diff("--name-only", f"{target}...{branch}").splitlines())
+
+def merge_order(changes: Dict[str, Set[str]]) -> List[str]:
+    """
+    Branches touching files no other pending branch touches first (they can
+    only conflict with the target), then the overlapping ones, keeping the
+    given order within each group.
+    """
+    independent, overlapping = [], []
+    for branch, files in changes.items():
+        others = set().union(*(f for b, f in changes.items() if b != branch))
+        (overlapping if files & others else independent).append(branch)
+    return independent + overlapping
+
+def _merge_tree(repo: Repo, ours: str, theirs: str) -> Tuple[Optional[str], List[str]]:
+    """
+    Merge two commits in memory with `git merge-tree --write-tree`.
+
+    Returns (tree, []) when clean and (None, conflicted files) otherwise.
+    """
+    status, stdout, stderr = repo.git.merge_tree(
+        "--write-tree", "--name-only", "--no-messages", ours, theirs,
+        with_extended_output=True, with_exceptions=False,
+    )
+    lines = stdout.splitlines()
+    if status == 0:
+        return lines[0], []
+    if status == 1:
+        return None, sorted({line for line in lines[1:] if line})
+    raise git.GitCommandError(["git", "merge-tree", ours, theirs], status, stderr)
+
+def _identity(repo: Repo) -> Dict[str, str]:
+    reader = repo.config_reader()
+    if reader.has_option("user", "name") and reader.has_option("user", "email"):
+        return {}
+    return FALLBACK_IDENTITY
+
+class MergeEngine:
+    """
+    Integrates finished ticket branches into a target branch without trial
+    merges in a working tree.
+
+    Conflicts between pending branches are predicted from the files each one
+    changed, so branches with disjoint changes are merged first. Merges are
+    computed in memory (merge-tree + commit-tree, one merge commit per
+    branch); branches that conflict are skipped and reported, and the target
+    ref is moved once at the end (fast-forwarding its checkout, if any).
+    """
+
+    def __init__(self, repo: Repo, lock: Any, max_workers: int = 4):
+        self.repo = repo
+        self.lock = lock
+        self.max_workers = max_workers
+
+    def _survey(self, target: str, branches: List[str]) -> Tuple[List[str], Dict[str, Set[str]]]:
+        """Split branches into already-merged ones and the changes of the rest."""
+        def inspect(branch: str):
+            merged = self.repo.git.merge_base(
+                "--is-ancestor", branch, target, with_extended_output=True, with_exceptions=False
+            )[0] == 0
+            return branch, None if merged else changed_files(self.repo, target, branch)
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(branches)))) as pool:
+            surveyed = list(pool.map(inspect, branches))
+        up_to_date = [branch for branch, files in surveyed if files is None]
+        changes = {branch: files for branch, files in surveyed if files is not None}
+        return up_to_date, changes
+
+    def merge(self, branches: List[str], target: str = "main") -> Dict[str, Any]:
+        """
+        Merge `branches` into `target`.
+
+        Returns {"merged": [...], "conflicts": [ConflictInfo, ...],
+        "head": <target commit>}; "merged" includes branches already in target.
+        """
+        branches = list(dict.fromkeys(branches))
+        if not branches:
+            return {"merged": [], "conflicts": [], "head": self.repo.commit(target).hexsha}
+        # Someone else may move the target meanwhile; start over once if so
+        for attempt in range(2):
+            base = self.repo.commit(target).hexsha
+            up_to_date, changes = self._survey(base, branches)
+            head, merged, conflicts = base, list(up_to_date), []
+            env = _identity(self.repo)
+            for branch in merge_order(changes):
+                tree, files = _merge_tree(self.repo, head, branch)
+                if tree is None:
+                    conflicts.append({"branch": branch, "files": files, "timestamp": datetime.now().isoformat()})
+                    print(f"[Git] {branch} conflicts with {target} in {files}")
+                    continue
+                head = self.repo.git.commit_tree(
+                    tree, "-p", head, "-p", branch, "-m", f"Merge {branch} into {target}", env=env
+                )
+                merged.append(branch)
+            if head == base or self._advance(target, base, head):
+                print(f"[Git] Merged {len(merged)} branch(es) into {target}, {len(conflicts)} conflict(s)")
+                return {"merged": merged, "conflicts": conflicts, "head": head}
+            print(f"[Git] {target} moved during merge, retrying")
+        raise RuntimeError(f"{target} kept moving during merge")
+
+    def _advance(self, target: str, old: str, new: str) -> bool:
+        """Move `target` from `old` to `new`; False if it no longer points at `old`."""
+        with self.lock:
+            if self.repo.commit(target).hexsha != old:
+                return False
+            if not self.repo.head.is_detached and self.repo.active_branch.name == target:
+                # Checked out in the main worktree: fast-forward it so files follow
+                self.repo.git.merge("--ff-only", "--quiet", new)
+            else:
+                self.repo.git.update_ref(f"refs/heads/{target}", new, old)
+            return True
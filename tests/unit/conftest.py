@@ -0,0 +1,88 @@
+import hashlib
+import subprocess
+import numpy as np
+import pytest
+from chromadb.api.types import EmbeddingFunction
+from langchain_core.messages import AIMessage
+
+from langgraph_scrum.knowledge import KnowledgeManager
+from langgraph_scrum.state import ScrumState
+
+
+class WordHashEmbedding(EmbeddingFunction):
+    """Bag-of-words hashing embedding, so tests don't load a real model."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, input):
+        self.calls.append(list(input))
+        vectors = []
+        for text in input:
+            vector = np.zeros(64, dtype=np.float32)
+            for word in text.lower().split():
+                vector[int(hashlib.md5(word.encode()).hexdigest(), 16) % 64] += 1
+            vectors.append(vector)
+        return vectors
+
+    @staticmethod
+    def name():
+        return "word-hash-test"
+
+    def get_config(self):
+        return {}
+
+    @staticmethod
+    def build_from_config(config):
+        return WordHashEmbedding()
+
+
+@pytest.fixture
+def project_dir(tmp_path, monkeypatch):
+    """Run inside a throwaway git repository with a `main` branch."""
+    def git(*args):
+        subprocess.run(["git", *args], cwd=tmp_path, check=True, capture_output=True)
+
+    git("init", "-b", "main")
+    git("-c", "user.name=test", "-c", "user.email=test@example.com", "commit", "--allow-empty", "-m", "init")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("langgraph_scrum.nodes.git_agent._git_tools", {})
+    return tmp_path
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    """Answer every node LLM call with a canned response."""
+    calls = []
+
+    async def ainvoke_llm(agent_config, messages, agent_id=None):
+        calls.append(messages)
+        return AIMessage(content=f"{agent_id} analysis")
+
+    monkeypatch.setattr("langgraph_scrum.nodes.planning.ainvoke_llm", ainvoke_llm)
+    return calls
+
+
+@pytest.fixture
+def initial_state():
+    return ScrumState(
+        project_name="Test Project",
+        requirements="Todo app",
+        phase="planning",
+        tickets=[],
+        active_tickets={},
+        completed_tickets=[],
+        agents={},
+        branches=[],
+        pending_merges=[],
+        conflicts=[],
+        sprint_number=1,
+        messages=[]
+    )
+
+
+@pytest.fixture
+def knowledge(tmp_path):
+    manager = KnowledgeManager(str(tmp_path / "knowledge"), embedding_function=WordHashEmbedding())
+    yield manager
+    manager.close()
@@ -0,0 +1,29 @@
+import os
+
+import pytest
+
+from langgraph_scrum.bench import run_benchmark, summarize_timings
+
+
+def test_summarize_timings_reports_milliseconds():
+    stats = summarize_timings([0.001 * i for i in range(1, 101)])
+    assert stats["count"] == 100
+    assert stats["max_ms"] == pytest.approx(100)
+    assert stats["p50_ms"] == pytest.approx(51)
+
+
+@pytest.mark.asyncio
+async def test_benchmark_runs_concurrent_projects_in_process(tmp_path, monkeypatch):
+    # The process's working directory is left alone
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(os, "chdir", lambda path: pytest.fail(f"chdir({path})"))
+
+    report = await run_benchmark(sprints=1, tickets=3, projects=2, llm_latency=0.01)
+
+    # The architect adds two tickets to each project's backlog
+    assert report["tickets_done"] == 2 * (3 + 2)
+    assert report["nodes"]["product_owner"]["count"] == 2
+    assert report["nodes"]["product_owner"]["p50_ms"] >= 10
+    assert {"dispatch", "agent_work", "git_merge"} <= set(report["nodes"])
+    assert report["sprint"]["count"] == 2 and report["loop_lag"]["count"] > 0
+    assert os.listdir(tmp_path) == []
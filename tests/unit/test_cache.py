@@ -0,0 +1,68 @@
+import os
+import shutil
+import threading
+import time
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from langgraph_scrum.cache import ResponseCache
+
+
+def make_key(text):
+    return ResponseCache.make_key("openai", "gpt-4o", 0.0, [SystemMessage(content="sys"), HumanMessage(content=text)])
+
+
+def test_round_trip_and_counters(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    key = make_key("hello")
+
+    assert cache.get(key) is None
+    cache.put(key, "world")
+    assert cache.get(key) == "world"
+    assert make_key("hello") == key
+    assert make_key("other") != key
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+    # The index is rebuilt from disk on restart
+    assert ResponseCache(str(tmp_path)).get(key) == "world"
+
+
+def test_evicts_oldest_entries_over_budget(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_entries=2)
+    keys = [make_key(str(i)) for i in range(3)]
+    for key in keys:
+        cache.put(key, "x")
+
+    assert cache.get(keys[0]) is None
+    assert cache.get(keys[2]) == "x"
+    assert cache.stats()["evictions"] == 1
+    assert len(os.listdir(tmp_path)) == 2
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_age=60)
+    key = make_key("old")
+    cache.put(key, "stale")
+    cache._index[key] = (cache._index[key][0], time.time() - 120)
+
+    assert cache.get(key) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_concurrent_writes_and_io_errors_do_not_raise(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache"))
+    key = make_key("same")
+    threads = [threading.Thread(target=cache.put, args=(key, f"v{i}")) for i in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert cache.get(key) in {f"v{i}" for i in range(16)}
+    assert os.listdir(tmp_path / "cache") == [f"{key}.json"]
+
+    # The cache directory disappearing only costs the entries
+    shutil.rmtree(tmp_path / "cache")
+    cache.put(make_key("lost"), "x")
+    assert cache.get(key) is None
+    assert cache.stats()["entries"] == 0
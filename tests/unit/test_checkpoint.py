@@ -0,0 +1,100 @@
+from typing import Annotated, TypedDict
+
+import pytest
+from langgraph.graph import START, StateGraph
+
+from langgraph_scrum.checkpoint import open_checkpointer
+from langgraph_scrum.graph import create_workflow
+from langgraph_scrum.state import merge_tickets
+
+
+@pytest.fixture
+async def open_saver(project_dir):
+    """Open checkpointers on one database file, closing them after the test."""
+    savers = []
+
+    async def open_():
+        saver = await open_checkpointer(str(project_dir / "checkpoints.sqlite"))
+        savers.append(saver)
+        return saver
+
+    yield open_
+    for saver in savers:
+        await saver.conn.close()
+
+
+@pytest.mark.asyncio
+async def test_interrupted_run_resumes_from_last_checkpoint(open_saver, fake_llm, initial_state):
+    checkpointer = await open_saver()
+    graph = create_workflow(checkpointer=checkpointer)
+    run_config = {"configurable": {"thread_id": "project-1"}}
+
+    # Stop after the first two nodes, as if the server went down
+    seen = []
+    async for event in graph.astream(initial_state, run_config, stream_mode="updates", durability="sync"):
+        seen.extend(event)
+        if len(seen) == 2:
+            break
+    assert seen == ["product_owner", "architect"]
+
+    checkpointer = await open_saver()
+    graph = create_workflow(checkpointer=checkpointer)
+    snapshot = await graph.aget_state(run_config)
+    assert snapshot.next == ("user_approval",)
+    assert len(snapshot.values["tickets"]) == 2
+
+    resumed = [node async for event in graph.astream(None, run_config, stream_mode="updates") for node in event]
+    assert resumed[0] == "user_approval"
+    assert "product_owner" not in resumed
+
+    final = await graph.aget_state(run_config)
+    assert final.values["phase"] == "review"
+    assert final.values["messages"][0]["content"] == "product_owner analysis"
+
+
+@pytest.mark.asyncio
+async def test_unchanged_channels_are_stored_once(open_saver, fake_llm, initial_state):
+    checkpointer = await open_saver()
+    graph = create_workflow(checkpointer=checkpointer)
+    run_config = {"configurable": {"thread_id": "project-1"}}
+
+    async for _ in graph.astream(initial_state, run_config):
+        pass
+
+    history = [c async for c in checkpointer.alist(run_config)]
+    async with checkpointer.conn.execute(
+        "SELECT COUNT(*) FROM blobs WHERE channel = 'requirements'"
+    ) as cur:
+        (requirement_blobs,) = await cur.fetchone()
+
+    assert len(history) > 5
+    assert requirement_blobs == 1
+    assert all(c.checkpoint["channel_values"]["requirements"] == "Todo app" for c in history[:-1])
+
+
+
+@pytest.mark.asyncio
+async def test_history_keeps_each_steps_tickets_with_async_durability(open_saver):
+    class State(TypedDict):
+        tickets: Annotated[list, merge_tickets]
+
+    def step(status):
+        # Synchronous nodes: steps follow each other without yielding to
+        # the background checkpoint writes
+        return lambda state: {"tickets": [{"id": "T-1", "status": status}]}
+
+    builder = StateGraph(State)
+    for name in ("draft", "in_progress", "done"):
+        builder.add_node(name, step(name))
+    builder.add_edge(START, "draft")
+    builder.add_edge("draft", "in_progress")
+    builder.add_edge("in_progress", "done")
+    graph = builder.compile(checkpointer=await open_saver())
+    run_config = {"configurable": {"thread_id": "history"}}
+
+    await graph.ainvoke({"tickets": []}, run_config, durability="async")
+
+    history = [s.values["tickets"] async for s in graph.aget_state_history(run_config)]
+    assert [[t["status"] for t in tickets] for tickets in history[::-1]] == [
+        [], [], ["draft"], ["in_progress"], ["done"]
+    ]
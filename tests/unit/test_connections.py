@@ -0,0 +1,85 @@
+import asyncio
+import json
+import pytest
+
+from langgraph_scrum.connections import ConnectionManager
+from langgraph_scrum.sync import StateSync
+
+
+class FakeWebSocket:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.sent = []
+        self.closed = False
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        await asyncio.sleep(self.delay)
+        self.sent.append(json.loads(text))
+
+    async def close(self, code=1000):
+        self.closed = True
+
+
+@pytest.mark.asyncio
+async def test_slow_client_does_not_hold_up_others():
+    manager = ConnectionManager(max_queue=8, send_timeout=10)
+    fast, slow = FakeWebSocket(), FakeWebSocket(delay=0.05)
+    await manager.connect(fast)
+    await manager.connect(slow)
+
+    for i in range(50):
+        manager.broadcast({"type": "token", "node": "po", "agent_id": "po", "content": str(i % 10)})
+    # Coalescing keeps every backlog bounded
+    assert all(len(c.queue) <= 8 for c in manager.connections.values())
+
+    await asyncio.sleep(0.02)
+    assert "".join(m["content"] for m in fast.sent) == "0123456789" * 5
+    assert slow.sent == []
+
+    # The slow client still receives all of the text, in fewer messages
+    await asyncio.sleep(0.5)
+    assert "".join(m["content"] for m in slow.sent) == "0123456789" * 5
+    assert len(slow.sent) < 50
+    manager.disconnect(fast)
+    manager.disconnect(slow)
+
+
+@pytest.mark.asyncio
+async def test_dropped_deltas_are_replaced_by_a_catch_up():
+    state = {"count": 0}
+    sync = StateSync(state)
+    manager = ConnectionManager(resync=lambda run_id, seq: sync.since(seq), max_queue=2, policy="drop", send_timeout=10)
+    client = FakeWebSocket(delay=0.01)
+    await manager.connect(client)
+
+    manager.broadcast(sync.snapshot())
+    for i in range(1, 6):
+        manager.broadcast(sync.update({"count": i}, ["counter"]))
+    await asyncio.sleep(0.2)
+
+    # Some deltas were dropped, yet every delta the client got follows the
+    # previous update and it ends at the latest seq
+    assert len(client.sent) < 6
+    for previous, message in zip(client.sent, client.sent[1:]):
+        assert "state" in message or message["seq"] == previous["seq"] + 1
+    assert client.sent[-1]["seq"] == 5
+    manager.disconnect(client)
+
+
+@pytest.mark.asyncio
+async def test_stale_client_is_evicted():
+    manager = ConnectionManager(send_timeout=0.05)
+    stuck, healthy = FakeWebSocket(delay=10), FakeWebSocket()
+    await manager.connect(stuck)
+    await manager.connect(healthy)
+
+    manager.broadcast({"type": "token", "content": "x"})
+    await asyncio.sleep(0.2)
+
+    assert manager.active_connections == [healthy]
+    assert stuck.closed
+    assert healthy.sent == [{"type": "token", "content": "x"}]
+    manager.disconnect(healthy)
@@ -0,0 +1,40 @@
+import pytest
+
+from langgraph_scrum.context import count_tokens, pack_context, select_messages
+from langgraph_scrum.nodes.planning import product_owner_node
+
+
+def test_pack_context_dedupes_and_stays_within_budget():
+    lessons = ["Keep handlers thin", "keep  handlers THIN", "Write migrations first " * 50]
+    messages = [{"role": "architect", "content": "Keep handlers thin"}, {"role": "po", "content": "Todo API"}]
+
+    context = pack_context(lessons, messages, budget=60)
+
+    assert context.count("handlers") == 1
+    assert context.endswith("...")
+    assert "Todo API" not in context
+    assert count_tokens(context) <= 60
+
+
+def test_select_messages_prefers_relevant_then_recent():
+    messages = [
+        {"role": "po", "content": "login page with oauth"},
+        {"role": "architect", "content": "use postgres"},
+        {"role": "po", "content": "weekly reports"},
+    ]
+
+    ranked = select_messages(messages, "oauth login flow")
+
+    assert [m["content"] for m in ranked] == ["login page with oauth", "weekly reports", "use postgres"]
+
+
+@pytest.mark.asyncio
+async def test_product_owner_prompt_includes_lessons(knowledge, fake_llm, initial_state):
+    await knowledge.aadd_lessons(["Todo apps need offline sync", "Invoices need tax rules"])
+    run_config = {"configurable": {"knowledge": knowledge}}
+
+    await product_owner_node(initial_state, run_config)
+
+    prompt = fake_llm[0][1].content
+    assert prompt.startswith("Analyze these requirements: Todo app")
+    assert "Lessons learned:\n- Todo apps need offline sync" in prompt
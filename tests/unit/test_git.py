@@ -0,0 +1,182 @@
+import os
+import subprocess
+import threading
+
+import pytest
+
+from langgraph_scrum.tools.git import GitTools
+
+
+def make_repo(path, branch="main"):
+    path.mkdir()
+    for args in (["init", "-q", "-b", branch], ["config", "user.email", "t@example.com"], ["config", "user.name", "t"]):
+        subprocess.run(["git", *args], cwd=path, check=True)
+    (path / "README.md").write_text("hello\n")
+    subprocess.run(["git", "add", "."], cwd=path, check=True)
+    subprocess.run(["git", "commit", "-qm", "init"], cwd=path, check=True)
+    return path
+
+
+@pytest.fixture
+def repo(tmp_path):
+    return make_repo(tmp_path / "repo")
+
+
+def test_worktrees_come_from_a_recycled_pool(repo, tmp_path):
+    tools = GitTools(str(repo), worktrees_dir=str(tmp_path / "wt"), pool_size=1)
+    tools.pool.refill().result()
+    assert tools.pool.idle == 1
+
+    path = tools.create_worktree("feature/T-1")
+    assert os.path.dirname(path) == str(tmp_path / "wt" / ".pool")
+    assert subprocess.run(
+        ["git", "branch", "--show-current"], cwd=path, capture_output=True, text=True
+    ).stdout.strip() == "feature/T-1"
+    (open(os.path.join(path, "scratch.txt"), "w")).close()
+    subprocess.run(["git", "commit", "-qm", "work", "--allow-empty"], cwd=path, check=True)
+
+    tools.remove_worktree("feature/T-1")
+    tools.pool.refill().result()
+    # Released slots go back to the base commit, not the branch they had
+    head = subprocess.run(["git", "rev-parse", "HEAD"], cwd=path, capture_output=True, text=True).stdout.strip()
+    assert head == tools.pool.base == subprocess.run(
+        ["git", "rev-parse", "main"], cwd=repo, capture_output=True, text=True
+    ).stdout.strip()
+    # The released slot is cleaned and reused for the next branch
+    assert tools.create_worktree("feature/T-2") == path
+    assert not os.path.exists(os.path.join(path, "scratch.txt"))
+    tools.pool.close()
+
+
+def test_pool_reclaims_idle_slots_beyond_its_size(repo, tmp_path):
+    tools = GitTools(str(repo), worktrees_dir=str(tmp_path / "wt"), pool_size=1)
+    tools.pool.max_idle = 0
+    paths = [tools.create_worktree(f"feature/T-{i}") for i in range(3)]
+    for i in range(3):
+        tools.remove_worktree(f"feature/T-{i}")
+    tools.pool.refill().result()
+    tools.pool.reclaim()
+
+    assert tools.pool.idle == 1
+    assert len(os.listdir(tmp_path / "wt" / ".pool")) == 1
+    assert any(os.path.exists(path) for path in paths)
+    # A new pool over the same directory adopts what is left
+    tools.pool.close()
+    again = GitTools(str(repo), worktrees_dir=str(tmp_path / "wt"), pool_size=1)
+    assert again.pool.idle >= 1
+    # Discarding removes the slots from disk and from git's worktree list
+    again.close(discard=True)
+    assert not os.path.exists(tmp_path / "wt" / ".pool")
+    assert ".pool" not in subprocess.run(
+        ["git", "worktree", "list"], cwd=repo, capture_output=True, text=True
+    ).stdout
+
+
+@pytest.mark.asyncio
+async def test_concurrent_branch_setup_is_serialized_safely(repo, tmp_path):
+    tools = GitTools(str(repo), worktrees_dir=str(tmp_path / "wt"), pool_size=2)
+    names = [f"feature/T-{i}" for i in range(6)]
+
+    paths = await tools.aprepare_worktrees(names)
+
+    assert set(names) <= set(await tools.alist_branches())
+    assert len(set(paths.values())) == len(names)
+    for name, path in paths.items():
+        assert subprocess.run(
+            ["git", "branch", "--show-current"], cwd=path, capture_output=True, text=True
+        ).stdout.strip() == name
+    tools.close()
+
+
+def test_lock_contention_is_retried(repo, tmp_path):
+    tools = GitTools(str(repo), worktrees_dir=str(tmp_path / "wt"), pool_size=0)
+    lock = repo / ".git" / "refs" / "heads" / "feature" / "T-1.lock"
+    lock.parent.mkdir(parents=True)
+    lock.write_text("")
+    # Held longer than git's own 100ms ref lock timeout
+    timer = threading.Timer(0.4, lock.unlink)
+    timer.start()
+
+    tools.create_branch("feature/T-1")
+
+    timer.join()
+    assert "feature/T-1" in tools.list_branches()
+    tools.close()
+
+
+def commit_on(repo, branch, files, base="main"):
+    subprocess.run(["git", "checkout", "-q", "-b", branch, base], cwd=repo, check=True)
+    for name, text in files.items():
+        (repo / name).write_text(text)
+    subprocess.run(["git", "add", "."], cwd=repo, check=True)
+    subprocess.run(["git", "commit", "-qm", branch], cwd=repo, check=True)
+    subprocess.run(["git", "checkout", "-q", base], cwd=repo, check=True)
+
+
+def test_merge_integrates_disjoint_branches_and_reports_conflicts(repo, tmp_path):
+    commit_on(repo, "feature/a", {"a.txt": "a\n"})
+    commit_on(repo, "feature/b", {"b.txt": "b\n"})
+    commit_on(repo, "feature/c", {"README.md": "from c\n"})
+    commit_on(repo, "feature/d", {"README.md": "from d\n"})
+    tools = GitTools(str(repo), worktrees_dir=str(tmp_path / "wt"), pool_size=0)
+
+    result = tools.merge_branches(["feature/c", "feature/a", "feature/d", "feature/b"])
+
+    # Disjoint branches go first; of the two editing README.md only one fits
+    assert result["merged"] == ["feature/a", "feature/b", "feature/c"]
+    assert [c["branch"] for c in result["conflicts"]] == ["feature/d"]
+    assert result["conflicts"][0]["files"] == ["README.md"]
+    # The checked-out target was fast-forwarded
+    assert tools.repo.head.commit.hexsha == result["head"]
+    assert (repo / "a.txt").exists() and (repo / "README.md").read_text() == "from c\n"
+    assert tools.merge_branches(["feature/a"])["merged"] == ["feature/a"]
+    tools.close()
+
+
+def test_branches_start_from_and_merge_into_the_default_branch(tmp_path):
+    repo = make_repo(tmp_path / "repo", branch="master")
+    commit_on(repo, "feature/a", {"a.txt": "a\n"}, base="master")
+    tools = GitTools(str(repo), worktrees_dir=str(tmp_path / "wt"), pool_size=1)
+
+    assert tools.default_branch == "master"
+    assert tools.pool.base == tools.repo.heads.master.commit.hexsha
+    tools.create_branch("feature/b")
+    assert tools.repo.heads["feature/b"].commit == tools.repo.heads.master.commit
+
+    result = tools.merge_branches(["feature/a"])
+    assert result["merged"] == ["feature/a"] and not result["conflicts"]
+    assert tools.repo.heads.master.commit.hexsha == result["head"]
+    assert (repo / "a.txt").exists()
+    tools.close(discard=True)
+
+
+@pytest.mark.asyncio
+async def test_reviewed_ticket_branches_land_on_main(project_dir, fake_llm, initial_state, monkeypatch):
+    from langgraph_scrum import graph as graph_module
+    from langgraph_scrum.nodes import development
+    from langgraph_scrum.nodes.git_agent import get_git_tools
+
+    async def agent_work(state):
+        # Commit the ticket's work in the worktree dispatch checked out
+        ticket = state["ticket"]
+        path = get_git_tools().create_worktree(ticket["branch"])
+        with open(os.path.join(path, f"{ticket['id']}.txt"), "w") as f:
+            f.write(ticket["title"])
+        for args in (["add", "."], ["-c", "user.name=t", "-c", "user.email=t@example.com", "commit", "-qm", ticket["id"]]):
+            subprocess.run(["git", *args], cwd=path, check=True)
+        return await development.agent_work(state)
+
+    monkeypatch.setattr(graph_module, "agent_work", agent_work)
+    initial_state["tickets"] = [
+        {"id": "a", "title": "a", "status": "draft", "assigned_to": None, "dependencies": []},
+        {"id": "b", "title": "b", "status": "draft", "assigned_to": None, "dependencies": ["a"]},
+    ]
+    initial_state["agents"] = {"dev1": {"role": "developer", "state": "idle", "config": {}}}
+
+    final = await graph_module.create_workflow().ainvoke(initial_state)
+
+    assert {t["status"] for t in final["tickets"]} == {"done"}
+    files = subprocess.run(
+        ["git", "ls-tree", "--name-only", "main"], cwd=project_dir, capture_output=True, text=True
+    ).stdout.split()
+    assert {f"{t['id']}.txt" for t in final["tickets"]} <= set(files)
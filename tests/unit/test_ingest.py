@@ -0,0 +1,78 @@
+import pytest
+
+from langgraph_scrum.ingest import LessonIngestor, harvest_lessons
+
+
+def test_ingest_skips_exact_and_near_duplicates(knowledge):
+    added = knowledge.ingest_lessons([
+        "Run migrations before deploying",
+        "run  migrations before DEPLOYING",
+        "Before deploying run migrations",
+        "Cache LLM responses in tests",
+    ])
+
+    # Case/whitespace duplicate by hash, reordered words by embedding distance
+    assert len(added) == 2
+    assert knowledge.ingest_lessons(["Run migrations before deploying", "deploying run migrations before"]) == []
+    assert knowledge.collection.count() == 2
+
+
+def test_harvest_lessons_from_done_tickets_and_reviews():
+    state = {"project_name": "Todo", "sprint_number": 2}
+    update = {
+        "completed_tickets": [
+            {"id": "t1", "title": "Login", "type": "feature", "status": "done", "description": "OAuth login",
+             "assigned_to": "backend_developer", "files_changed": []},
+            {"id": "t2", "title": "Logout", "type": "feature", "status": "review", "description": ""},
+        ],
+        "messages": [{"role": "reviewer", "content": "Validate tokens server side"}, {"role": "product_owner", "content": "x"}],
+    }
+
+    lessons = harvest_lessons(update, state)
+
+    assert [text for text, _ in lessons] == ["Feature 'Login' completed: OAuth login", "Validate tokens server side"]
+    assert lessons[0][1] == {"project": "Todo", "sprint": 2, "source": "ticket", "ticket_id": "t1",
+                             "ticket_type": "feature", "role": "backend_developer"}
+
+
+@pytest.mark.asyncio
+async def test_ingestor_writes_in_batches_and_flushes_on_close(knowledge):
+    batches = []
+    ingest = knowledge.aingest_lessons
+
+    async def record(lessons, metadatas, max_distance):
+        batches.append(lessons)
+        return await ingest(lessons, metadatas, max_distance)
+
+    knowledge.aingest_lessons = record
+    ingestor = LessonIngestor(knowledge, batch_size=2, flush_interval=10)
+    ingestor.start()
+    ingestor.submit([("alpha lesson", {}), ("beta lesson", {}), ("gamma lesson", {})])
+    await ingestor.close()
+
+    assert batches == [["alpha lesson", "beta lesson"], ["gamma lesson"]]
+    assert ingestor.ingested == 3
+
+
+@pytest.mark.asyncio
+async def test_review_findings_end_up_in_the_knowledge_base(knowledge, project_dir, fake_llm, initial_state):
+    from langgraph_scrum.graph import create_workflow
+
+    # Harvest node updates the way the server does
+    ingestor = LessonIngestor(knowledge)
+    ingestor.start()
+    state = dict(initial_state)
+    async for mode, event in create_workflow().astream(initial_state, stream_mode=["updates", "values"]):
+        if mode == "values":
+            state = event
+            continue
+        for update in event.values():
+            if update:
+                ingestor.submit(harvest_lessons(update, state))
+    await ingestor.close()
+
+    found = await knowledge.asearch_lessons(
+        "sprint review tickets done", filters={"source": "sprint_review", "project": "Test Project", "sprint": 1}
+    )
+    assert found and found[0].startswith("Sprint 1 review of Test Project:")
+    assert await knowledge.asearch_lessons("tested", filters={"source": "tester"})
@@ -0,0 +1,68 @@
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_batched_search_caches_embeddings_and_results(knowledge):
+    await knowledge.aadd_lessons(
+        ["use pytest fixtures for temp repos", "pin dependency versions", "keep api handlers thin"],
+        [{"source": "retro"}, {}, {}],
+    )
+    calls = knowledge.embedding_function.calls
+    calls.clear()
+
+    results = await knowledge.asearch_many(["pytest fixtures", "dependency versions"], n_results=1)
+    assert results == [["use pytest fixtures for temp repos"], ["pin dependency versions"]]
+    # Both queries embedded in one batch
+    assert calls == [["pytest fixtures", "dependency versions"]]
+
+    assert await knowledge.asearch_lessons("pytest fixtures", n_results=1) == results[0]
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_insert_invalidates_results_but_keeps_embeddings(knowledge):
+    assert await knowledge.asearch_lessons("merge conflicts") == []
+
+    knowledge.add_lesson("rebase before resolving merge conflicts")
+    calls = knowledge.embedding_function.calls
+    calls.clear()
+
+    assert await knowledge.asearch_lessons("merge conflicts") == ["rebase before resolving merge conflicts"]
+    # The new result came from Chroma without re-embedding the query
+    assert calls == []
+
+
+def test_warm_up_runs_off_the_caller(knowledge):
+    knowledge.warm_up().result(timeout=10)
+    assert knowledge.embedding_function.calls == [["warm up"]]
+
+
+def test_filtered_search_only_returns_matching_lessons(knowledge):
+    knowledge.add_lessons(
+        ["validate login input", "validate payment input", "validate search input"],
+        [{"project": "shop", "ticket_type": "feature"}, {"project": "shop", "ticket_type": "bug"}, {"project": "wiki"}],
+    )
+
+    assert knowledge.search_lessons("validate input", 5, filters={"project": "shop", "ticket_type": "bug"}) == [
+        "validate payment input"
+    ]
+    assert set(knowledge.search_lessons("validate input", 5, filters={"project": "shop"})) == {
+        "validate login input", "validate payment input"
+    }
+    with pytest.raises(ValueError):
+        knowledge.search_lessons("validate", filters={"colour": "red"})
+
+
+def test_hybrid_search_promotes_exact_keyword_matches(knowledge):
+    rare = "when deploys fail with ERR_CONN_RESET the proxy dropped idle sockets, raise keepalive"
+    knowledge.add_lessons([f"general advice {i}" for i in range(10)] + [rare])
+
+    # The long lesson is far from the short query in embedding space
+    assert rare not in knowledge.search_lessons("deploy ERR_CONN_RESET", 2)
+    assert rare in knowledge.search_lessons("deploy ERR_CONN_RESET", 2, hybrid=True)
+
+    # Lessons added after the keyword index was built are indexed too
+    knowledge.add_lesson("ERR_TIMEOUT on deploys: raise the proxy read timeout and retry")
+    assert "ERR_TIMEOUT on deploys: raise the proxy read timeout and retry" in knowledge.search_lessons(
+        "deploy ERR_TIMEOUT", 2, hybrid=True
+    )
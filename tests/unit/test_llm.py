@@ -0,0 +1,141 @@
+import asyncio
+import threading
+import time
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from langgraph_scrum import llm as llm_module
+from langgraph_scrum.cache import configure_response_cache
+from langgraph_scrum.config import Config, config
+
+
+class SlowModel:
+    """Stand-in chat model that tracks how many calls overlap."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.peak = 0
+        self.calls = 0
+
+    async def ainvoke(self, messages):
+        self.calls += 1
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return AIMessage(content="ok")
+
+
+@pytest.mark.asyncio
+async def test_ainvoke_llm_respects_provider_limit(monkeypatch):
+    model = SlowModel()
+    monkeypatch.setattr(llm_module, "get_llm", lambda agent_config: model)
+    monkeypatch.setitem(config._config, "OPENAI_MAX_CONCURRENCY", 2)
+    llm_module._llm_limiters.pop("openai", None)
+
+    results = await asyncio.gather(*[
+        llm_module.ainvoke_llm({"provider": "openai"}, [HumanMessage(content="hi")])
+        for _ in range(6)
+    ])
+
+    assert [r.content for r in results] == ["ok"] * 6
+    assert model.peak == 2
+
+
+def test_provider_limits_are_read_from_the_environment(monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_MAX_CONCURRENCY", "3")
+    monkeypatch.delenv("OPENAI_MAX_CONCURRENCY", raising=False)
+
+    settings = Config()
+    assert int(settings.get("ANTHROPIC_MAX_CONCURRENCY")) == 3
+    assert settings.get("OPENAI_MAX_CONCURRENCY") is None
+
+
+def test_get_llm_reuses_clients_until_keys_change(request):
+    original = config.get("OPENAI_API_KEY")
+    request.addfinalizer(lambda: config.update({"OPENAI_API_KEY": original}))
+    config.update({"OPENAI_API_KEY": "sk-test-1"})
+    agent_config = {"provider": "openai", "model": "gpt-4o", "temperature": 0.2}
+
+    first = llm_module.get_llm(agent_config)
+    assert llm_module.get_llm(agent_config) is first
+    assert llm_module.get_llm({**agent_config, "temperature": 0.5}) is not first
+
+    # Config.update notifies the LLM factory, which drops its cached clients
+    config.update({"OPENAI_API_KEY": "sk-test-2"})
+    assert not llm_module._llm_cache
+    assert llm_module.get_llm(agent_config) is not first
+
+
+@pytest.mark.asyncio
+async def test_deterministic_calls_are_served_from_response_cache(monkeypatch, tmp_path):
+    model = SlowModel()
+    monkeypatch.setattr(llm_module, "get_llm", lambda agent_config: model)
+    monkeypatch.setattr("langgraph_scrum.cache._response_cache_instance", None)
+    cache = configure_response_cache(str(tmp_path))
+    threads = set()
+    for name in ("get", "put"):
+        method = getattr(cache, name)
+        monkeypatch.setattr(cache, name, lambda *args, method=method: threads.add(threading.get_ident()) or method(*args))
+    messages = [HumanMessage(content="same prompt")]
+
+    for _ in range(3):
+        response = await llm_module.ainvoke_llm({"provider": "openai", "temperature": 0}, messages)
+        assert response.content == "ok"
+
+    assert model.calls == 1
+    assert (cache.hits, cache.misses) == (2, 1)
+    # Cache file I/O happens off the event loop
+    assert threads and threading.get_ident() not in threads
+
+
+@pytest.mark.asyncio
+async def test_graph_runs_stream_tokens_on_custom_channel(monkeypatch):
+    from typing import TypedDict
+    from langchain_core.messages import AIMessageChunk
+    from langgraph.graph import StateGraph, END
+
+    class StreamingModel:
+        async def astream(self, messages):
+            for piece in ["Hel", "lo"]:
+                yield AIMessageChunk(content=piece)
+
+    monkeypatch.setattr(llm_module, "get_llm", lambda agent_config: StreamingModel())
+
+    class State(TypedDict):
+        reply: str
+
+    async def talker(state):
+        response = await llm_module.ainvoke_llm({"provider": "openai"}, [HumanMessage(content="hi")], agent_id="po")
+        return {"reply": response.content}
+
+    workflow = StateGraph(State)
+    workflow.add_node("talker", talker)
+    workflow.set_entry_point("talker")
+    workflow.add_edge("talker", END)
+
+    events = [e async for e in workflow.compile().astream({"reply": ""}, stream_mode=["updates", "custom"])]
+
+    tokens = [e for mode, e in events if mode == "custom"]
+    assert [t["content"] for t in tokens] == ["Hel", "lo"]
+    assert tokens[0]["node"] == "talker" and tokens[0]["agent_id"] == "po"
+    assert events[-1] == ("updates", {"talker": {"reply": "Hello"}})
+
+
+@pytest.mark.asyncio
+async def test_fake_provider_is_deterministic_and_paced(monkeypatch):
+    monkeypatch.setitem(config._config, "FAKE_LLM_LATENCY", 0.02)
+    monkeypatch.setitem(config._config, "FAKE_LLM_RESPONSE_TOKENS", 8)
+    llm_module.clear_llm_cache()
+    model = llm_module.get_llm({"provider": "fake", "model": "bench"})
+    messages = [HumanMessage(content="plan the sprint")]
+
+    start = time.perf_counter()
+    first = await model.ainvoke(messages)
+    assert time.perf_counter() - start >= 0.02
+    chunks = [chunk.content async for chunk in model.astream(messages) if chunk.content]
+
+    assert "".join(chunks) == first.content
+    assert len(chunks) == 8 and first.usage_metadata["output_tokens"] == 8
+    assert (await model.ainvoke([HumanMessage(content="other")])).content != first.content
+    llm_module.clear_llm_cache()
@@ -0,0 +1,60 @@
+import threading
+
+import pytest
+
+from langgraph_scrum.config import config
+from langgraph_scrum.messages import MessageArchive, SUMMARY_ROLE, compact_messages, merge_messages
+
+
+def message(i):
+    return {"role": "developer", "content": f"message {i}\nsecond line"}
+
+
+def test_window_compacts_old_messages_into_one_summary():
+    messages = []
+    for i in range(25):
+        messages = compact_messages(messages + [message(i)], window=10)
+        assert len(messages) <= 10
+
+    summary, *recent = messages
+    assert summary["role"] == SUMMARY_ROLE
+    # Every message is either summarized or still in the window
+    assert summary["count"] + len(recent) == 25
+    assert recent[-1]["content"].startswith("message 24")
+    assert "[developer] message 0 second line" in summary["content"]
+
+
+def test_summary_size_is_capped(monkeypatch):
+    monkeypatch.setitem(config._config, "MESSAGE_WINDOW", 4)
+    monkeypatch.setitem(config._config, "MESSAGE_SUMMARY_CHARS", 200)
+    messages = []
+    for i in range(200):
+        messages = merge_messages(messages, [{"role": "tester", "content": "x" * 100 + str(i)}])
+
+    assert len(messages[0]["content"]) < 300
+    assert messages[0]["count"] + len(messages) - 1 == 200
+
+
+def test_archive_keeps_full_history(tmp_path):
+    archive = MessageArchive(str(tmp_path / "run" / "messages.jsonl"))
+    archive.append([message(0), message(1)], node="product_owner")
+    archive.append([message(2)])
+    archive.close()
+
+    history = list(archive.read())
+    assert [m["content"] for m in history] == [message(i)["content"] for i in range(3)]
+    assert history[0]["node"] == "product_owner"
+
+
+@pytest.mark.asyncio
+async def test_archive_writes_off_the_event_loop(tmp_path, monkeypatch):
+    archive = MessageArchive(str(tmp_path / "messages.jsonl"))
+    threads = set()
+    append = archive.append
+    monkeypatch.setattr(archive, "append", lambda *args: threads.add(threading.get_ident()) or append(*args))
+
+    await archive.aappend([message(0)], "tester")
+    archive.close()
+
+    assert threads and threading.get_ident() not in threads
+    assert [m["node"] for m in archive.read()] == ["tester"]
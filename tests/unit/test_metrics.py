@@ -0,0 +1,41 @@
+import pytest
+
+from langgraph_scrum import llm as llm_module
+from langgraph_scrum.graph import create_workflow
+from langgraph_scrum.metrics import estimate_cost, get_metrics
+
+
+def test_cost_uses_the_longest_matching_price():
+    assert estimate_cost("gpt-4o-mini-2024-07-18", 1_000_000, 0) == pytest.approx(0.15)
+    assert estimate_cost("gpt-4o", 0, 1_000_000) == pytest.approx(10.0)
+    assert estimate_cost("local-model", 1000, 1000) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_graph_runs_record_node_and_llm_metrics(project_dir, initial_state):
+    metrics = get_metrics()
+    metrics.reset()
+    llm_module.clear_llm_cache()
+    initial_state["agents"] = {"product_owner": {"state": "idle", "config": {"provider": "fake", "model": "fake-po"}}}
+
+    await create_workflow().ainvoke(initial_state)
+
+    snapshot = metrics.snapshot()
+    assert {"product_owner", "dispatch", "git_merge"} <= set(snapshot["nodes"])
+    assert snapshot["nodes"]["agent_work"]["calls"] == 2
+    po = snapshot["agents"]["product_owner"]
+    assert po["calls"] == 1 and po["prompt_tokens"] > 0 and po["completion_tokens"] == 32
+
+    text = metrics.render()
+    assert 'scrum_node_duration_seconds_bucket{node="dispatch",le="+Inf"}' in text
+    assert 'scrum_llm_tokens_total{agent="product_owner",provider="fake",model="fake-po",kind="completion"} 32' in text
+    metrics.reset()
+
+
+def test_label_values_are_escaped():
+    metrics = get_metrics()
+    metrics.reset()
+    metrics.inc("scrum_node_errors_total", 1, 'a"b\\c\nd')
+
+    assert 'scrum_node_errors_total{node="a\\"b\\\\c\\nd"} 1' in metrics.render()
+    metrics.reset()
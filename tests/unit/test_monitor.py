@@ -0,0 +1,41 @@
+import time
+import asyncio
+import pytest
+
+from langgraph_scrum.metrics import get_metrics, trace_node
+from langgraph_scrum.monitor import LoopMonitor
+
+
+def blocking_tool():
+    time.sleep(0.4)
+
+
+async def slow_node(state):
+    blocking_tool()
+    return {}
+
+
+@pytest.mark.asyncio
+async def test_stalls_are_attributed_to_the_blocking_node_and_call():
+    reported = []
+    monitor = LoopMonitor(interval=0.02, threshold=0.1, on_stall=reported.append)
+    monitor.start()
+    try:
+        await asyncio.sleep(0.1)
+        assert monitor.stats()["stall_count"] == 0 and not monitor.stats()["degraded"]
+
+        await trace_node("slow", slow_node)({})
+        await asyncio.sleep(0.1)
+    finally:
+        await monitor.stop()
+
+    stats = monitor.stats()
+    assert stats["stall_count"] == 1 and stats["recent_stalls"] == 1 and stats["degraded"]
+    assert not monitor.stats(window=0)["recent_stalls"]
+    stall = stats["stalls"][0]
+    assert stall is reported[0]
+    assert stall["duration"] >= 0.3
+    assert stall["node"] == "slow"
+    assert "test_monitor.py" in stall["location"] and "blocking_tool" in stall["location"]
+    assert "blocking_tool" in stall["blocking_call"]
+    assert 'scrum_loop_stalls_total{node="slow"}' in get_metrics().render()
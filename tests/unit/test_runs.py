@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+from langgraph.checkpoint.memory import InMemorySaver
+
+from langgraph_scrum.graph import create_workflow
+from langgraph_scrum.runs import RunRegistry
+
+
+def test_runs_get_isolated_resources(tmp_path):
+    registry = RunRegistry(base_dir=str(tmp_path / "data"), worktrees_root=str(tmp_path / "wt"))
+
+    a = registry.create("a")
+    b = registry.create()
+
+    assert a.data_dir != b.data_dir
+    assert a.tmux_session == "scrum-agents-a"
+    assert a.worktrees_dir.endswith("a")
+    assert a.graph_config()["configurable"]["thread_id"] == "a"
+    assert {r["run_id"] for r in registry.list()} == {"a", b.run_id}
+
+
+def test_active_run_cannot_be_restarted_but_can_be_cancelled(tmp_path):
+    registry = RunRegistry(base_dir=str(tmp_path / "data"), worktrees_root=str(tmp_path / "wt"))
+
+    async def scenario():
+        run = registry.create("p1")
+        run.task = asyncio.create_task(asyncio.sleep(10))
+        with pytest.raises(ValueError):
+            registry.create("p1")
+        assert await registry.cancel("p1") is True
+        assert await registry.cancel("p1") is False
+        # A finished run can be resumed under the same id
+        assert registry.create("p1").run_id == "p1"
+
+    asyncio.run(scenario())
+
+
+def test_run_ids_are_validated_and_finished_runs_evicted(tmp_path):
+    registry = RunRegistry(base_dir=str(tmp_path / "data"), worktrees_root=str(tmp_path / "wt"), max_finished=1)
+
+    for bad in ("../../x", "a.b", "s:1", "x" * 65):
+        with pytest.raises(ValueError):
+            registry.create(bad)
+
+    async def scenario():
+        for run_id in ("r1", "r2", "r3"):
+            run = registry.create(run_id)
+            run.task = asyncio.create_task(asyncio.sleep(0))
+            await run.task
+        registry.create("r4")
+
+    asyncio.run(scenario())
+    # r4 has not started; of the finished ones only the newest is kept
+    assert list(registry.runs) == ["r3", "r4"]
+
+
+@pytest.mark.asyncio
+async def test_completed_runs_restart_on_a_new_thread(tmp_path, project_dir, fake_llm, initial_state):
+    graph = create_workflow(checkpointer=InMemorySaver())
+    registry = RunRegistry(base_dir=str(tmp_path / "data"), worktrees_root=str(tmp_path / "wt"))
+
+    run = registry.create("p1")
+    assert not (await run.checkpoint_snapshot(graph)).values
+    await graph.ainvoke(initial_state, run.graph_config())
+
+    # Completed: the next start gets an empty thread instead of the old state
+    again = registry.create("p1")
+    snapshot = await again.checkpoint_snapshot(graph)
+    assert again.thread_id == "p1-1" and not snapshot.values
+
+    # Interrupted on that thread: the next start resumes it
+    async for event in graph.astream(initial_state, again.graph_config(), stream_mode="updates", durability="sync"):
+        break
+    resumed = registry.create("p1")
+    snapshot = await resumed.checkpoint_snapshot(graph)
+    assert resumed.thread_id == "p1-1" and snapshot.next == ("architect",)
+
+
+def test_catch_up_messages_carry_the_run_id(tmp_path, monkeypatch):
+    from langgraph_scrum import server
+    from langgraph_scrum.sync import StateSync
+
+    monkeypatch.setattr(server, "registry", RunRegistry(base_dir=str(tmp_path / "data"), worktrees_root=str(tmp_path / "wt")))
+    run = server.registry.create("catch-up")
+    run.sync = StateSync({"phase": "planning"}, history=1)
+    run.sync.update({"phase": "development"}, ["dispatch"])
+    run.sync.update({"phase": "review"}, ["tester"])
+
+    # A retained delta, and a snapshot for a client too far behind
+    for seq in (1, -1):
+        messages = server.resync_run("catch-up", seq)
+        assert messages and all(m["run_id"] == "catch-up" for m in messages)
+    assert "run_id" not in run.sync.snapshot()
+
+
+@pytest.mark.asyncio
+async def test_lessons_are_shared_across_runs(tmp_path, knowledge, fake_llm, initial_state):
+    from langgraph_scrum.ingest import LessonIngestor
+    from langgraph_scrum.nodes.planning import product_owner_node
+
+    registry = RunRegistry(base_dir=str(tmp_path / "data"), worktrees_root=str(tmp_path / "wt"))
+    registry.lessons = knowledge
+    first = registry.create("first")
+    ingestor = LessonIngestor(first.lesson_knowledge)
+    ingestor.start()
+    ingestor.submit([("Todo apps need offline sync", {"project": "todo", "sprint": 1})])
+    await ingestor.close()
+
+    # A later project finds the lesson, unless its filters scope it out
+    second = registry.create("second")
+    await product_owner_node(initial_state, second.graph_config())
+    assert "Todo apps need offline sync" in fake_llm[-1][1].content
+
+    second.lesson_filters = {"project": "invoices"}
+    await product_owner_node(initial_state, second.graph_config())
+    assert "offline sync" not in fake_llm[-1][1].content
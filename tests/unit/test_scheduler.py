@@ -0,0 +1,83 @@
+import pytest
+
+from langgraph_scrum.config import config
+from langgraph_scrum.graph import create_workflow
+from langgraph_scrum.nodes.development import dispatch_node
+from langgraph_scrum.scheduler import plan_dispatch
+from langgraph_scrum.tickets import TicketIndex
+
+
+def ticket(tid, status="draft", dependencies=(), assigned_to=None):
+    return {"id": tid, "title": tid, "status": status, "assigned_to": assigned_to,
+            "dependencies": list(dependencies)}
+
+
+def developers(*ids, capacity=1):
+    return {aid: {"role": "developer", "state": "idle", "config": {"capacity": capacity}} for aid in ids}
+
+
+def test_plan_respects_dependencies_cap_and_capacity():
+    index = TicketIndex([
+        ticket("a"), ticket("b"), ticket("c", dependencies=["a"]), ticket("d"), ticket("e"),
+    ])
+    agents = {**developers("dev1", "dev2"), "architect": {"state": "idle", "config": {}}}
+
+    plan = plan_dispatch(index, agents, max_parallel=3)
+
+    # c waits for a; two developers with capacity 1 take two tickets
+    assert [(t["id"], agent) for t, agent in plan] == [("a", "dev1"), ("b", "dev2")]
+
+    plan = plan_dispatch(index, developers("dev1", capacity=5), max_parallel=3)
+    assert [t["id"] for t, _ in plan] == ["a", "b", "d"]
+
+
+def test_plan_counts_in_progress_work_and_honours_assignment():
+    index = TicketIndex([
+        ticket("a"), ticket("a", status="in_progress", assigned_to="dev1"),
+        ticket("b", assigned_to="dev1"), ticket("c"),
+    ])
+
+    plan = plan_dispatch(index, developers("dev1", "dev2"), max_parallel=4)
+
+    # b waits for dev1, c goes to the free developer
+    assert [(t["id"], agent) for t, agent in plan] == [("c", "dev2")]
+
+
+@pytest.mark.asyncio
+async def test_dependent_tickets_run_in_later_waves(project_dir, fake_llm, initial_state):
+    initial_state["tickets"] = [ticket("a"), ticket("b", dependencies=["a"]), ticket("c")]
+    initial_state["agents"] = developers("dev1", "dev2")
+    initial_state["max_parallel"] = 4
+    graph = create_workflow()
+
+    waves = []
+    final = None
+    async for mode, event in graph.astream(initial_state, stream_mode=["updates", "values"]):
+        if mode == "values":
+            final = event
+            continue
+        for node, update in event.items():
+            if node == "dispatch" and update.get("tickets"):
+                waves.append([t["id"] for t in update["tickets"]])
+
+    # The architect adds two more independent tickets; two agents take two at a time
+    assert waves[0] == ["a", "c"]
+    assert "b" in waves[1]
+    assert all(len(wave) <= 2 for wave in waves)
+    # Status changes replace tickets in place
+    assert len(final["tickets"]) == 5
+    assert {t["status"] for t in final["tickets"]} == {"done"}
+    assert len(final["completed_tickets"]) == 5
+    assert final["phase"] == "review"
+
+
+@pytest.mark.asyncio
+async def test_dispatch_reads_capacity_from_settings(project_dir, monkeypatch):
+    monkeypatch.setitem(config._config, "AGENT_CAPACITY", 2)
+    state = {"tickets": [ticket("a"), ticket("b"), ticket("c")], "max_parallel": 4,
+             "agents": {"dev1": {"role": "developer", "state": "idle", "config": {}}}}
+
+    update = await dispatch_node(state, {"configurable": {}})
+
+    # One developer with capacity 2 takes two of the three tickets
+    assert [(t["id"], t["assigned_to"]) for t in update["tickets"]] == [("a", "dev1"), ("b", "dev1")]
@@ -0,0 +1,44 @@
+import json
+import os
+
+import pytest
+
+from langgraph_scrum.serialization import (
+    SCHEMA_VERSION, encode_message, get_serializer, read_snapshot, write_snapshot,
+)
+from langgraph_scrum.state import TicketList
+
+
+@pytest.mark.parametrize("name", ["msgpack", "json"])
+def test_snapshots_round_trip_with_schema_version(tmp_path, name):
+    serializer = get_serializer(name)
+    path = str(tmp_path / f"state{serializer.extension}")
+    state = {"tickets": TicketList([{"id": "T-1", "title": "é"}]), "sprint_number": 2}
+
+    write_snapshot(path, state, serializer)
+
+    assert read_snapshot(path, serializer) == {"tickets": [{"id": "T-1", "title": "é"}], "sprint_number": 2}
+    assert serializer.loads(open(path, "rb").read())["schema_version"] == SCHEMA_VERSION
+    # Written via a temp file that was renamed into place
+    assert os.listdir(tmp_path) == [os.path.basename(path)]
+
+
+def test_unknown_types_are_rejected_instead_of_stringified(tmp_path):
+    path = str(tmp_path / "state.msgpack")
+    with pytest.raises(TypeError):
+        write_snapshot(path, {"agent": object()})
+    assert not os.path.exists(path) and os.listdir(tmp_path) == []
+    with pytest.raises(TypeError):
+        encode_message({"agent": object()})
+
+
+def test_newer_schemas_and_legacy_files(tmp_path):
+    serializer = get_serializer("json")
+    newer = tmp_path / "newer.json"
+    newer.write_bytes(serializer.dumps({"schema_version": SCHEMA_VERSION + 1, "state": {}}))
+    with pytest.raises(ValueError):
+        read_snapshot(str(newer), serializer)
+
+    legacy = tmp_path / "state.json"
+    legacy.write_text(json.dumps({"phase": "planning"}, indent=2))
+    assert read_snapshot(str(legacy), serializer) == {"phase": "planning"}
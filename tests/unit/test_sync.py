@@ -0,0 +1,62 @@
+from langgraph_scrum.sync import StateSync, diff_state
+
+
+def test_diff_state_emits_minimal_ops():
+    old = {"phase": "planning", "tickets": [{"id": "a", "status": "draft"}], "agents": {"po": {}, "old": {}}}
+    new = {"phase": "development", "tickets": [{"id": "a", "status": "review"}, {"id": "b"}], "agents": {"po": {}, "a/b": 1}}
+
+    ops = diff_state(old, new)
+
+    assert {"op": "replace", "path": "/phase", "value": "development"} in ops
+    # Not a pure append, so the list is replaced
+    assert {"op": "replace", "path": "/tickets", "value": new["tickets"]} in ops
+    assert {"op": "remove", "path": "/agents/old"} in ops
+    assert {"op": "add", "path": "/agents/a~1b", "value": 1} in ops
+    assert diff_state({"t": [1]}, {"t": [1, 2]}) == [{"op": "add", "path": "/t/-", "value": 2}]
+    assert diff_state({"t": [{"s": 1}]}, {"t": [{"s": 2}]}) == [{"op": "replace", "path": "/t/0/s", "value": 2}]
+
+
+def test_sync_replays_missed_deltas_then_falls_back_to_snapshot():
+    state = {"phase": "planning", "messages": []}
+    sync = StateSync(state, history=2)
+
+    first = sync.update({**state, "phase": "development"}, ["dispatch"])
+    second = sync.update(None, ["tester"])
+    third = sync.update({"phase": "review", "messages": [{"role": "po"}]}, ["sprint_review"])
+
+    assert [m["seq"] for m in (first, second, third)] == [1, 2, 3]
+    assert second["ops"] == []
+    assert sync.since(3) == []
+    assert sync.since(1) == [second, third]
+    # Delta 1 is no longer retained, so a client at seq 0 gets a snapshot
+    assert sync.since(0) == [sync.snapshot()]
+    assert sync.snapshot()["state"] == {"phase": "review", "messages": [{"role": "po"}]}
+
+
+def test_sync_is_not_affected_by_in_place_mutation():
+    ticket = {"id": "a", "status": "draft"}
+    state = {"tickets": [ticket]}
+    sync = StateSync(state)
+
+    ticket["status"] = "review"
+    delta = sync.update(state, ["agent_work"])
+
+    assert delta["ops"] == [{"op": "replace", "path": "/tickets/0/status", "value": "review"}]
+
+
+def test_sync_copies_only_the_keys_a_step_changed():
+    state = {"phase": "planning", "tickets": [{"id": "a"}], "requirements": "big spec", "agents": {"po": {}}}
+    sync = StateSync(state)
+    agents, requirements = sync.state["agents"], sync.state["requirements"]
+
+    new = {**state, "phase": "development", "tickets": [{"id": "a", "status": "done"}]}
+    delta = sync.update(new, ["dispatch"], keys={"phase", "tickets"})
+
+    assert delta["ops"] == [
+        {"op": "replace", "path": "/phase", "value": "development"},
+        {"op": "add", "path": "/tickets/0/status", "value": "done"},
+    ]
+    # Unchanged keys are shared with the previous state; changed ones are copies
+    assert sync.state["agents"] is agents and sync.state["requirements"] is requirements
+    new["tickets"][0]["status"] = "reopened"
+    assert sync.state["tickets"] == [{"id": "a", "status": "done"}]
@@ -0,0 +1,64 @@
+import copy
+
+from langgraph_scrum.state import merge_tickets
+from langgraph_scrum.tickets import TicketIndex, get_ticket_index
+
+
+def ticket(tid, status="draft", dependencies=(), **extra):
+    return {"id": tid, "title": tid, "status": status, "assigned_to": None,
+            "dependencies": list(dependencies), **extra}
+
+
+def test_ready_set_follows_status_changes():
+    index = TicketIndex([ticket("a"), ticket("b", dependencies=["a"]), ticket("c", dependencies=["a", "x"])])
+    assert index.ready == {"a"}
+
+    index.apply(ticket("a", status="done"))
+    assert index.ready == {"b"}
+    assert [t["id"] for t in index.with_status("done")] == ["a"]
+
+    # c also waits for x, which only shows up later
+    index.apply(ticket("x", status="done"))
+    assert index.ready == {"b", "c"}
+
+    index.apply(ticket("a", status="review"))
+    assert index.ready == set()
+
+
+def test_cycles_block_their_dependents():
+    index = TicketIndex([
+        ticket("a", dependencies=["b"]), ticket("b", dependencies=["a"]),
+        ticket("c", dependencies=["a"]), ticket("d", dependencies=["missing"]), ticket("e"),
+    ])
+
+    assert index.cycles() == [["a", "b"]]
+    assert index.blocked() == ["a", "b", "c", "d"]
+    assert index.ready == {"e"}
+
+
+def test_critical_path_weighs_estimates_and_orders_ready_set():
+    index = TicketIndex([
+        ticket("short"),
+        ticket("root"),
+        ticket("mid", dependencies=["root"], estimate=3),
+        ticket("leaf", dependencies=["mid"]),
+    ])
+
+    assert index.critical_path() == {"length": 5.0, "tickets": ["root", "mid", "leaf"]}
+    assert [t["id"] for t in index.ready_tickets()] == ["root", "short"]
+
+
+def test_ticket_list_merges_revisions_by_id():
+    tickets = merge_tickets([], [ticket("a"), ticket("b", dependencies=["a"])])
+    index = get_ticket_index(tickets)
+
+    merged = merge_tickets(tickets, [ticket("a", status="done"), ticket("c")])
+
+    # Revisions replace tickets by position; the old value is left unchanged
+    assert [(t["id"], t["status"]) for t in merged] == [("a", "done"), ("b", "draft"), ("c", "draft")]
+    assert [(t["id"], t["status"]) for t in tickets] == [("a", "draft"), ("b", "draft")]
+    assert get_ticket_index(merged) is index
+    assert index.ready == {"b", "c"}
+    assert get_ticket_index(tickets).ready == {"a"}
+    # Copies (state sync, checkpoints) are plain lists
+    assert type(copy.deepcopy(merged)) is list
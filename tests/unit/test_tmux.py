@@ -0,0 +1,115 @@
+import asyncio
+import shutil
+import threading
+import time
+import uuid
+
+import pytest
+
+from langgraph_scrum.tmux import OutputBuffer, TmuxManager
+
+pytestmark = pytest.mark.skipif(shutil.which("tmux") is None, reason="tmux not installed")
+
+
+@pytest.fixture
+def tmux():
+    manager = TmuxManager("agents", socket_name=f"lgtest-{uuid.uuid4().hex[:8]}", index_ttl=60)
+    yield manager
+    manager.server.kill()
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_pane_lookups_use_the_cached_index(tmux, monkeypatch):
+    tmux.load_layout(["po", "dev"])
+    calls = []
+    original = tmux.server.cmd
+    monkeypatch.setattr(tmux.server, "cmd", lambda *args: calls.append(args[0]) or original(*args))
+
+    tmux.send_many({"po": "echo from-po", "dev": "echo from-dev"})
+    tmux.send_keys("dev", "echo again")
+
+    # No list-windows/list-panes per call; the batch is one tmux process
+    assert calls == ["send-keys", "send-keys"]
+    assert wait_for(lambda: "from-dev" in "\n".join(tmux.read_pane("dev")))
+
+
+def test_index_recovers_from_a_killed_window(tmux):
+    tmux.load_layout(["dev"])
+    tmux.server.cmd("kill-window", "-t", "agents:dev")
+
+    tmux.send_keys("dev", "echo recreated")
+
+    assert wait_for(lambda: "recreated" in "\n".join(tmux.read_pane("dev")))
+
+
+@pytest.mark.asyncio
+async def test_async_calls_run_off_the_event_loop(tmux, monkeypatch):
+    # Every tmux command goes through server.cmd; note which thread runs it
+    threads = set()
+    original = tmux.server.cmd
+    monkeypatch.setattr(tmux.server, "cmd", lambda *args, **kwargs: threads.add(threading.get_ident()) or original(*args, **kwargs))
+
+    await tmux.aload_layout(["dev"])
+    await tmux.asend_keys("dev", "echo async")
+
+    assert "dev" in tmux._panes
+    assert threads and threading.get_ident() not in threads
+
+
+@pytest.mark.asyncio
+async def test_stream_yields_only_new_pane_output(tmux, tmp_path, monkeypatch):
+    await tmux.aload_layout(["dev"])
+    stream = await tmux.astream_pane("dev", str(tmp_path))
+    readers = set()
+    read_new = stream.read_new
+    monkeypatch.setattr(stream, "read_new", lambda: readers.add(threading.get_ident()) or read_new())
+    await tmux.asend_keys("dev", "seq 1 300")
+
+    output = ""
+    while "\n300\r\n" not in output:
+        output += await asyncio.wait_for(stream.__anext__(), timeout=5)
+    # Lines that scrolled off the visible screen are not lost
+    assert "1\r\n2\r\n3\r\n" in output
+    # Polls read the log file off the event loop
+    assert readers and threading.get_ident() not in readers
+    assert stream.read_new() == ""
+
+    await tmux.asend_keys("dev", "echo next")
+    chunk = ""
+    while "next" not in chunk:
+        chunk += await asyncio.wait_for(stream.__anext__(), timeout=5)
+    assert "300" not in chunk
+    tmux.unpipe_pane("dev")
+
+
+def test_output_buffer_keeps_the_most_recent_output():
+    buffer = OutputBuffer(max_chars=10)
+    for chunk in ["abcd", "efgh", "ijkl"]:
+        buffer.append(chunk)
+    assert buffer.text() == "efghijkl"
+    buffer.append("x" * 25)
+    assert buffer.text() == "x" * 10
+
+
+def test_closing_a_run_kills_its_session(tmp_path, monkeypatch):
+    from langgraph_scrum import tmux as tmux_module
+    from langgraph_scrum.runs import Run
+
+    run = Run("r1", str(tmp_path / "data"), "scrum-agents-r1", str(tmp_path / "wt"))
+    manager = TmuxManager(run.tmux_session, socket_name=f"lgtest-{uuid.uuid4().hex[:8]}")
+    monkeypatch.setitem(tmux_module._tmux_managers, run.tmux_session, manager)
+    try:
+        manager.load_layout(["dev"])
+        run.close()
+        assert run.tmux_session not in tmux_module._tmux_managers
+        assert not any(s.session_name == run.tmux_session for s in manager.server.sessions)
+    finally:
+        manager.server.kill()